@@ -0,0 +1,104 @@
+"""Event-loop latency of the ``async_*`` methods under concurrent writers.
+
+A heartbeat coroutine asks to wake up every ``--tick`` seconds and records how late
+it actually runs while ``--writers`` coroutines insert, update and pop keys, and
+``--threads`` plain threads write through the blocking API at the same time.
+
+    python benchmarks/bench_async_latency.py --writers 64 --ops 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import MemoryAwareStruct  # noqa: E402
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def heartbeat(tick, lags, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + tick
+        await asyncio.sleep(tick)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def writer(struct, index, ops, payload):
+    for op in range(ops):
+        key = f"w{index}:{op % 16}"
+        await struct.async_insert({key: payload})
+        await struct.async_update({key: op})
+        await struct.async_pop(key)
+
+
+def thread_writer(struct, index, stop, payload):
+    op = 0
+    while not stop.is_set():
+        key = f"t{index}:{op % 16}"
+        struct.insert = {key: payload}
+        struct.pop(key)
+        op += 1
+
+
+async def run(args):
+    struct = MemoryAwareStruct()
+    payload = list(range(args.payload))
+    lags = []
+    stop = asyncio.Event()
+    thread_stop = threading.Event()
+    threads = [
+        threading.Thread(target=thread_writer, args=(struct, i, thread_stop, payload))
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    beat = asyncio.ensure_future(heartbeat(args.tick, lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(writer(struct, i, args.ops, payload) for i in range(args.writers))
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    thread_stop.set()
+    for thread in threads:
+        thread.join()
+    return elapsed, lags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--ops", type=int, default=100)
+    parser.add_argument("--payload", type=int, default=256, help="items per value")
+    parser.add_argument("--tick", type=float, default=0.001)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):  # pop() mencetak per panggilan
+        elapsed, lags = asyncio.run(run(args))
+    operations = args.writers * args.ops * 3
+    print(f"writers={args.writers} threads={args.threads} ops/writer={args.ops * 3}")
+    print(f"throughput: {operations / elapsed:,.0f} async ops/s ({elapsed:.2f}s)")
+    if lags:
+        print(
+            "loop lag ms: "
+            f"p50={statistics.median(lags) * 1e3:.3f} "
+            f"p99={percentile(lags, 0.99) * 1e3:.3f} "
+            f"max={max(lags) * 1e3:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Value compression: stored size versus write and read latency per codec.
+
+Each run inserts ``--count`` values of ``--size`` bytes, then reads them back with
+and without the decompressed-value cache. Text values are slices of this
+repository's sources (compressible); ``--data random`` uses incompressible bytes.
+
+    python benchmarks/bench_compression.py --size 65536 --count 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import COMPRESSION_CODECS, MemoryAwareStruct  # noqa: E402
+
+
+def make_values(args):
+    rng = random.Random(0)
+    if args.data == "random":
+        return [rng.randbytes(args.size) for _ in range(args.count)]
+    corpus = ""
+    for name in ("main.py", "README.md"):
+        with open(os.path.join(ROOT, name), encoding="utf-8") as fp:
+            corpus += fp.read()
+    while len(corpus) < args.size * 2:
+        corpus += corpus
+    values = []
+    for _ in range(args.count):
+        start = rng.randrange(len(corpus) - args.size)
+        values.append(corpus[start:start + args.size])
+    return values
+
+
+def run(codec, values, args, cache_bytes=0):
+    struct = MemoryAwareStruct(memory_default=1 << 30)
+    if codec is not None:
+        struct.set_compression(codec, args.threshold, args.level, cache_bytes)
+    keys = [f"blob:{i}" for i in range(len(values))]
+    started = time.perf_counter()
+    for key, value in zip(keys, values):
+        struct.insert = {key: value}
+    write = (time.perf_counter() - started) / len(values)
+    stored = struct.__get_total_size__()
+    rng = random.Random(1)
+    hot = keys[: max(1, len(keys) // 10)]
+    started = time.perf_counter()
+    for _ in range(args.reads):
+        # 90% pembacaan mengenai 10% kunci
+        struct.get(rng.choice(hot) if rng.random() < 0.9 else rng.choice(keys))
+    read = (time.perf_counter() - started) / args.reads
+    return {"stored": stored, "write_us": write * 1e6, "read_us": read * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=65536, help="bytes per value")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=5000)
+    parser.add_argument("--threshold", type=int, default=4096)
+    parser.add_argument("--level", type=int, default=None)
+    parser.add_argument("--data", choices=("text", "random"), default="text")
+    args = parser.parse_args()
+
+    values = make_values(args)
+    raw = None
+    print(f"size={args.size} count={args.count} data={args.data} threshold={args.threshold}")
+    for codec in (None, *COMPRESSION_CODECS):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run(codec, values, args)
+            cached = run(codec, values, args, cache_bytes=args.size * args.count // 5)
+        if raw is None:
+            raw = result["stored"]
+        print(
+            f"{codec or 'none':<6} ratio={raw / result['stored']:>6.2f}x  "
+            f"write={result['write_us']:>9.1f}us  read={result['read_us']:>9.1f}us  "
+            f"read(cached)={cached['read_us']:>9.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Read/write contention: "exclusive" versus "rw" concurrency mode.
+
+Each thread runs a mix of ``get`` (and an occasional ``json``) with a small share of
+``update`` calls, first with the default exclusive lock and then with the
+reader-writer lock, with and without writer preference.
+
+    python benchmarks/bench_rw_contention.py --threads 8 --reads 0.95
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import MemoryAwareStruct  # noqa: E402
+
+
+def worker(struct, keys, ops, read_ratio, seed, barrier, latencies):
+    rng = random.Random(seed)
+    local = []
+    barrier.wait()
+    for op in range(ops):
+        key = rng.choice(keys)
+        started = time.perf_counter()
+        if rng.random() < read_ratio:
+            if op % 500 == 0:
+                struct.json()
+            else:
+                struct.get(key)
+        else:
+            struct.update = {key: op}
+        local.append(time.perf_counter() - started)
+    latencies.extend(local)
+
+
+def run(mode, writer_preference, args):
+    struct = MemoryAwareStruct()
+    if mode == "rw":
+        struct.set_concurrency_mode("rw", writer_preference=writer_preference)
+    keys = [f"session:{i}" for i in range(args.keys)]
+    struct.insert = {key: i for i, key in enumerate(keys)}
+    latencies = []
+    barrier = threading.Barrier(args.threads + 1)
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(struct, keys, args.ops, args.reads, seed, barrier, latencies),
+        )
+        for seed in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ops_per_sec": args.threads * args.ops / elapsed,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=20000, help="operations per thread")
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--reads", type=float, default=0.95, help="share of reads")
+    args = parser.parse_args()
+
+    print(f"threads={args.threads} ops/thread={args.ops} reads={args.reads:.0%}")
+    for label, mode, preference in (
+        ("exclusive", "exclusive", True),
+        ("rw (writer preference)", "rw", True),
+        ("rw (reader preference)", "rw", False),
+    ):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run(mode, preference, args)
+        print(
+            f"{label:<24} {result['ops_per_sec']:>12,.0f} ops/s  "
+            f"p50={result['p50_us']:.1f}us  p99={result['p99_us']:.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""Core operations across store sizes, value sizes and thread counts, as JSON.
+
+For every store size (``--keys``) and value size (``--value-sizes``) the store is
+filled once, then ``get``, ``insert``, ``update``, ``pop``, ``json`` and
+``execute_function`` are timed with each number of threads in ``--threads``
+(each metric is the median of ``--repeat`` runs).
+For every store size, ``async_insert``/``async_update``/``async_pop`` also run
+under a heartbeat coroutine that records how late the event loop wakes up.
+
+Combinations whose values would exceed ``--max-bytes`` are skipped. Save a run
+and compare a later one against it. Throughput and p50 latency are checked
+against ``--tolerance``, the noisier p99 latencies against ``--tail-tolerance``;
+regressions are listed and the exit status is 1. Baseline cases the new run
+did not measure are listed too:
+
+    python benchmarks/bench_suite.py --output baseline.json
+    python benchmarks/bench_suite.py --compare baseline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import MemoryAwareStruct  # noqa: E402
+
+# Metrik yang lebih besar berarti lebih baik; sisanya (latensi) lebih kecil lebih baik
+HIGHER_IS_BETTER = ("ops_per_sec",)
+# Metrik yang diperiksa compare(): dengan --tolerance, atau --tail-tolerance untuk latensi ekor
+GATED_METRICS = ("ops_per_sec", "p50_us")
+TAIL_METRICS = ("p99_us", "loop_lag_p99_us")
+
+
+def parse_ints(text):
+    return [int(float(part)) for part in text.split(",") if part]
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples, elapsed):
+    """Throughput and latency percentiles from per-operation samples in nanoseconds."""
+    ordered = sorted(samples)
+    return {
+        "ops": len(ordered),
+        "ops_per_sec": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_us": percentile(ordered, 0.50) / 1000,
+        "p99_us": percentile(ordered, 0.99) / 1000,
+    }
+
+
+def median_run(runs):
+    """Combine the metrics of repeated runs of one measurement, metric by metric, by their median."""
+    return {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+
+def make_values(value_size, count=1024):
+    rng = random.Random(value_size)
+    alphabet = "abcdefghijklmnopqrstuvwxyz0123456789"
+    return ["".join(rng.choices(alphabet, k=value_size)) for _ in range(count)]
+
+
+def fill(keys, values, batch_size=10000):
+    struct = MemoryAwareStruct()
+    rejected = 0
+    for start in range(0, keys, batch_size):
+        batch = {
+            f"key:{index}": values[index % len(values)]
+            for index in range(start, min(keys, start + batch_size))
+        }
+        rejected += list(struct.insert_many(batch).values()).count("rejected")
+    return struct, rejected
+
+
+def run_threads(threads, work):
+    """Run ``work(index, samples)`` on ``threads`` threads at once; return samples and wall time."""
+    samples = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def target(index):
+        barrier.wait()
+        work(index, samples[index])
+
+    workers = [threading.Thread(target=target, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    return [sample for part in samples for sample in part], elapsed
+
+
+def timed(samples, call, *args):
+    started = time.perf_counter_ns()
+    call(*args)
+    samples.append(time.perf_counter_ns() - started)
+
+
+def bench_operations(struct, keys, values, threads, ops, json_ops):
+    """Time each core operation with ``threads`` threads; the store size is left unchanged."""
+    results = {}
+    per_thread = max(1, ops // threads)
+    clock = time.perf_counter_ns
+
+    def gets(index, samples):
+        rng = random.Random(index)
+        for _ in range(per_thread):
+            key = f"key:{rng.randrange(keys)}"
+            started = clock()
+            struct.get(key)
+            samples.append(clock() - started)
+
+    def updates(index, samples):
+        rng = random.Random(index)
+        for op in range(per_thread):
+            key = f"key:{rng.randrange(keys)}"
+            value = values[op % len(values)]
+            started = clock()
+            struct.update = {key: value}
+            samples.append(clock() - started)
+
+    def inserts(index, samples):
+        for op in range(per_thread):
+            key = f"new:{index}:{op}"
+            value = values[op % len(values)]
+            started = clock()
+            struct.insert = {key: value}
+            samples.append(clock() - started)
+
+    def pops(index, samples):
+        # Menghapus kunci yang dibuat oleh inserts, ukuran store kembali seperti semula
+        for op in range(per_thread):
+            timed(samples, struct.pop, f"new:{index}:{op}")
+
+    def executes(index, samples):
+        for op in range(per_thread):
+            timed(samples, struct.execute_function, "bench:add", op)
+
+    for name, work in (
+        ("get", gets),
+        ("update", updates),
+        ("insert", inserts),
+        ("pop", pops),
+        ("execute_function", executes),
+    ):
+        results[name] = summarize(*run_threads(threads, work))
+
+    def jsons(index, samples):
+        rng = random.Random(index)
+        for _ in range(max(1, json_ops // threads)):
+            # Tulis dulu, kalau tidak json() mengembalikan snapshot dari cache
+            struct.update = {f"key:{rng.randrange(keys)}": values[0]}
+            timed(samples, struct.json)
+
+    results["json"] = summarize(*run_threads(threads, jsons))
+    return results
+
+
+async def heartbeat(tick, lags, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + tick
+        await asyncio.sleep(tick)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def bench_async(struct, values, writers, ops, tick):
+    lags, samples = [], []
+    stop = asyncio.Event()
+    clock = time.perf_counter_ns
+
+    async def writer(index):
+        for op in range(ops):
+            key = f"async:{index}:{op % 16}"
+            value = values[op % len(values)]
+            started = clock()
+            await struct.async_insert({key: value})
+            await struct.async_update({key: value})
+            await struct.async_pop(key)
+            samples.append(clock() - started)
+
+    beat = asyncio.ensure_future(heartbeat(tick, lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(index) for index in range(writers)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    ordered = sorted(lags) or [0.0]
+    result = summarize(samples, elapsed)
+    result.update(
+        {
+            "loop_lag_p50_us": percentile(ordered, 0.50) * 1e6,
+            "loop_lag_p99_us": percentile(ordered, 0.99) * 1e6,
+            "loop_lag_max_us": ordered[-1] * 1e6,
+        }
+    )
+    return result
+
+
+def run_suite(args):
+    cases, skipped = [], []
+    for keys in args.keys:
+        for position, value_size in enumerate(args.value_sizes):
+            label = f"keys={keys} value_size={value_size}"
+            if keys * value_size > args.max_bytes:
+                skipped.append(label)
+                print(f"skip {label}: over --max-bytes", file=sys.stderr)
+                continue
+            values = make_values(value_size)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # pop() mencetak per panggilan
+                struct, rejected = fill(keys, values)
+                struct.insert_function("bench:add", lambda number: number + 1)
+            print(f"{label}: filled in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            if rejected:
+                skipped.append(label)
+                print(f"skip {label}: {rejected} keys rejected by the memory budget", file=sys.stderr)
+                continue
+            for threads in args.threads:
+                runs = {}
+                for _ in range(max(1, args.repeat)):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        run = bench_operations(struct, keys, values, threads, args.ops, args.json_ops)
+                    for operation, metrics in run.items():
+                        runs.setdefault(operation, []).append(metrics)
+                # Median per metrik meredam derau satu putaran tanpa memilih putaran yang kebetulan cepat
+                for operation, metrics in ((name, median_run(found)) for name, found in runs.items()):
+                    cases.append(
+                        {
+                            "id": f"{operation}/keys={keys}/value_size={value_size}/threads={threads}",
+                            "operation": operation,
+                            "keys": keys,
+                            "value_size": value_size,
+                            "threads": threads,
+                            **metrics,
+                        }
+                    )
+            if position == 0 and args.async_writers:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    metrics = asyncio.run(
+                        bench_async(struct, values, args.async_writers, args.async_ops, args.tick)
+                    )
+                cases.append(
+                    {
+                        "id": f"async_write/keys={keys}/value_size={value_size}/writers={args.async_writers}",
+                        "operation": "async_write",
+                        "keys": keys,
+                        "value_size": value_size,
+                        "writers": args.async_writers,
+                        **metrics,
+                    }
+                )
+            del struct
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": {name: value for name, value in vars(args).items() if name not in ("output", "compare")},
+        },
+        "cases": cases,
+        "skipped": skipped,
+    }
+
+
+def compare(current, baseline, tolerance, tail_tolerance):
+    """Check ``current`` against ``baseline``; return the regressions and the missing case ids.
+
+    A regression is one row per gated metric that got worse by more than ``tolerance``
+    (``tail_tolerance`` for the p99 latencies). Baseline cases absent from ``current``
+    are returned rather than skipped.
+    """
+    measured = {case["id"]: case for case in current["cases"]}
+    limits = dict.fromkeys(GATED_METRICS, tolerance)
+    limits.update(dict.fromkeys(TAIL_METRICS, tail_tolerance))
+    regressions, missing = [], []
+    for old in baseline["cases"]:
+        case = measured.get(old["id"])
+        if case is None:
+            missing.append(old["id"])
+            continue
+        for metric, limit in limits.items():
+            if metric not in case or not old.get(metric):
+                continue
+            ratio = case[metric] / old[metric]
+            worse = ratio < 1 - limit if metric in HIGHER_IS_BETTER else ratio > 1 + limit
+            if worse:
+                regressions.append((case["id"], metric, old[metric], case[metric], ratio))
+    return regressions, missing
+
+
+def print_table(report):
+    for case in report["cases"]:
+        extra = ""
+        if "loop_lag_p99_us" in case:
+            extra = f"  loop lag p99={case['loop_lag_p99_us']:>9.1f}us max={case['loop_lag_max_us']:>9.1f}us"
+        print(
+            f"{case['id']:<52} {case['ops_per_sec']:>12,.0f} ops/s  "
+            f"p50={case['p50_us']:>9.1f}us  p99={case['p99_us']:>9.1f}us{extra}",
+            file=sys.stderr,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=parse_ints, default=parse_ints("1e3,1e4,1e5,1e6"),
+                        help="comma-separated store sizes")
+    parser.add_argument("--value-sizes", type=parse_ints, default=parse_ints("16,1024"),
+                        help="comma-separated value sizes in characters")
+    parser.add_argument("--threads", type=parse_ints, default=parse_ints("1,4"),
+                        help="comma-separated thread counts")
+    parser.add_argument("--ops", type=int, default=5000, help="operations per measurement")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the median is kept")
+    parser.add_argument("--json-ops", type=int, default=5, help="json() calls per measurement")
+    parser.add_argument("--async-writers", type=int, default=32, help="0 skips the asyncio run")
+    parser.add_argument("--async-ops", type=int, default=50, help="insert/update/pop rounds per writer")
+    parser.add_argument("--tick", type=float, default=0.001, help="heartbeat interval in seconds")
+    parser.add_argument("--max-bytes", type=int, default=256 * 1024 * 1024,
+                        help="skip combinations whose values exceed this many bytes")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="a saved JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="relative change in throughput or p50 tolerated before it counts as a regression")
+    parser.add_argument("--tail-tolerance", type=float, default=0.5,
+                        help="relative change tolerated in the p99 latencies")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    print_table(report)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        regressions, missing = compare(report, baseline, args.tolerance, args.tail_tolerance)
+        for case_id in missing:
+            print(f"MISSING {case_id}: in the baseline but not measured by this run")
+        for case_id, metric, old, new, ratio in regressions:
+            print(f"REGRESSION {case_id} {metric}: {old:,.1f} -> {new:,.1f} ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(
+            f"no regressions beyond {args.tolerance:.0%} (p99 {args.tail_tolerance:.0%}) "
+            f"against {args.compare}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,26 @@ import psutil
 import asyncio
 import time
 import signal
+import array
+import itertools
+import lzma
+import math
+import concurrent.futures
+import contextlib
+import weakref
+import bisect
+import bz2
+import codecs
+import functools
+import hashlib
+import mmap
+import multiprocessing
+import pickle
+import sqlite3
+import struct
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from multiprocessing import shared_memory
 
 try:
     import resource
@@ -13,6 +33,7 @@ except:
     resource = None
 
 import os
+import zlib
 
 version = int(str(sys.version_info.major) + str(sys.version_info.minor))
 if version > 39:
@@ -79,6 +100,107 @@ class AwareData:
         """Return a string representation of the stored data."""
         return repr(self._data)
 
+class DictView(Mapping):
+    """Read-only, zero-copy view of a stored dict.
+
+    Only the slotted proxy is allocated per read; nested dicts, lists, tuples and bytes are
+    wrapped in their own views when they are accessed, so the stored object is never copied
+    and cannot be modified through the view.
+    """
+
+    __slots__ = ("_target",)
+
+    def __init__(self, target: SelectType.Dict_) -> None:
+        self._target = target
+
+    def __getitem__(self, key: str) -> Any:
+        return view_of(self._target[key])
+
+    def __iter__(self):
+        return iter(self._target)
+
+    def __len__(self) -> int:
+        return len(self._target)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._target
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        raise AttributeError(
+            "Direct modification is not allowed. Use the update() method."
+        )
+
+    def __delitem__(self, key: str) -> None:
+        raise AttributeError("Direct deletion is not allowed. Use the update() method.")
+
+    def __dir__(self):
+        """Block the dir() function."""
+        raise AttributeError("The use of dir() on this class is not allowed.")
+
+    def __repr__(self) -> str:
+        return repr(self._target)
+
+
+class SequenceView(Sequence):
+    """Read-only, zero-copy view of a stored list or tuple; nested values are viewed lazily."""
+
+    __slots__ = ("_target",)
+
+    def __init__(self, target: SelectType.List_) -> None:
+        self._target = target
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SequenceView(self._target[index])
+        return view_of(self._target[index])
+
+    def __len__(self) -> int:
+        return len(self._target)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SequenceView):
+            other = other._target
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return len(self._target) == len(other) and all(
+            view_of(mine) == theirs for mine, theirs in zip(self._target, other)
+        )
+
+    __hash__ = None
+
+    def __setitem__(self, index, value: Any) -> None:
+        raise AttributeError(
+            "Direct modification is not allowed. Use the update() method."
+        )
+
+    def __delitem__(self, index) -> None:
+        raise AttributeError("Direct deletion is not allowed. Use the update() method.")
+
+    def __dir__(self):
+        """Block the dir() function."""
+        raise AttributeError("The use of dir() on this class is not allowed.")
+
+    def __repr__(self) -> str:
+        return repr(self._target)
+
+
+def view_of(value: SelectType.Any_) -> SelectType.Any_:
+    """Return a read-only view of ``value`` without copying it.
+
+    dicts become `DictView`, lists and tuples `SequenceView`, bytes and bytearray a read-only
+    ``memoryview``; every other value (str, numbers, ...) is returned unchanged.
+    """
+    if isinstance(value, dict):
+        return DictView(value)
+    if isinstance(value, (list, tuple)):
+        return SequenceView(value)
+    if isinstance(value, (bytes, bytearray)):
+        return memoryview(value).toreadonly()
+    if isinstance(value, RestrictedDict):
+        return DictView(value._data)  # Nilai lama yang masih berupa RestrictedDict
+    return value
+
+
 class ReadOnlyJSON:
     def __init__(self, initial_data: SelectType.Any_) -> None:
         """
@@ -87,12 +209,52 @@ class ReadOnlyJSON:
         Args:
             initial_data (Any): The initial data to be secured.
         """
-        # Store a deep copy of the initial data to prevent external modifications
+        # Serialize once; the text is the snapshot, `.data` is parsed from it on first use
         try:
-            self._data = json.loads(json.dumps(initial_data))
+            self._text = json.dumps(initial_data)
+            self._data = None
         except:
+            self._text = None
             self._data = initial_data
 
+    @classmethod
+    def from_serialized(cls, text: SelectType.String_) -> "ReadOnlyJSON":
+        """
+        Wrap an already serialized JSON document without encoding it again.
+
+        Args:
+            text (str): A JSON string.
+
+        Returns:
+            ReadOnlyJSON: An instance whose `to_json` returns `text` as-is.
+        """
+        instance = cls.__new__(cls)
+        instance._text = text
+        instance._data = None
+        return instance
+
+    @classmethod
+    def merge(cls, parts) -> "ReadOnlyJSON":
+        """
+        Combine snapshots of JSON objects into one, as if their items were in one dict.
+
+        Args:
+            parts (Iterable[ReadOnlyJSON]): Snapshots whose data are dicts; later keys win.
+
+        Returns:
+            ReadOnlyJSON: When every part is serialized, their texts are joined without encoding
+            anything again; otherwise the parts' data are merged into a new snapshot.
+        """
+        parts = list(parts)
+        if any(part._text is None for part in parts):
+            # Salah satu bagian tidak bisa diserialisasi: gabungkan datanya
+            merged = {}
+            for part in parts:
+                merged.update(json.loads(part._text) if part._data is None else part._data)
+            return cls(merged)
+        texts = [part._text[1:-1] for part in parts if part._text != "{}"]
+        return cls.from_serialized("{" + ", ".join(texts) + "}")
+
     def __setitem__(self, key: str, value: any) -> None:
         raise AttributeError("Direct modification is not allowed.")
 
@@ -106,12 +268,15 @@ class ReadOnlyJSON:
     @property
     def data(self) -> Dict[str, Any]:
         """
-        Get a copy of the stored JSON data.
+        Get a read-only view of the stored JSON data.
 
         Returns:
-            Dict[str, Any]: A deep copy of the internal data.
+            Dict[str, Any]: A `DictView` over the parsed snapshot; the JSON text is parsed once,
+            on the first access, and shared by every later access.
         """
-        return json.loads(json.dumps(self._data))
+        if self._data is None:
+            self._data = json.loads(self._text)
+        return view_of(self._data)
 
     @property
     def to_json(self) -> SelectType.String_:
@@ -119,9 +284,11 @@ class ReadOnlyJSON:
         Convert the stored data to a JSON string.
 
         Returns:
-            str: JSON representation of the internal data.
+            str: JSON representation of the internal data, served from the serialized snapshot.
         """
-        return json.dumps(self._data)
+        if self._text is None:
+            return json.dumps(self._data)
+        return self._text
 
     def __repr__(self) -> SelectType.String_:
         """
@@ -136,11 +303,405 @@ class ReadOnlyJSON:
         return f"ReadOnlyJSON({self.to_json})"
 
 
+COMPRESSION_CODECS: Dict[str, tuple] = {
+    "zlib": (lambda data, level: zlib.compress(data, 6 if level is None else level), zlib.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+    "bz2": (lambda data, level: bz2.compress(data, 9 if level is None else level), bz2.decompress),
+}
+
+
+class CompressedValue:
+    """A str, bytes or bytearray value kept compressed in the store.
+
+    Its `__memory_size__` is the compressed payload, so the size ledger and the memory
+    budget only see the bytes that are actually held.
+    """
+
+    __slots__ = ("codec", "kind", "payload")
+
+    def __init__(self, codec: SelectType.String_, kind: type, payload: bytes) -> None:
+        self.codec = codec
+        self.kind = kind
+        self.payload = payload
+
+    def __memory_size__(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.payload)
+
+    @classmethod
+    def compress(
+        cls, value: SelectType.Any_, codec: SelectType.String_, level: Union[int, None] = None
+    ) -> SelectType.Any_:
+        """Return ``value`` compressed, or unchanged when compressing does not make it smaller."""
+        raw = value.encode("utf-8") if isinstance(value, str) else bytes(value)
+        payload = COMPRESSION_CODECS[codec][0](raw, level)
+        if len(payload) >= len(raw):
+            return value
+        return cls(codec, type(value), payload)
+
+    def decompress(self) -> SelectType.Any_:
+        raw = COMPRESSION_CODECS[self.codec][1](self.payload)
+        if self.kind is str:
+            return raw.decode("utf-8")
+        return raw if self.kind is bytes else self.kind(raw)
+
+    def __repr__(self) -> SelectType.String_:
+        return repr(self.decompress())
+
+
+class DecompressedCache:
+    """Small LRU of decompressed values for hot keys, bounded by the bytes it holds.
+
+    Entries remember the `CompressedValue` they came from, so a key that was written
+    again never serves a stale value.
+    """
+
+    __slots__ = ("max_bytes", "_entries", "_bytes", "_lock")
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (CompressedValue, nilai, ukuran)
+        self._bytes = 0
+        self._lock = threading.Lock()  # Pembaca dalam mode "rw" berjalan bersamaan
+
+    def get(self, key: SelectType.String_, stored: CompressedValue) -> SelectType.Any_:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not stored:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: SelectType.String_, stored: CompressedValue, value: SelectType.Any_) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+            self._entries[key] = (stored, value, size)
+            self._bytes += size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class FunctionMemo:
+    """Bounded LRU of one stored function's results, with an optional time-to-live.
+
+    The owning struct measures each result and charges it to the function's key in
+    its size ledger; the memo keeps the sizes so it can report and give them back.
+    An expired result is a miss and is dropped when it is looked up, or when any new
+    result is stored; its bytes are owed to the ledger until ``sweep`` (or ``put``)
+    hands them back.
+    """
+
+    __slots__ = ("func", "max_entries", "ttl", "bytes", "_entries", "_stale", "_stats", "_lock")
+
+    def __init__(
+        self, func: SelectType.Any_, max_entries: int = 128, ttl: SelectType.Numeric_ = None
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("The TTL must be a positive number of seconds.")
+        self.func = func  # Memo hanya berlaku untuk fungsi yang sama persis
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries = OrderedDict()  # argumen -> (hasil, ukuran, tenggat)
+        self._stale = 0  # Byte hasil kedaluwarsa yang sudah dibuang, belum dikembalikan ke ledger
+        self._stats = dict.fromkeys(("hits", "misses", "evictions"), 0)
+        self._lock = threading.Lock()  # Hit tidak perlu mainsession
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> SelectType.String_:
+        return f"FunctionMemo(entries={len(self._entries)}, bytes={self.bytes})"
+
+    @staticmethod
+    def make_key(args: tuple, kwargs: dict):
+        """Return a hashable key for the call, or None when an argument is unhashable."""
+        key = args
+        if kwargs:
+            key += (FunctionMemo,) + tuple(sorted(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, args_key: SelectType.Any_, now: SelectType.Numeric_):
+        """Return ``(True, result)`` for a live cached result, ``(False, None)`` otherwise."""
+        with self._lock:
+            entry = self._entries.get(args_key)
+            if entry is None or (entry[2] is not None and entry[2] <= now):
+                if entry is not None:
+                    del self._entries[args_key]
+                    self.bytes -= entry[1]
+                    self._stale += entry[1]
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(args_key)
+            self._stats["hits"] += 1
+            return True, entry[0]
+
+    def put(
+        self,
+        args_key: SelectType.Any_,
+        value: SelectType.Any_,
+        size: SelectType.Numeric_,
+        now: SelectType.Numeric_,
+    ) -> SelectType.Numeric_:
+        """Store a result, dropping every expired one, and return the net change in bytes owed."""
+        deadline = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            swept = self._sweep(now)
+            old = self._entries.pop(args_key, None)
+            freed = 0 if old is None else old[1]
+            self._entries[args_key] = (value, size, deadline)
+            while len(self._entries) > self.max_entries:
+                freed += self._entries.popitem(last=False)[1][1]
+                self._stats["evictions"] += 1
+            self.bytes += size - freed
+            return size - freed - swept
+
+    @property
+    def stale(self) -> SelectType.Numeric_:
+        """Bytes of expired results `get` dropped that are still owed to the ledger."""
+        return self._stale
+
+    def sweep(self, now: SelectType.Numeric_) -> SelectType.Numeric_:
+        """Drop every expired result and return the bytes freed, plus those owed by `get`."""
+        with self._lock:
+            return self._sweep(now)
+
+    def _sweep(self, now: SelectType.Numeric_) -> SelectType.Numeric_:
+        freed, self._stale = self._stale, 0
+        if self.ttl is not None:
+            expired = [key for key, entry in self._entries.items() if entry[2] <= now]
+            for key in expired:
+                size = self._entries.pop(key)[1]
+                self.bytes -= size
+                freed += size
+        return freed
+
+    def shrink(self) -> SelectType.Numeric_:
+        """Drop the least recently used result and return its size (0 when empty)."""
+        with self._lock:
+            if not self._entries:
+                return 0
+            size = self._entries.popitem(last=False)[1][1]
+            self._stats["evictions"] += 1
+            self.bytes -= size
+            return size
+
+    def clear(self) -> SelectType.Numeric_:
+        """Drop every result and return the bytes they held, plus any still owed by `get`."""
+        with self._lock:
+            self._entries.clear()
+            freed, self.bytes = self.bytes + self._stale, 0
+            self._stale = 0
+            return freed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+            }
+
+
+def _json_default(value: SelectType.Any_) -> SelectType.Any_:
+    """`json.dumps` hook that serializes compressed str values as their text."""
+    if isinstance(value, CompressedValue):
+        value = value.decompress()
+        if isinstance(value, str):
+            return value
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def _write_json_object(fp, batches) -> int:
+    """Write ``(key, value)`` batches to ``fp`` as one JSON object; return the number of pairs."""
+    written = 0
+    fp.write("{")
+    for batch in batches:
+        pieces = []
+        for key, value in batch:
+            pieces.append(
+                ("" if written == 0 and not pieces else ", ")
+                + json.dumps(key) + ": " + json.dumps(value, default=_json_default)
+            )
+        if pieces:
+            written += len(pieces)
+            fp.write("".join(pieces))
+    fp.write("}")
+    return written
+
+
+def _iter_json_object(fp, block_size: int = 65536):
+    """Parse a top-level JSON object from ``fp`` incrementally and yield its ``(key, value)`` pairs.
+
+    Only the current pair and one read block are held in memory. ``fp`` may be opened in text
+    or binary (UTF-8) mode.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    whitespace = re.compile(r"\s*")
+    state = {"buffer": "", "eof": False, "want": block_size}
+
+    def fill() -> bool:
+        if state["eof"]:
+            return False
+        chunk = fp.read(state["want"])
+        if isinstance(chunk, bytes):
+            chunk = utf8.decode(chunk, final=not chunk)
+        if not chunk:
+            state["eof"] = True
+            return False
+        state["buffer"] += chunk
+        return True
+
+    def skip(pos: int) -> int:
+        # Lewati spasi; baca blok berikutnya bila buffer habis
+        while True:
+            pos = whitespace.match(state["buffer"], pos).end()
+            if pos < len(state["buffer"]) or not fill():
+                return pos
+
+    def decode(pos: int):
+        while True:
+            buffer = state["buffer"]
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                # Angka di ujung buffer ("-1", "1.", "1e") mungkin masih berlanjut di blok berikutnya
+                number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                if state["eof"] or (
+                    end < len(buffer) and (not number or buffer[end] in " \t\n\r,}")
+                ):
+                    state["want"] = block_size
+                    return value, end
+            except json.JSONDecodeError:
+                if state["eof"]:
+                    raise
+            state["want"] *= 2  # Nilai besar: baca blok yang makin besar
+            fill()
+
+    def expect(pos: int, char: str) -> int:
+        pos = skip(pos)
+        if state["buffer"][pos:pos + 1] != char:
+            raise ValueError(f"Expected {char!r} at offset {pos} of the JSON object stream.")
+        return pos + 1
+
+    pos = expect(0, "{")
+    pos = skip(pos)
+    if state["buffer"][pos:pos + 1] == "}":
+        return
+    while True:
+        key, pos = decode(skip(pos))
+        if not isinstance(key, str):
+            raise ValueError("JSON object keys must be strings.")
+        value, pos = decode(skip(expect(pos, ":")))
+        yield key, value
+        if pos > block_size:
+            # Buang bagian yang sudah diproses agar buffer tetap kecil
+            state["buffer"] = state["buffer"][pos:]
+            pos = 0
+        pos = skip(pos)
+        char = state["buffer"][pos:pos + 1]
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError(f"Expected ',' or '}}' in the JSON object stream, got {char!r}.")
+        pos += 1
+
+
+def _dump_json_object(target, batches) -> int:
+    """Write ``(key, value)`` batches as one JSON object to ``target``, a text file object or a path.
+
+    A path is written next to itself and moved into place once complete, as `write_snapshot`
+    does, so a value that cannot be serialized never leaves a truncated file behind.
+    """
+    if not isinstance(target, (str, os.PathLike)):
+        return _write_json_object(target, batches)
+    temp_path = f"{os.fspath(target)}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as fp:
+            written = _write_json_object(fp, batches)
+            fp.flush()
+            os.fsync(fp.fileno())
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, target)
+    return written
+
+
+def _load_json_object(source, insert_many, chunk_size: int, ttl: SelectType.Any_) -> Dict[str, int]:
+    """Feed the pairs of the JSON object in ``source`` (a file object or a path) to ``insert_many``.
+
+    ``chunk_size`` pairs are admitted per call; returns how many keys were "inserted",
+    "replaced" and "rejected".
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fp:
+            return _load_json_object(fp, insert_many, chunk_size, ttl)
+    counts = {"inserted": 0, "replaced": 0, "rejected": 0}
+    chunk = {}
+    for key, value in _iter_json_object(source):
+        chunk[key] = value
+        if len(chunk) >= chunk_size:
+            for status in insert_many(chunk, ttl).values():
+                counts[status] += 1
+            chunk = {}
+    if chunk:
+        for status in insert_many(chunk, ttl).values():
+            counts[status] += 1
+    return counts
+
+
+@functools.lru_cache(maxsize=256)
+def compile_like_pattern(pattern: SelectType.String_):
+    """Compile an SQL LIKE-style pattern (``%`` any run, ``?`` one character) once.
+
+    Returns ``(regex, prefix, prefix_only)`` where ``prefix`` is the literal text before the
+    first wildcard and ``prefix_only`` is true when the pattern is just ``prefix%``, so every
+    key carrying the prefix matches without running the regex.
+    """
+    parts = []
+    for char in pattern:
+        if char == "%":
+            parts.append(".*")  # Mengganti % dengan .*
+        elif char == "?":
+            parts.append(".")  # Mengganti ? dengan .
+        else:
+            parts.append(re.escape(char))
+    cut = min((i for i in (pattern.find("%"), pattern.find("?")) if i >= 0), default=len(pattern))
+    prefix = pattern[:cut]
+    prefix_only = pattern[cut:] == "%"
+    return re.compile("".join(parts) + r"\Z", re.DOTALL), prefix, prefix_only
+
+
 class RestrictedDict:
     """A dictionary that restricts certain keys and only allows specific operations."""
 
+    # Indeks terurut ikut diperbarui per kunci hanya untuk batch kecil; batch besar membangun ulang
+    INDEX_REBUILD_BATCH = 64
+    RESTRICTED_KEYS = frozenset(("__struct_name", "__lock"))
+
     def __init__(self, **entries: SelectType.Dict_):
         self._data = {}
+        self._sorted_keys = None  # Dibangun saat query prefix pertama
+        self.version = 0  # Bertambah pada setiap perubahan isi
         self.mainsession = {}
         for key, value in entries.items():
             if not self.is_restricted(key):
@@ -180,7 +741,14 @@ class RestrictedDict:
 
     def is_restricted(self, key: SelectType.String_) -> SelectType.Boolean_:
         """Defines restricted keys."""
-        return key in ["__struct_name", "__lock"]
+        return key in self.RESTRICTED_KEYS
+
+    @classmethod
+    def check_keys(cls, keys) -> None:
+        """Raise KeyError for a restricted key in ``keys``, before anything is written."""
+        restricted = cls.RESTRICTED_KEYS.intersection(keys)
+        if restricted:
+            raise KeyError(f"The key '{min(restricted)}' is restricted.")
 
     def pop(
         self, key: SelectType.String_, default: SelectType.Any_ = None
@@ -188,242 +756,2788 @@ class RestrictedDict:
         """Remove a key and return its value or a default value."""
         if self.is_restricted(key):
             raise KeyError(f"The key '{key}' is restricted.")
+        if key in self._data:
+            self.version += 1
+            if self._sorted_keys is not None and isinstance(key, str):
+                index = bisect.bisect_left(self._sorted_keys, key)
+                del self._sorted_keys[index]
         return self._data.pop(key, default)
 
     def update(self, other: SelectType.Dict_) -> None:
-        """Update the dictionary with the provided key-value pairs."""
+        """Update the dictionary with the provided key-value pairs.
+
+        Keys are stored in order and ``version`` grows by one per stored key, so a caller
+        can tell how many landed if this raises partway.
+        """
         for key, value in other.items():
-            if isinstance(value, dict):
-                # If a branch is a dictionary, wrap it in RestrictedDict
-                value = RestrictedDict(**value)
             if self.is_restricted(key):
                 raise KeyError(f"The key '{key}' is restricted.")
+            if isinstance(value, dict):
+                # Satu salinan dangkal per tulis: pemanggil tidak bisa mengubah isi store
+                # lewat dict miliknya; pembacaan memakai view tanpa salinan
+                value = dict(value)
+            if self._sorted_keys is not None and key not in self._data and isinstance(key, str):
+                if len(other) > self.INDEX_REBUILD_BATCH:
+                    self._sorted_keys = None  # Lebih murah dibangun ulang saat dibutuhkan
+                else:
+                    bisect.insort(self._sorted_keys, key)
             self._data[key] = value  # Use internal storage
+            self.version += 1
 
     def clear(self):
+        self.version += 1
         self._data.clear()
+        self._sorted_keys = None
 
     def __repr__(self) -> SelectType.String_:
         return f"{self._data}"
 
     def get(self, key: SelectType.String_, default: Any = None):
         """Retrieve items matching the given pattern or string."""
-        if key.startswith("%") and key.endswith("%"):
-            # Convert SQL LIKE to regex
-            regex_pattern = key[1:-1].replace("%", ".*")  # Mengganti % dengan .*
-            regex_pattern = regex_pattern.replace("?", ".")  # Mengganti ? dengan .
-            regex = re.compile(f"^{regex_pattern}$")
-
+        if key.startswith("%") and key.endswith("%") and len(key) > 1:
             # Find the first item that matches
-            for key, value in self.items():
-                if regex.match(key):
-                    return value  # Return the first matching value
+            for _, value in self.iter_matching(key[1:-1]):
+                return value  # Return the first matching value
 
         return self._data.get(key, default)  # Return default if no match is found
 
+    def iter_matching(self, pattern: SelectType.String_):
+        """Yield every ``(key, value)`` whose key matches the LIKE ``pattern``.
 
-memory_warning_triggered: SelectType.Boolean_ = False
-max_memory_usage: SelectType.Numeric_ = 0
+        Patterns with a literal prefix are resolved through the sorted key index in
+        O(log n + k) and yield in key order; the others scan every key in insertion order.
+        The dictionary must not change while the generator is being consumed.
+        """
+        regex, prefix, prefix_only = compile_like_pattern(pattern)
+        if not prefix:
+            for key, value in self._data.items():
+                if isinstance(key, str) and regex.match(key):
+                    yield key, value
+            return
+        if prefix_only is False and len(prefix) == len(pattern):
+            if pattern in self._data:  # Tanpa wildcard: pencarian langsung
+                yield pattern, self._data[pattern]
+            return
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(key for key in self._data if isinstance(key, str))
+        keys = self._sorted_keys
+        index = bisect.bisect_left(keys, prefix)
+        while index < len(keys) and keys[index].startswith(prefix):
+            key = keys[index]
+            if prefix_only or regex.match(key):
+                yield key, self._data[key]
+            index += 1
+
+    def find_all(self, pattern: SelectType.String_) -> SelectType.Dict_:
+        """Return a dict of every item whose key matches the LIKE ``pattern``."""
+        return dict(self.iter_matching(pattern))
+
+
+class SizeLedger:
+    """Running record of the measured size of every stored key.
+
+    Each key's size is measured once when it is written, so admission checks can
+    read the store total in O(1) instead of walking every stored value again.
+    """
 
+    __slots__ = ("_sizes", "_total")
 
-def MemoryUsage():
-    global max_memory_usage, memory_warning_triggered
-    total_memory = psutil.virtual_memory().total
-    satuan = ["bytes", "KB", "MB", "GB"]
-    i = 0
-    while total_memory >= 1024 and i < len(satuan) - 1:
-        total_memory /= 1024
-        i += 1
-    print(f"Total memory: {total_memory:.2f} {satuan[i]}")
+    def __init__(self) -> None:
+        self._sizes: Dict[str, int] = {}
+        self._total: int = 0
 
+    def __len__(self) -> int:
+        return len(self._sizes)
 
-def getMemory(total_memory: SelectType.Numeric_) -> SelectType.String_:
-    satuan = ["bytes", "KB", "MB", "GB"]
-    i = 0
-    while total_memory >= 1024 and i < len(satuan) - 1:
-        total_memory /= 1024
-        i += 1
-    return satuan[i]
+    def __contains__(self, key: SelectType.String_) -> SelectType.Boolean_:
+        return key in self._sizes
 
+    def __repr__(self) -> SelectType.String_:
+        return f"SizeLedger(keys={len(self._sizes)}, total={self._total})"
 
-class MemoryAwareStruct(SelectType):
-    """
-    A class designed to manage structured data with memory awareness.
-    
-    This class allows for the secure manipulation of data in a dictionary-like structure 
-    while ensuring that memory usage is monitored and controlled. The data can be accessed 
-    and functions can be executed dynamically, with thread safety in mind.
-    
-    Args:
-            memory_default (int, optional): An optional parameter to specify the default maximum 
-                                            memory usage for this instance. If not provided, 
-                                            the instance will rely on global memory settings.
-            **entries (SelectType.Dict_): Key-value pairs to initialize the internal data structure. 
-                                        This allows for flexible initialization with multiple entries.
-    """
-    __slots__: SelectType.List_ = [
-        "__struct_name",
-        "_lock",
-        "__data",
-        "max_memory_usage",
-        "memory_warning_triggered",
-    ]
+    @property
+    def total(self) -> int:
+        """Total measured size of all recorded keys, in bytes."""
+        return self._total
 
-    def __init__(self, memory_default: int = None, **entries: SelectType.Dict_) -> None:
-        """
-        Initializes the MemoryAwareStruct with optional memory constraints and initial entries.
+    def size_of(self, key: SelectType.String_, default: int = 0) -> int:
+        """Return the recorded size of ``key`` or ``default`` if it is not tracked."""
+        return self._sizes.get(key, default)
 
-        This constructor sets up the instance of the MemoryAwareStruct class, allowing for the 
-        configuration of memory usage limits and populating the internal data structure with 
-        provided entries. It also handles thread safety and initializes a global memory 
-        monitoring system.
+    def delta(self, key: SelectType.String_, size: int) -> int:
+        """Return how much the total would change if ``key`` were recorded with ``size``."""
+        return size - self._sizes.get(key, 0)
 
-        Args:
-            memory_default (int, optional): An optional parameter to specify the default maximum 
-                                            memory usage for this instance. If not provided, 
-                                            the instance will rely on global memory settings.
-            **entries (SelectType.Dict_): Key-value pairs to initialize the internal data structure. 
-                                        This allows for flexible initialization with multiple entries.
+    def record(self, key: SelectType.String_, size: int) -> int:
+        """Record ``size`` for ``key`` and return the change applied to the total."""
+        change = size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+        self._total += change
+        return change
 
-        Behavior:
-            - Initializes the instance variable __struct_name with the name of the class.
-            - If a memory warning has not been triggered, it invokes MemoryUsage() to start monitoring.
-            - If memory_default is provided, it sets the instance's max_memory_usage and initializes
-            memory_warning_triggered to False.
-            - Creates an instance of RestrictedDict to hold the provided entries, ensuring that only
-            allowed operations can be performed on the data.
-            - Assigns a threading lock (self.__data.mainsession) to the __data attribute to manage concurrency
-            and ensure thread-safe operations.
-            - If the instance does not specify a max_memory_usage, it uses a global memory limit.
-            - If there are existing entries in the internal data structure, it adjusts the max_memory_usage
-            by deducting the size of the currently stored data.
+    def discard(self, key: SelectType.String_) -> int:
+        """Forget ``key`` and return the size that was credited back to the total."""
+        size = self._sizes.pop(key, 0)
+        self._total -= size
+        return size
 
-        Raises:
-            ValueError: If the provided entries exceed the allowed memory limits when the instance is created."""
-        global max_memory_usage, memory_warning_triggered
-        self.__struct_name = self.__class__.__name__  # Private variable
-        if memory_warning_triggered == False:
-            MemoryUsage()
+    def clear(self) -> int:
+        """Forget every key and return the size that was credited back."""
+        released = self._total
+        self._sizes.clear()
+        self._total = 0
+        return released
 
-        if memory_default:  # Memisahkan memori instance dari memori global
-            self.max_memory_usage: SelectType.Numeric_ = memory_default
-            self.memory_warning_triggered: SelectType.Boolean_ = False
 
-        self.__data = RestrictedDict(**entries)  # Gunakan RestrictedDict
-        self.__data.mainsession = threading.Lock()  # Lock untuk concurrency
+_size_fast_paths: Dict[type, Any] = {}
+_size_fast_paths_version: int = 0
 
-        # Jika instance tidak memiliki batas memori, gunakan batas memori global
-        if not self.__get_attribute__("max_memory_usage"):
-            max_memory_usage = self.__get_max_allowed_memory__()
-        else:
-            if self.__data._data.__len__() > 0:
-                self.max_memory_usage = self.max_memory_usage - self.__get_total_size__(
-                    self.__data._data
-                )
-            # Kurangi batas memori global dengan memori instance
-            # if not memory_warning_triggered and max_memory_usage:
-            #    max_memory_usage = max_memory_usage - self.max_memory_usage
-            # elif max_memory_usage<=0:
-            #    max_memory_usage = self.__get_max_allowed_memory__() - self.max_memory_usage
 
-    def __setattr__(self, name: SelectType.String_, value: SelectType.Any_) -> None:
-        if name in ["__dict__"]:
-            raise AttributeError(
-                f"Direct updates to '{name}' are not allowed. Please use insert or update."
-            )
-        super().__setattr__(name, value)
+def register_size_fast_path(cls: type, func: SelectType.Any_) -> None:
+    """Register ``func(obj) -> int`` as the size of every ``cls`` value for all estimators.
 
-    def __delattr__(self, name: SelectType.String_) -> None:
-        """Prevent deletion of __dict__."""
-        if name in ["__dict__", "__struct_name"]:
-            raise AttributeError(f"Deleting '{name}' is not allowed.")
-        super().__delattr__(name)
+    Registered values are not walked any further, so the function must account for
+    everything the value owns.
+    """
+    global _size_fast_paths_version
+    _size_fast_paths[cls] = func
+    _size_fast_paths_version += 1
+
+
+def _iter_children(obj: SelectType.Any_):
+    """Yield the objects owned by ``obj`` that a recursive size walk should visit."""
+    if hasattr(obj, "__dict__"):
+        yield from obj.__dict__.values()
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for slot in slots:
+            if slot in ("__dict__", "__weakref__"):
+                continue
+            if slot.startswith("__") and not slot.endswith("__"):
+                slot = f"_{cls.__name__.lstrip('_')}{slot}"  # Nama slot private
+            try:
+                yield object.__getattribute__(obj, slot)
+            except AttributeError:
+                continue
+    if hasattr(obj, "__dict__") or not hasattr(obj, "__iter__"):
+        return
+    if isinstance(obj, (str, bytes, bytearray)) or iter(obj) is obj:
+        # Jangan habiskan iterator/generator saat diukur
+        return
+    if hasattr(obj, "keys"):  # for dictionary
+        for key in obj:
+            yield obj[key]
+    else:
+        yield from obj
+
+
+class SizeEstimator:
+    """Base strategy used by ``MemoryAwareStruct.__get_total_size__`` to size a value.
+
+    Every strategy first consults the type-registered fast paths (per estimator, then
+    the ones registered with ``register_size_fast_path``) and the ``__memory_size__``
+    protocol, so user classes can declare their own size.
+    """
 
-    def __dir__(self):
-        """Block the dir() function."""
-        raise AttributeError("The use of dir() on this class is not allowed.")
+    name: SelectType.String_ = "base"
 
-    def __enter__(self):
-        return self
+    def __init__(self) -> None:
+        self._fast_paths: Dict[type, Any] = {}
+        self._resolved: Dict[type, Any] = {}
+        self._resolved_version: int = -1
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type:
-            print(f"Error: {exc_val}")
-        else:
-            print("No errors occurred.")
+    def __repr__(self) -> SelectType.String_:
+        return f"{self.__class__.__name__}()"
+
+    def register(self, cls: type, func: SelectType.Any_) -> None:
+        """Register a fast path that only applies to this estimator."""
+        self._fast_paths[cls] = func
+        self._resolved.clear()
+
+    def fast_size(self, obj: SelectType.Any_) -> Union[int, None]:
+        """Return the size of ``obj`` from a fast path, or None if it has to be walked."""
+        if self._resolved_version != _size_fast_paths_version:
+            self._resolved.clear()
+            self._resolved_version = _size_fast_paths_version
+        kind = type(obj)
+        try:
+            func = self._resolved[kind]
+        except KeyError:
+            func = getattr(kind, "__memory_size__", None)
+            if func is None:
+                for cls in kind.__mro__:
+                    func = self._fast_paths.get(cls) or _size_fast_paths.get(cls)
+                    if func is not None:
+                        break
+            self._resolved[kind] = func
+        if func is None:
+            return None
+        return int(func(obj))
+
+    def estimate(self, obj: SelectType.Any_) -> int:
+        """Return the estimated size of ``obj`` in bytes."""
+        raise NotImplementedError
+
+
+class ExactSizeEstimator(SizeEstimator):
+    """Walk ``__dict__``, ``__slots__``, mappings and iterables recursively (the default)."""
+
+    name = "exact"
+
+    def estimate(self, obj: SelectType.Any_) -> int:
+        seen = set()
 
-    @property
-    def __dict__(self):
-        raise AttributeError("Cannot access __dict__ because not allowed.")
+        def _recursive_size(item):
+            if id(item) in seen:
+                return 0
+            seen.add(id(item))
+            size = self.fast_size(item)
+            if size is not None:
+                return size
+            size = sys.getsizeof(item)
+            for child in _iter_children(item):
+                size += _recursive_size(child)
+            return size
 
-    @property
-    def struct_name(self) -> SelectType.String_:
-        """
-        Property to retrieve the structure name.
+        return _recursive_size(obj)
 
-        This property returns the name of the structure stored in the instance.
-        It ensures thread-safe access to the structure name.
 
-        Returns:
-            SelectType.String_: The name of the structure.
+class ShallowSizeEstimator(SizeEstimator):
+    """Only measure the top-level object; the cheapest and least precise strategy."""
 
-        Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe access when reading the structure name.
-        """
-        with self.__data.mainsession:  # Lock saat akses
-            return self.__struct_name
+    name = "shallow"
 
-    
-    def set_name(self, params: SelectType.String_) -> None:
-        """
-        Function to set the name of the structure.
+    def estimate(self, obj: SelectType.Any_) -> int:
+        size = self.fast_size(obj)
+        if size is not None:
+            return size
+        return sys.getsizeof(obj)
 
-        This function allows setting the name of the structure only once. If the structure name is
-        currently set to "Struct", it can be modified. Otherwise, a ValueError is raised.
 
-        Args:
-            params (SelectType.String_): The new name to set for the structure.
+class SampledSizeEstimator(SizeEstimator):
+    """Walk recursively, but extrapolate large containers from a sample of their items.
 
-        Raises:
-            ValueError: If the structure name has already been set to a value other than "Struct".
+    Args:
+        sample_size (int): Containers with more items than this are measured by sizing
+                           ``sample_size`` evenly spaced items and scaling the average.
+    """
 
-        Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe modification of the structure name.
-            - Checks if the current structure name is "Struct" before allowing the modification.
-        """
-        with self.__data.mainsession:  # Lock saat modifikasi
-            if (
-                self.__struct_name == "Struct" and self.__struct_name
-            ):  # Can only set once
-                self.__struct_name = params
-            else:
-                raise ValueError("Struct name can only be set once.")
+    name = "sampled"
 
-    
-    def get(
-        self, key: SelectType.String_, default: SelectType.Any_ = None
-    ) -> SelectType.Any_:
-        """
-        Function to retrieve a value from the dictionary based on the provided key.
+    def __init__(self, sample_size: int = 32) -> None:
+        super().__init__()
+        if sample_size < 1:
+            raise ValueError("sample_size must be at least 1.")
+        self.sample_size = sample_size
 
-        This function returns the value associated with the specified key in the dictionary.
-        If the key does not exist, it returns a default value.
+    def __repr__(self) -> SelectType.String_:
+        return f"{self.__class__.__name__}(sample_size={self.sample_size})"
 
-        Args:
-            key (SelectType.String_): The key whose value is to be retrieved from the dictionary.
-            default (SelectType.Any_, optional): The value to return if the key is not found. Default is None.
+    def estimate(self, obj: SelectType.Any_) -> int:
+        seen = set()
 
-        Returns:
+        def _recursive_size(item):
+            if id(item) in seen:
+                return 0
+            seen.add(id(item))
+            size = self.fast_size(item)
+            if size is not None:
+                return size
+            size = sys.getsizeof(item)
+            try:
+                count = len(item)
+            except TypeError:
+                count = 0
+            if count > self.sample_size and not hasattr(item, "__dict__"):
+                step = count // self.sample_size
+                sample = itertools.islice(_iter_children(item), 0, None, step)
+                sizes = [_recursive_size(child) for child in sample]
+                if sizes:
+                    size += round(sum(sizes) / len(sizes) * count)
+                return size
+            for child in _iter_children(item):
+                size += _recursive_size(child)
+            return size
+
+        return _recursive_size(obj)
+
+
+SIZE_ESTIMATORS: Dict[str, type] = {
+    ExactSizeEstimator.name: ExactSizeEstimator,
+    ShallowSizeEstimator.name: ShallowSizeEstimator,
+    SampledSizeEstimator.name: SampledSizeEstimator,
+}
+
+for _cls in (str, bytes, bytearray, int, float, complex, type(None)):
+    register_size_fast_path(_cls, sys.getsizeof)
+register_size_fast_path(memoryview, lambda view: sys.getsizeof(view) + view.nbytes)
+register_size_fast_path(array.array, sys.getsizeof)
+
+
+class EvictionPolicy:
+    """Base class for the policies that choose which keys to evict when the budget is hit.
+
+    The struct reports every write (``admit``), read (``touch``), explicit removal
+    (``remove``) and eviction (``evict``); ``victim`` names the next key to evict. All
+    operations are O(1). ``mutex`` serializes ``touch`` calls made by concurrent readers.
+    """
+
+    name: SelectType.String_ = "base"
+
+    def __init__(self) -> None:
+        self.mutex = threading.Lock()
+
+    def __repr__(self) -> SelectType.String_:
+        return f"{self.__class__.__name__}(keys={len(self)})"
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def admit(self, key: SelectType.String_) -> None:
+        """Record that ``key`` was written."""
+        raise NotImplementedError
+
+    def touch(self, key: SelectType.String_) -> None:
+        """Record that ``key`` was read."""
+        raise NotImplementedError
+
+    def remove(self, key: SelectType.String_) -> None:
+        """Forget ``key`` after an explicit removal such as ``pop``."""
+        raise NotImplementedError
+
+    def evict(self, key: SelectType.String_) -> None:
+        """Forget ``key`` after it was evicted."""
+        self.remove(key)
+
+    def victim(self, exclude=()) -> Union[str, None]:
+        """Return the next key to evict that is not in ``exclude``, or None."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Forget every key."""
+        raise NotImplementedError
+
+
+class LRUPolicy(EvictionPolicy):
+    """Evict the least recently used key."""
+
+    name = "lru"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def admit(self, key: SelectType.String_) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def touch(self, key: SelectType.String_) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def remove(self, key: SelectType.String_) -> None:
+        self._order.pop(key, None)
+
+    def victim(self, exclude=()) -> Union[str, None]:
+        for key in self._order:
+            if key not in exclude:
+                return key
+        return None
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class LFUPolicy(EvictionPolicy):
+    """Evict the least frequently used key, oldest first among equal counts."""
+
+    name = "lfu"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._counts: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_count = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _unlink(self, key: SelectType.String_, count: int) -> None:
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+
+    def _bump(self, key: SelectType.String_) -> None:
+        count = self._counts[key]
+        self._unlink(key, count)
+        if count == self._min_count and count not in self._buckets:
+            self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def admit(self, key: SelectType.String_) -> None:
+        if key in self._counts:
+            self._bump(key)
+            return
+        self._counts[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_count = 1
+
+    def touch(self, key: SelectType.String_) -> None:
+        if key in self._counts:
+            self._bump(key)
+
+    def remove(self, key: SelectType.String_) -> None:
+        count = self._counts.pop(key, None)
+        if count is not None:
+            self._unlink(key, count)
+
+    def victim(self, exclude=()) -> Union[str, None]:
+        if not self._buckets:
+            return None
+        if self._min_count not in self._buckets:
+            # Hanya terjadi setelah remove(); jumlah frekuensi berbeda biasanya kecil
+            self._min_count = min(self._buckets)
+        for key in self._buckets[self._min_count]:
+            if key not in exclude:
+                return key
+        for count in sorted(self._buckets):
+            for key in self._buckets[count]:
+                if key not in exclude:
+                    return key
+        return None
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._buckets.clear()
+        self._min_count = 0
+
+
+class ARCPolicy(EvictionPolicy):
+    """Adaptive Replacement Cache: balances recency (T1) and frequency (T2).
+
+    Evicted keys are remembered in the ghost lists B1/B2; writing a ghost key again
+    shifts the target size ``p`` of T1 towards the list that would have kept it. The
+    cache size ``c`` is the number of resident keys, since the struct is bounded by
+    bytes rather than by a key count.
+    """
+
+    name = "arc"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._t1: "OrderedDict[str, None]" = OrderedDict()
+        self._t2: "OrderedDict[str, None]" = OrderedDict()
+        self._b1: "OrderedDict[str, None]" = OrderedDict()
+        self._b2: "OrderedDict[str, None]" = OrderedDict()
+        self._p = 0.0
+
+    def __len__(self) -> int:
+        return len(self._t1) + len(self._t2)
+
+    def admit(self, key: SelectType.String_) -> None:
+        if key in self._t1:
+            del self._t1[key]
+            self._t2[key] = None
+        elif key in self._t2:
+            self._t2.move_to_end(key)
+        elif key in self._b1:
+            self._p = min(
+                float(len(self)), self._p + max(len(self._b2) / len(self._b1), 1.0)
+            )
+            del self._b1[key]
+            self._t2[key] = None
+        elif key in self._b2:
+            self._p = max(0.0, self._p - max(len(self._b1) / len(self._b2), 1.0))
+            del self._b2[key]
+            self._t2[key] = None
+        else:
+            self._t1[key] = None
+
+    def touch(self, key: SelectType.String_) -> None:
+        if key in self._t1:
+            del self._t1[key]
+            self._t2[key] = None
+        elif key in self._t2:
+            self._t2.move_to_end(key)
+
+    def remove(self, key: SelectType.String_) -> None:
+        for part in (self._t1, self._t2, self._b1, self._b2):
+            part.pop(key, None)
+
+    def evict(self, key: SelectType.String_) -> None:
+        if key in self._t1:
+            del self._t1[key]
+            self._b1[key] = None
+        elif key in self._t2:
+            del self._t2[key]
+            self._b2[key] = None
+        # Daftar ghost dibatasi sebanyak key yang masih tersimpan
+        capacity = max(len(self), 1)
+        while len(self._b1) + len(self._b2) > capacity:
+            ghost = self._b1 if len(self._b1) >= len(self._b2) else self._b2
+            ghost.popitem(last=False)
+
+    def victim(self, exclude=()) -> Union[str, None]:
+        if self._t1 and (len(self._t1) > self._p or not self._t2):
+            order = (self._t1, self._t2)
+        else:
+            order = (self._t2, self._t1)
+        for part in order:
+            for key in part:
+                if key not in exclude:
+                    return key
+        return None
+
+    def clear(self) -> None:
+        for part in (self._t1, self._t2, self._b1, self._b2):
+            part.clear()
+        self._p = 0.0
+
+
+EVICTION_POLICIES: Dict[str, type] = {
+    LRUPolicy.name: LRUPolicy,
+    LFUPolicy.name: LFUPolicy,
+    ARCPolicy.name: ARCPolicy,
+}
+
+
+class TimerWheel:
+    """Hierarchical timer wheel that tells which keys have reached their deadline.
+
+    Level 0 has one slot per ``tick``; each higher level covers ``slots`` slots of the
+    level below and is cascaded down when the wheel reaches it. Scheduling and
+    cancelling are O(1), and ``advance`` does amortized O(1) work per elapsed tick
+    plus the keys that expire. Deadlines beyond the top level wait in an overflow set
+    that is re-placed on every top-level cascade.
+
+    Args:
+        tick (float): Resolution in seconds.
+        slots (int): Slots per level.
+        levels (int): Number of levels.
+    """
+
+    def __init__(
+        self,
+        tick: SelectType.Numeric_ = 0.1,
+        slots: int = 64,
+        levels: int = 4,
+    ) -> None:
+        self.tick = tick
+        self._slots = slots
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._overflow = set()
+        self._deadlines: Dict[str, int] = {}  # key -> tick tenggat
+        self._where: Dict[str, Any] = {}  # key -> set tempat key berada
+        self._current = int(time.monotonic() / tick)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __repr__(self) -> SelectType.String_:
+        return f"TimerWheel(tick={self.tick}, keys={len(self._deadlines)})"
+
+    def schedule(self, key: SelectType.String_, deadline: SelectType.Numeric_) -> None:
+        """Schedule ``key`` to expire at ``deadline`` (a ``time.monotonic()`` value)."""
+        self.cancel(key)
+        due = max(math.ceil(deadline / self.tick), self._current + 1)
+        self._deadlines[key] = due
+        self._place(key, due)
+
+    def cancel(self, key: SelectType.String_) -> None:
+        """Forget ``key`` if it is scheduled."""
+        bucket = self._where.pop(key, None)
+        if bucket is not None:
+            bucket.discard(key)
+            del self._deadlines[key]
+
+    def clear(self) -> None:
+        """Forget every scheduled key."""
+        for wheel in self._wheels:
+            for bucket in wheel:
+                bucket.clear()
+        self._overflow.clear()
+        self._deadlines.clear()
+        self._where.clear()
+
+    def _place(self, key: SelectType.String_, due: int) -> None:
+        delta = due - self._current
+        for level, wheel in enumerate(self._wheels):
+            if delta < self._spans[level + 1]:
+                bucket = wheel[(due // self._spans[level]) % self._slots]
+                break
+        else:
+            bucket = self._overflow
+        bucket.add(key)
+        self._where[key] = bucket
+
+    def _cascade(self, bucket: set, expired: list) -> None:
+        keys = list(bucket)
+        bucket.clear()
+        for key in keys:
+            due = self._deadlines[key]
+            if due <= self._current:
+                del self._deadlines[key]
+                del self._where[key]
+                expired.append(key)
+            else:
+                self._place(key, due)
+
+    def advance(self, now: SelectType.Numeric_ = None) -> list:
+        """Move the wheel up to ``now`` and return the keys whose deadline has passed."""
+        target = int((time.monotonic() if now is None else now) / self.tick)
+        expired: list = []
+        if not self._deadlines:
+            self._current = max(self._current, target)  # Roda kosong, lompati semua tick
+            return expired
+        while self._current < target:
+            self._current += 1
+            for level in range(1, len(self._wheels)):
+                if self._current % self._spans[level]:
+                    break
+                index = (self._current // self._spans[level]) % self._slots
+                self._cascade(self._wheels[level][index], expired)
+            else:
+                self._cascade(self._overflow, expired)
+            self._cascade(self._wheels[0][self._current % self._slots], expired)
+            if not self._deadlines:
+                self._current = target
+        return expired
+
+
+class ReadWriteLock:
+    """A lock that lets many readers in at once while writers stay exclusive.
+
+    The write side has the same ``acquire``/``release``/``with`` interface as
+    ``threading.Lock``, so it can stand in for ``mainsession`` everywhere; readers use
+    ``read()``. With ``writer_preference`` new readers wait while a writer is queued,
+    so a steady stream of reads cannot starve writers. Read locks are not reentrant
+    when a writer is waiting.
+
+    Args:
+        writer_preference (bool): Block new readers while a writer is waiting.
+    """
+
+    def __init__(self, writer_preference: SelectType.Boolean_ = True) -> None:
+        self.writer_preference = writer_preference
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def __repr__(self) -> SelectType.String_:
+        return (
+            f"ReadWriteLock(readers={self._readers}, writer={self._writer}, "
+            f"writer_preference={self.writer_preference})"
+        )
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def _can_read(self) -> SelectType.Boolean_:
+        if self._writer:
+            return False
+        return not (self.writer_preference and self._waiting_writers)
+
+    def _can_write(self) -> SelectType.Boolean_:
+        return not self._writer and not self._readers
+
+    def acquire_read(
+        self, blocking: SelectType.Boolean_ = True, timeout: SelectType.Numeric_ = -1
+    ) -> SelectType.Boolean_:
+        """Acquire a shared read lock."""
+        with self._cond:
+            if not self._can_read():
+                if not blocking:
+                    return False
+                if not self._cond.wait_for(
+                    self._can_read, None if timeout < 0 else timeout
+                ):
+                    return False
+            self._readers += 1
+            return True
+
+    def release_read(self) -> None:
+        """Release a shared read lock."""
+        with self._cond:
+            if self._readers <= 0:
+                raise RuntimeError("release_read() called without a read lock.")
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire(
+        self, blocking: SelectType.Boolean_ = True, timeout: SelectType.Numeric_ = -1
+    ) -> SelectType.Boolean_:
+        """Acquire the exclusive write lock."""
+        with self._cond:
+            if not self._can_write():
+                if not blocking:
+                    return False
+                self._waiting_writers += 1
+                try:
+                    acquired = self._cond.wait_for(
+                        self._can_write, None if timeout < 0 else timeout
+                    )
+                finally:
+                    self._waiting_writers -= 1
+                if not acquired:
+                    self._cond.notify_all()  # Pembaca yang tertahan boleh lanjut
+                    return False
+            self._writer = True
+            return True
+
+    def release(self) -> None:
+        """Release the exclusive write lock."""
+        with self._cond:
+            if not self._writer:
+                raise RuntimeError("release() called without the write lock.")
+            self._writer = False
+            self._cond.notify_all()
+
+    def locked(self) -> SelectType.Boolean_:
+        """Whether a writer or any reader currently holds the lock."""
+        return self._writer or self._readers > 0
+
+    @contextlib.contextmanager
+    def read(self):
+        """Context manager holding a shared read lock."""
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+
+class SnapshotFile:
+    """A snapshot written by `write_snapshot`, opened through a read-only memory map.
+
+    Layout: a fixed header (magic, entry count, index offset), the pickled values back to
+    back, then an index of ``(key length, value offset, value length, expiry)`` records each
+    followed by the UTF-8 key. Opening reads only the header and the index; values are
+    unpickled one at a time by `read` when they are first needed.
+
+    Snapshots are pickles: only load files this process (or one you trust) has written.
+    """
+
+    MAGIC = b"MASNAP01"
+    HEADER = struct.Struct("<8sQQ")
+    ENTRY = struct.Struct("<IQQd")  # expiry: waktu epoch, 0 berarti tanpa TTL
+
+    __slots__ = ("path", "entries", "_file", "_map")
+
+    def __init__(self, path: SelectType.String_) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = None
+        try:
+            if os.fstat(self._file.fileno()).st_size < self.HEADER.size:
+                raise ValueError(f"{path} is not a snapshot file.")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, pos = self.HEADER.unpack_from(self._map, 0)
+            if magic != self.MAGIC:
+                raise ValueError(f"{path} is not a snapshot file.")
+            entries: Dict[str, tuple] = {}
+            for _ in range(count):
+                key_length, offset, length, expires = self.ENTRY.unpack_from(self._map, pos)
+                pos += self.ENTRY.size
+                key = self._map[pos:pos + key_length].decode("utf-8")
+                pos += key_length
+                entries[key] = (offset, length, expires)
+            self.entries = entries
+        except BaseException:
+            self.close()
+            raise
+
+    def __repr__(self) -> SelectType.String_:
+        return f"SnapshotFile({self.path!r}, keys={len(self.entries)})"
+
+    def raw(self, offset: int, length: int) -> bytes:
+        """Return the pickled bytes of one value."""
+        return self._map[offset:offset + length]
+
+    def read(self, offset: int, length: int) -> SelectType.Any_:
+        """Unpickle one value."""
+        return pickle.loads(self._map[offset:offset + length])
+
+    def release(self, offset: int, length: int) -> None:
+        """Nothing to free: the file stays as written."""
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class ColdTier:
+    """Disk tier for entries demoted out of memory, kept in a local sqlite3 file.
+
+    It is a cache, not persistence: the table is emptied when the tier is opened. Values are
+    stored pickled together with their expiry (epoch seconds, 0 for none). The connection is
+    shared between threads behind its own lock, because promotions read outside the struct lock.
+    """
+
+    __slots__ = ("path", "_conn", "_lock")
+
+    def __init__(self, path: SelectType.String_) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("DROP TABLE IF EXISTS cold")
+        self._conn.execute(
+            "CREATE TABLE cold (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cold").fetchone()[0]
+
+    def __repr__(self) -> SelectType.String_:
+        return f"ColdTier({self.path!r})"
+
+    def put(self, key: SelectType.String_, payload: bytes, expires: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cold (key, value, expires) VALUES (?, ?, ?)",
+                (key, payload, expires),
+            )
+
+    def raw(self, key: SelectType.String_, _unused: int = 0) -> bytes:
+        """Return the pickled bytes of ``key``; KeyError if it is no longer stored."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cold WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def read(self, key: SelectType.String_, _unused: int = 0) -> SelectType.Any_:
+        return pickle.loads(self.raw(key))
+
+    def release(self, key: SelectType.String_, _unused: int = 0) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cold WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cold")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def write_snapshot(path: SelectType.String_, entries) -> int:
+    """Write ``(key, pickled value, expiry epoch or 0)`` entries as a snapshot file.
+
+    The file is written next to ``path`` and moved into place once complete, so a crash
+    never leaves a truncated snapshot behind. Returns the number of entries written.
+    """
+    header, record = SnapshotFile.HEADER, SnapshotFile.ENTRY
+    temp_path = f"{path}.tmp"
+    index = []
+    with open(temp_path, "wb") as fp:
+        fp.write(header.pack(SnapshotFile.MAGIC, 0, 0))
+        offset = header.size
+        for key, payload, expires in entries:
+            fp.write(payload)
+            index.append((key.encode("utf-8"), offset, len(payload), expires))
+            offset += len(payload)
+        for key, value_offset, length, expires in index:
+            fp.write(record.pack(len(key), value_offset, length, expires))
+            fp.write(key)
+        fp.seek(0)
+        fp.write(header.pack(SnapshotFile.MAGIC, len(index), offset))
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(temp_path, path)
+    return len(index)
+
+
+class CgroupMemory:
+    """Memory limit and usage of the cgroup (v1 or v2) this process runs in.
+
+    Inside a container ``psutil.virtual_memory()`` still reports the host, while the
+    kernel OOM-kills the container at its cgroup limit. The cgroup is found once from
+    ``/proc/self/cgroup`` and ``/proc/self/mountinfo``; the limit and usage files are
+    read again on every call, so limits changed at runtime are picked up.
+
+    Args:
+        proc (str): The ``/proc`` directory of the process to inspect.
+    """
+
+    # cgroup v1 melaporkan "tanpa batas" sebagai angka raksasa yang dibulatkan ke halaman
+    UNLIMITED = 1 << 60
+
+    __slots__ = ("version", "directories")
+
+    def __init__(self, proc: SelectType.String_ = "/proc/self") -> None:
+        self.version, self.directories = self._discover(proc)
+
+    def __repr__(self) -> SelectType.String_:
+        return f"CgroupMemory(version={self.version}, limit={self.limit()}, usage={self.usage()})"
+
+    @classmethod
+    def _discover(cls, proc: SelectType.String_):
+        """Return the cgroup version and its directories, from the process's own up to the mount."""
+        try:
+            with open(os.path.join(proc, "cgroup"), encoding="utf-8") as fp:
+                memberships = fp.read().splitlines()
+            with open(os.path.join(proc, "mountinfo"), encoding="utf-8") as fp:
+                mounts = fp.read().splitlines()
+        except OSError:
+            return None, []  # Bukan Linux, atau /proc tidak tersedia
+        v1_path = v2_path = None
+        for line in memberships:
+            parts = line.split(":", 2)
+            if len(parts) != 3:
+                continue
+            if parts[0] == "0" and parts[1] == "":
+                v2_path = parts[2]
+            elif "memory" in parts[1].split(","):
+                v1_path = parts[2]
+        v2_mount = None
+        for line in mounts:
+            fields = line.split()
+            if "-" not in fields:
+                continue
+            separator = fields.index("-")
+            if len(fields) < separator + 4:
+                continue
+            root, mount_point = fields[3], fields[4]
+            fstype, options = fields[separator + 1], fields[separator + 3].split(",")
+            # Mode hybrid: controller memory v1 lebih diutamakan daripada cgroup2 yang kosong
+            if fstype == "cgroup" and "memory" in options and v1_path is not None:
+                return 1, cls._ancestors(mount_point, root, v1_path)
+            if fstype == "cgroup2" and v2_path is not None and v2_mount is None:
+                v2_mount = (mount_point, root)
+        if v1_path is None and v2_mount is not None:
+            return 2, cls._ancestors(v2_mount[0], v2_mount[1], v2_path)
+        return None, []
+
+    @staticmethod
+    def _ancestors(mount_point: SelectType.String_, root: SelectType.String_, path: SelectType.String_) -> list:
+        relative = os.path.relpath(path, root)
+        if relative.startswith(".."):
+            relative = "."  # Namespace cgroup: mount point sudah cgroup milik proses ini
+        directory = os.path.normpath(os.path.join(mount_point, relative))
+        directories = [directory]
+        while directory != mount_point and directory != os.path.dirname(directory):
+            directory = os.path.dirname(directory)
+            directories.append(directory)
+        return directories
+
+    @staticmethod
+    def _read_int(directory: SelectType.String_, name: SelectType.String_) -> Union[int, None]:
+        try:
+            with open(os.path.join(directory, name), encoding="ascii") as fp:
+                text = fp.read().strip()
+        except OSError:
+            return None
+        if text == "max":
+            return None
+        try:
+            return int(text)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _read_stat(directory: SelectType.String_, name: SelectType.String_) -> int:
+        try:
+            with open(os.path.join(directory, "memory.stat"), encoding="ascii") as fp:
+                for line in fp:
+                    field, _, value = line.partition(" ")
+                    if field == name:
+                        return int(value)
+        except (OSError, ValueError):
+            pass
+        return 0
+
+    def limit(self) -> Union[int, None]:
+        """The tightest memory limit in bytes of this cgroup and its parents, or None without one.
+
+        On cgroup v2 both ``memory.max`` and ``memory.high`` (above which the kernel throttles
+        and reclaims) count; on v1 ``memory.limit_in_bytes``.
+        """
+        if self.version == 2:
+            names = ("memory.max", "memory.high")
+        elif self.version == 1:
+            names = ("memory.limit_in_bytes",)
+        else:
+            return None
+        limits = [
+            value
+            for directory in self.directories
+            for value in (self._read_int(directory, name) for name in names)
+            if value is not None and value < self.UNLIMITED
+        ]
+        return min(limits) if limits else None
+
+    def usage(self) -> Union[int, None]:
+        """The cgroup's working set in bytes: its usage minus reclaimable inactive page cache."""
+        if not self.directories:
+            return None
+        directory = self.directories[0]
+        if self.version == 2:
+            usage = self._read_int(directory, "memory.current")
+            inactive = self._read_stat(directory, "inactive_file")
+        else:
+            usage = self._read_int(directory, "memory.usage_in_bytes")
+            inactive = self._read_stat(directory, "total_inactive_file")
+        if usage is None:
+            return None
+        return max(usage - inactive, 0)
+
+    def apply(self, memory_info):
+        """Return ``memory_info`` (a ``psutil.virtual_memory()`` result) bounded by the cgroup.
+
+        ``total`` becomes the cgroup limit and ``available`` what is left under it (never more
+        than the host has available); without a tighter limit ``memory_info`` is returned as-is.
+        """
+        limit = self.limit()
+        if limit is None or limit >= memory_info.total:
+            return memory_info
+        usage = self.usage()
+        available = memory_info.available if usage is None else min(limit - usage, memory_info.available)
+        available = max(available, 0)
+        return memory_info._replace(
+            total=limit, available=available, percent=round((limit - available) * 100 / limit, 1)
+        )
+
+
+cgroup_memory = CgroupMemory()
+
+
+class MemorySampler:
+    """Shared background thread that keeps a cached ``psutil.virtual_memory()`` snapshot.
+
+    Inside a memory-limited cgroup the snapshot is bounded by ``cgroup_memory``, so
+    ``total``, ``available`` and ``percent`` describe the container, not the host.
+
+    Admission checks read the cached snapshot without taking any lock, instead of
+    making a syscall on every write. The thread refreshes every ``interval`` seconds,
+    switches to ``pressure_interval`` while memory usage is at or above
+    ``pressure_percent``, and can be woken early with ``request_refresh``.
+
+    Args:
+        interval (float): Seconds between refreshes under normal conditions.
+        pressure_interval (float): Seconds between refreshes while under pressure.
+        pressure_percent (float): ``virtual_memory().percent`` at which pressure starts.
+    """
+
+    def __init__(
+        self,
+        interval: SelectType.Numeric_ = 1.0,
+        pressure_interval: SelectType.Numeric_ = 0.1,
+        pressure_percent: SelectType.Numeric_ = 90.0,
+    ) -> None:
+        self.interval = interval
+        self.pressure_interval = pressure_interval
+        self.pressure_percent = pressure_percent
+        self._sample = None  # (memory_info, monotonic time), diganti secara atomik
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._running = False
+        self._stopped = False
+        if hasattr(os, "register_at_fork"):
+            # Thread tidak ikut ter-fork, mulai ulang di proses anak
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def __repr__(self) -> SelectType.String_:
+        return (
+            f"MemorySampler(interval={self.interval}, "
+            f"pressure_interval={self.pressure_interval}, running={self.running})"
+        )
+
+    @property
+    def running(self) -> SelectType.Boolean_:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def age(self) -> SelectType.Numeric_:
+        """Seconds since the cached snapshot was taken (infinite before the first sample)."""
+        sample = self._sample
+        if sample is None:
+            return float("inf")
+        return time.monotonic() - sample[1]
+
+    @property
+    def under_pressure(self) -> SelectType.Boolean_:
+        """Whether the cached snapshot is at or above ``pressure_percent``."""
+        sample = self._sample
+        return sample is not None and sample[0].percent >= self.pressure_percent
+
+    def configure(
+        self,
+        interval: SelectType.Numeric_ = None,
+        pressure_interval: SelectType.Numeric_ = None,
+        pressure_percent: SelectType.Numeric_ = None,
+    ) -> None:
+        """Change the refresh settings; the running thread picks them up immediately."""
+        if interval is not None:
+            self.interval = interval
+        if pressure_interval is not None:
+            self.pressure_interval = pressure_interval
+        if pressure_percent is not None:
+            self.pressure_percent = pressure_percent
+        self._wakeup.set()
+
+    def refresh(self):
+        """Take a new snapshot synchronously and return it."""
+        memory_info = cgroup_memory.apply(psutil.virtual_memory())
+        self._sample = (memory_info, time.monotonic())
+        return memory_info
+
+    def snapshot(self):
+        """Return the cached snapshot, starting the background thread on first use.
+
+        After ``stop`` the last snapshot is returned as-is (taken synchronously if
+        there is none yet) until ``start`` is called again.
+        """
+        sample = self._sample
+        if self._thread is None and not self._stopped:
+            self.start()
+            sample = self._sample
+        elif sample is None:
+            return self.refresh()
+        return sample[0]
+
+    def request_refresh(self) -> None:
+        """Wake the background thread so it refreshes before its next interval."""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the background thread if it is not running yet."""
+        with self._start_lock:
+            if self._sample is None:
+                self.refresh()
+            self._stopped = False
+            if self.running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name="MemorySampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread; the last snapshot stays cached."""
+        with self._start_lock:
+            self._running = False
+            self._stopped = True
+            self._wakeup.set()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        while self._running:
+            wait = self.pressure_interval if self.under_pressure else self.interval
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+            if not self._running:
+                break
+            try:
+                self.refresh()
+            except Exception:
+                continue  # Tetap gunakan snapshot lama jika psutil gagal
+
+    def _after_fork(self) -> None:
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._running = False
+
+
+memory_sampler = MemorySampler()
+
+
+class ExpiryReaper:
+    """Shared background thread that removes expired keys without waiting for a write.
+
+    A struct registers (weakly) when it schedules a time-to-live while it has none
+    pending. Every ``interval`` seconds the thread expires the due keys of each
+    registered struct whose lock it can take without blocking; a struct busy in another
+    thread is retried on the next round. The thread exits when no struct is left.
+
+    Args:
+        interval (float): Seconds between rounds, matched to the timer wheel's tick.
+    """
+
+    def __init__(self, interval: SelectType.Numeric_ = 0.1) -> None:
+        self.interval = interval
+        self._structs = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread = None
+        if hasattr(os, "register_at_fork"):
+            # Thread tidak ikut ter-fork; dimulai lagi pada pendaftaran berikutnya
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def __repr__(self) -> SelectType.String_:
+        return f"ExpiryReaper(interval={self.interval}, structs={len(self._structs)})"
+
+    def __len__(self) -> int:
+        return len(self._structs)
+
+    def __contains__(self, struct: SelectType.Any_) -> SelectType.Boolean_:
+        return struct in self._structs
+
+    def register(self, struct: SelectType.Any_) -> None:
+        """Reap ``struct`` from now on, starting the thread if it is not running."""
+        with self._lock:
+            self._structs.add(struct)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ExpiryReaper", daemon=True)
+                self._thread.start()
+
+    def discard(self, struct: SelectType.Any_) -> None:
+        """Stop reaping ``struct``; it registers again with its next time-to-live."""
+        with self._lock:
+            self._structs.discard(struct)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            if not self._reap():
+                return
+
+    def _reap(self) -> SelectType.Boolean_:
+        """Run one round; False, with the thread forgotten, once no struct is registered."""
+        with self._lock:
+            structs = list(self._structs)
+            if not structs:
+                self._thread = None
+                return False
+        for struct in structs:
+            try:
+                struct.__reap__()
+            except Exception:
+                continue  # Satu struct yang gagal tidak menghentikan yang lain
+        return True
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._thread = None
+
+
+expiry_reaper = ExpiryReaper()
+
+
+class MemoryBudget:
+    """A byte budget that structs reserve from; budgets can be shared and nested.
+
+    Budgets form a tree, for example process -> subsystem -> struct. A reservation
+    succeeds only when this budget and every parent up to the root have room, and
+    is then charged to all of them; a release credits all of them back. Each budget
+    has its own lock, held only while its own counter changes, so structs drawing
+    on different subtrees do not contend. A reservation refused by a parent is rolled
+    back level by level, so for that moment the lower levels may look fuller than they are.
+
+    Args:
+        limit (int, optional): Bytes this budget may hand out; None leaves only the
+            parents' limits in force.
+        parent (MemoryBudget, optional): The budget every reservation is also charged to.
+        name (str, optional): A label for `stats` and `repr`.
+    """
+
+    __slots__ = ("name", "parent", "_limit", "_used", "_lock")
+
+    def __init__(
+        self,
+        limit: Union[int, None] = None,
+        parent: Union["MemoryBudget", None] = None,
+        name: Union[SelectType.String_, None] = None,
+    ) -> None:
+        if limit is not None and limit < 0:
+            raise ValueError("A memory budget cannot be negative.")
+        self.name = name
+        self.parent = parent
+        self._limit = limit
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> SelectType.String_:
+        return f"MemoryBudget(name={self.name!r}, limit={self._limit}, used={self._used})"
+
+    @property
+    def limit(self) -> Union[int, None]:
+        """Bytes this budget may hand out (None when only the parents limit it)."""
+        return self._limit
+
+    @limit.setter
+    def limit(self, limit: Union[int, None]) -> None:
+        # Batas boleh di bawah pemakaian: reservasi berikutnya yang ditolak
+        if limit is not None and limit < 0:
+            raise ValueError("A memory budget cannot be negative.")
+        self._limit = limit
+
+    @property
+    def used(self) -> int:
+        """Bytes currently reserved through this budget."""
+        return self._used
+
+    @property
+    def available(self) -> SelectType.Numeric_:
+        """Bytes a reservation here could still get: the smallest headroom up to the root."""
+        headroom = math.inf
+        budget = self
+        while budget is not None:
+            if budget._limit is not None:
+                headroom = min(headroom, budget._limit - budget._used)
+            budget = budget.parent
+        return max(0, headroom)
+
+    def child(
+        self, limit: Union[int, None] = None, name: Union[SelectType.String_, None] = None
+    ) -> "MemoryBudget":
+        """Return a new budget nested under this one."""
+        return MemoryBudget(limit, parent=self, name=name)
+
+    def reserve(self, nbytes: SelectType.Numeric_, force: SelectType.Boolean_ = False) -> SelectType.Boolean_:
+        """
+        Reserve ``nbytes`` here and in every parent, or nothing at all.
+
+        Args:
+            nbytes (SelectType.Numeric_): Bytes to reserve; a negative amount is released instead.
+            force (SelectType.Boolean_, optional): Charge the bytes even past the limits, for
+                memory that is already in use. Default is False.
+
+        Returns:
+            SelectType.Boolean_: Whether the bytes were reserved.
+        """
+        if nbytes <= 0:
+            self.release(-nbytes)
+            return True
+        charged = []
+        budget = self
+        while budget is not None:
+            with budget._lock:
+                limit = budget._limit
+                if not force and limit is not None and budget._used + nbytes > limit:
+                    break
+                budget._used += nbytes
+            charged.append(budget)
+            budget = budget.parent
+        else:
+            return True
+        # Batas salah satu induk tercapai: batalkan yang sudah dipesan
+        for budget in charged:
+            with budget._lock:
+                budget._used -= nbytes
+        return False
+
+    def release(self, nbytes: SelectType.Numeric_) -> None:
+        """Give ``nbytes`` back to this budget and every parent.
+
+        Raises:
+            RuntimeError: If a budget in the chain holds fewer than ``nbytes``; an accounting
+                error. The levels already credited are charged again, so nothing changes.
+        """
+        if nbytes <= 0:
+            return
+        credited = []
+        budget = self
+        while budget is not None:
+            with budget._lock:
+                if budget._used < nbytes:
+                    failed = budget
+                    break
+                budget._used -= nbytes
+            credited.append(budget)
+            budget = budget.parent
+        else:
+            return
+        for budget in credited:
+            with budget._lock:
+                budget._used += nbytes
+        raise RuntimeError(f"{failed!r} cannot release {nbytes} bytes, more than it holds.")
+
+    def shrink(self, nbytes: SelectType.Numeric_) -> SelectType.Numeric_:
+        """Lower the limit by at most ``nbytes`` of unused headroom and return how much was given up.
+
+        A budget without a limit gives up nothing. The check and the change happen under the
+        budget's lock, so a concurrent reservation never ends up past the lowered limit.
+        """
+        with self._lock:
+            if self._limit is None:
+                return 0
+            given = max(0, min(nbytes, self._limit - self._used))
+            self._limit -= given
+            return given
+
+    def close(self) -> None:
+        """Give everything reserved through this budget back to its parents."""
+        with self._lock:
+            used, self._used = self._used, 0
+        if self.parent is not None:
+            self.parent.release(used)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Function to report the budget's state.
+
+        Returns:
+            Dict[str, Any]: "name", "limit", "used" and "available" (which also reflects the parents).
+        """
+        return {
+            "name": self.name,
+            "limit": self._limit,
+            "used": self._used,
+            "available": self.available,
+        }
+
+
+# Bagian memori sistem yang boleh dipakai seluruh struct dalam satu proses
+SYSTEM_MEMORY_FRACTION: float = 0.75
+
+# Bagian memori sistem (atau batas cgroup) yang harus tetap tersedia; di bawahnya tulisan ditolak
+# sebelum OOM killer kernel bertindak, apa pun yang memakai memori proses
+MEMORY_HEADROOM_FRACTION: float = 0.05
+
+
+def system_memory_limit() -> int:
+    """Return the process-wide default budget: a fixed fraction of total system memory.
+
+    In a container "total" is the cgroup memory limit when it is below the host's RAM.
+    `process_budget` takes this value at import; assign ``process_budget.limit =
+    system_memory_limit()`` to follow a limit changed later.
+    """
+    return int(cgroup_memory.apply(psutil.virtual_memory()).total * SYSTEM_MEMORY_FRACTION)
+
+
+# Akar pohon anggaran; struct tanpa anggaran sendiri memesan dari sini
+process_budget = MemoryBudget(system_memory_limit(), name="process")
+
+# Payload dengan item sebanyak ini diukur di executor oleh metode async_*
+ASYNC_OFFLOAD_ITEMS: int = 1024
+
+
+def MemoryUsage():
+    total_memory = memory_sampler.snapshot().total
+    satuan = ["bytes", "KB", "MB", "GB"]
+    i = 0
+    while total_memory >= 1024 and i < len(satuan) - 1:
+        total_memory /= 1024
+        i += 1
+    print(f"Total memory: {total_memory:.2f} {satuan[i]}")
+
+
+def getMemory(total_memory: SelectType.Numeric_) -> SelectType.String_:
+    satuan = ["bytes", "KB", "MB", "GB"]
+    i = 0
+    while total_memory >= 1024 and i < len(satuan) - 1:
+        total_memory /= 1024
+        i += 1
+    return satuan[i]
+
+
+FUNCTION_EXECUTORS: Dict[str, type] = {
+    "thread": concurrent.futures.ThreadPoolExecutor,
+    "process": concurrent.futures.ProcessPoolExecutor,
+}
+
+
+class _CoroutineRunner:
+    """
+    One event loop on a daemon thread, shared by every struct, for stored coroutine functions.
+
+    Replaces a fresh `asyncio.run` (a new loop per call) with a loop that is started once per
+    process; `submit` returns a `concurrent.futures.Future`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop = None
+        if hasattr(os, "register_at_fork"):
+            # Thread loop tidak ikut ke proses anak; buat ulang saat dibutuhkan
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="MemoryAwareStruct-coroutines", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, func, args: tuple, kwargs: dict) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(func(*args, **kwargs), self.loop())
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._loop = None
+
+
+coroutine_runner = _CoroutineRunner()
+
+
+def _call_stored(func, args: tuple, kwargs: dict) -> SelectType.Any_:
+    """Run a stored callable; coroutine functions run to completion on the shared loop."""
+    if asyncio.iscoroutinefunction(func):
+        if threading.current_thread().name == "MemoryAwareStruct-coroutines":
+            # Menunggu hasil di thread loop itu sendiri akan deadlock
+            raise RuntimeError("Cannot wait for a stored coroutine function from inside another one.")
+        return coroutine_runner.submit(func, args, kwargs).result()
+    return func(*args, **kwargs)
+
+
+class LatencyHistogram:
+    """HDR-style histogram of durations in nanoseconds, with about 6% relative precision.
+
+    Values are bucketed log-linearly: every power of two is split into 16 equal
+    sub-buckets, so recording is an integer shift and a list increment whatever the
+    range, and memory stays fixed. Percentiles report the lower bound of their bucket.
+    """
+
+    SUB_BUCKETS = 16
+    BUCKETS = 64 * 16  # Cukup untuk 2**63 ns
+
+    __slots__ = ("_counts", "_count", "_sum", "_max", "_lock")
+
+    def __init__(self) -> None:
+        self._counts = [0] * self.BUCKETS
+        self._count = 0
+        self._sum = 0
+        self._max = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> SelectType.String_:
+        return f"LatencyHistogram(count={self._count}, max_ns={self._max})"
+
+    @staticmethod
+    def _index(value: int) -> int:
+        # 5 bit teratas menentukan sub-bucket, sisanya menjadi eksponen
+        shift = max(value.bit_length() - 5, 0)
+        return shift * 16 + (value >> shift)
+
+    @staticmethod
+    def _lower_bound(index: int) -> int:
+        shift = max(index // 16 - 1, 0)
+        return (index - shift * 16) << shift
+
+    def record(self, nanoseconds: int) -> None:
+        nanoseconds = max(int(nanoseconds), 0)
+        index = self._index(nanoseconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += nanoseconds
+            if nanoseconds > self._max:
+                self._max = nanoseconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add every value recorded in ``other`` to this histogram."""
+        with other._lock:
+            counts, count, total, peak = list(other._counts), other._count, other._sum, other._max
+        with self._lock:
+            for index, value in enumerate(counts):
+                if value:
+                    self._counts[index] += value
+            self._count += count
+            self._sum += total
+            self._max = max(self._max, peak)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def total(self) -> int:
+        """Sum of every recorded value, in nanoseconds."""
+        return self._sum
+
+    def percentile(self, percent: SelectType.Numeric_) -> int:
+        """Return the ``percent`` percentile in nanoseconds (0 when empty)."""
+        with self._lock:
+            if not self._count:
+                return 0
+            rank = max(1, math.ceil(self._count * percent / 100))
+            seen = 0
+            for index, value in enumerate(self._counts):
+                seen += value
+                if seen >= rank:
+                    return min(self._lower_bound(index), self._max)
+            return self._max
+
+    def cumulative(self, bounds) -> list:
+        """Return how many values were at most each bound (nanoseconds, ascending).
+
+        Matches Prometheus' ``le``: the bucket that starts at a bound is counted for it.
+        """
+        with self._lock:
+            counts = list(self._counts)
+        result, seen, index = [], 0, 0
+        for bound in bounds:
+            limit = self._index(bound) + 1
+            while index < limit:
+                seen += counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """Return count, mean, p50/p90/p99/p99.9 and max, in microseconds."""
+        count = self._count
+        return {
+            "count": count,
+            "mean_us": self._sum / count / 1000 if count else 0.0,
+            "p50_us": self.percentile(50) / 1000,
+            "p90_us": self.percentile(90) / 1000,
+            "p99_us": self.percentile(99) / 1000,
+            "p999_us": self.percentile(99.9) / 1000,
+            "max_us": self._max / 1000,
+        }
+
+
+# Batas bucket Prometheus: pangkat dua dalam ns, dari ~1 us sampai ~69 detik
+PROMETHEUS_BOUNDS = tuple(1 << power for power in range(10, 37))
+
+
+def _prometheus_label(name: SelectType.String_, value: SelectType.Any_) -> SelectType.String_:
+    """Render one ``name="value"`` label with the exposition format's escaping."""
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'{name}="{value}"'
+
+
+class StructMetrics:
+    """Counters and latency histograms for one struct, filled while metrics are enabled.
+
+    Every instrumented call costs one `time.perf_counter_ns` pair and one histogram
+    update; with metrics disabled the instrumented methods only check for None.
+    """
+
+    __slots__ = ("operations", "errors", "latency", "lock_wait", "bytes", "_lock")
+
+    def __init__(self) -> None:
+        self.operations: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.lock_wait = LatencyHistogram()
+        self.bytes = {"admitted": 0, "rejected": 0, "rejected_writes": 0}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> SelectType.String_:
+        return f"StructMetrics(operations={sum(self.operations.values())})"
+
+    def observe(self, operation: SelectType.String_, nanoseconds: int, failed: SelectType.Boolean_) -> None:
+        histogram = self.latency.get(operation)
+        if histogram is None:
+            with self._lock:
+                histogram = self.latency.setdefault(operation, LatencyHistogram())
+        with self._lock:
+            self.operations[operation] = self.operations.get(operation, 0) + 1
+            if failed:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+        histogram.record(nanoseconds)
+
+    def admitted(self, size: SelectType.Numeric_) -> None:
+        with self._lock:
+            self.bytes["admitted"] += size
+
+    def rejected(self, size: SelectType.Numeric_) -> None:
+        with self._lock:
+            self.bytes["rejected"] += size
+            self.bytes["rejected_writes"] += 1
+
+    def merge(self, other: "StructMetrics") -> None:
+        """Add ``other``'s counters and histograms to these, e.g. to total a sharded struct."""
+        with other._lock:
+            operations, errors = dict(other.operations), dict(other.errors)
+            latency, sizes = dict(other.latency), dict(other.bytes)
+        with self._lock:
+            for name, value in operations.items():
+                self.operations[name] = self.operations.get(name, 0) + value
+            for name, value in errors.items():
+                self.errors[name] = self.errors.get(name, 0) + value
+            for name, value in sizes.items():
+                self.bytes[name] += value
+            for name in latency:
+                self.latency.setdefault(name, LatencyHistogram())
+        for name, histogram in latency.items():
+            self.latency[name].merge(histogram)
+        self.lock_wait.merge(other.lock_wait)
+
+    def snapshot(self, gauges: Dict[str, Any]) -> Dict[str, Any]:
+        """Return every metric as plain dicts; ``gauges`` holds the current ledger and key counts."""
+        with self._lock:
+            operations, errors = dict(self.operations), dict(self.errors)
+            latency, sizes = dict(self.latency), dict(self.bytes)
+        return {
+            "operations": {
+                name: {
+                    "count": count,
+                    "errors": errors.get(name, 0),
+                    "latency": latency[name].summary(),
+                }
+                for name, count in operations.items()
+            },
+            "lock_wait": self.lock_wait.summary(),
+            "bytes_admitted": sizes["admitted"],
+            "bytes_rejected": sizes["rejected"],
+            "rejected_writes": sizes["rejected_writes"],
+            **gauges,
+        }
+
+    def to_prometheus(
+        self,
+        gauges: Dict[str, Any],
+        labels: Dict[str, str],
+        prefix: SelectType.String_ = "memory_aware_struct",
+    ) -> SelectType.String_:
+        """Render the metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            operations, errors = dict(self.operations), dict(self.errors)
+            latency, sizes = dict(self.latency), dict(self.bytes)
+        base = [_prometheus_label(name, value) for name, value in labels.items()]
+
+        def joined(*extra: str) -> str:
+            parts = base + [part for part in extra if part]
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        lines = [
+            f"# HELP {prefix}_operations_total Instrumented calls by operation.",
+            f"# TYPE {prefix}_operations_total counter",
+        ]
+        for name, count in sorted(operations.items()):
+            lines.append(f"{prefix}_operations_total{joined(_prometheus_label('operation', name))} {count}")
+        lines += [
+            f"# HELP {prefix}_operation_errors_total Instrumented calls that raised, by operation.",
+            f"# TYPE {prefix}_operation_errors_total counter",
+        ]
+        for name in sorted(operations):
+            lines.append(
+                f"{prefix}_operation_errors_total{joined(_prometheus_label('operation', name))} "
+                f"{errors.get(name, 0)}"
+            )
+
+        def histogram(metric: str, help_text: str, series) -> None:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} histogram")
+            for extra, hist in series:
+                for bound, seen in zip(PROMETHEUS_BOUNDS, hist.cumulative(PROMETHEUS_BOUNDS)):
+                    le = _prometheus_label("le", f"{bound / 1e9:.9g}")
+                    lines.append(f"{prefix}_{metric}_bucket{joined(extra, le)} {seen}")
+                le = _prometheus_label("le", "+Inf")
+                lines.append(f"{prefix}_{metric}_bucket{joined(extra, le)} {hist.count}")
+                lines.append(f"{prefix}_{metric}_sum{joined(extra)} {hist.total / 1e9:.9g}")
+                lines.append(f"{prefix}_{metric}_count{joined(extra)} {hist.count}")
+
+        histogram(
+            "operation_duration_seconds",
+            "Latency of instrumented calls.",
+            [(_prometheus_label("operation", name), latency[name]) for name in sorted(operations)],
+        )
+        histogram("lock_wait_seconds", "Time spent waiting for the struct's lock.", [("", self.lock_wait)])
+        for metric, value, kind, help_text in (
+            ("admitted_bytes_total", sizes["admitted"], "counter", "Bytes admitted by writes."),
+            ("rejected_bytes_total", sizes["rejected"], "counter", "Bytes refused for lack of memory."),
+            ("rejected_writes_total", sizes["rejected_writes"], "counter", "Writes refused for lack of memory."),
+        ) + tuple(
+            (name, value, "gauge", f"Current {name.replace('_', ' ')}.") for name, value in gauges.items()
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            lines.append(f"{prefix}_{metric}{joined()} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _instrumented(operation: SelectType.String_):
+    """Time a MemoryAwareStruct method into its StructMetrics when metrics are enabled."""
+
+    def decorate(method):
+        if asyncio.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def timed_async(self, *args, **kwargs):
+                metrics = self._MemoryAwareStruct__metrics  # Slot privat milik struct
+                if metrics is None:
+                    return await method(self, *args, **kwargs)
+                started, failed = time.perf_counter_ns(), True
+                try:
+                    result = await method(self, *args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    metrics.observe(operation, time.perf_counter_ns() - started, failed)
+
+            return timed_async
+
+        @functools.wraps(method)
+        def timed(self, *args, **kwargs):
+            metrics = self._MemoryAwareStruct__metrics  # Slot privat milik struct
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            started, failed = time.perf_counter_ns(), True
+            try:
+                result = method(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                metrics.observe(operation, time.perf_counter_ns() - started, failed)
+
+        return timed
+
+    return decorate
+
+
+class ChangeFeedOverflow(LookupError):
+    """Raised when a subscriber's cursor points at events the ring buffer already overwrote."""
+
+
+class ChangeEvent:
+    """One change: the ``key`` written or removed, the ``op`` and the store ``version`` after it.
+
+    ``op`` is "insert", "update", "pop", "expire", "evict" or "clear" (whose key is None).
+    ``cursor`` is the event's position in the feed; resume a subscription after it with
+    ``cursor + 1``.
+    """
+
+    __slots__ = ("cursor", "key", "op", "version")
+
+    def __init__(self, cursor: int, key: SelectType.Any_, op: SelectType.String_, version: int) -> None:
+        self.cursor = cursor
+        self.key = key
+        self.op = op
+        self.version = version
+
+    def __repr__(self) -> SelectType.String_:
+        return f"ChangeEvent(cursor={self.cursor}, key={self.key!r}, op={self.op!r}, version={self.version})"
+
+    def __eq__(self, other: SelectType.Any_) -> SelectType.Boolean_:
+        if not isinstance(other, ChangeEvent):
+            return NotImplemented
+        return (self.cursor, self.key, self.op, self.version) == (
+            other.cursor, other.key, other.op, other.version
+        )
+
+
+class ChangeFeed:
+    """A bounded ring buffer of ChangeEvents that writers append to under the struct's lock.
+
+    Cursors number events from 0 and only grow; the event with cursor ``c`` lives in slot
+    ``c % capacity`` until ``capacity`` newer events overwrite it. Reading from a cursor is
+    O(events returned), whatever the capacity.
+    """
+
+    __slots__ = ("capacity", "_slots", "_next", "_cond", "_async_waiters")
+
+    def __init__(self, capacity: int = 4096) -> None:
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("The change feed capacity must be a positive integer.")
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._next = 0  # Cursor untuk event berikutnya
+        self._cond = threading.Condition(threading.Lock())
+        self._async_waiters = []  # (loop, asyncio.Event) milik subscriber async yang menunggu
+
+    def __repr__(self) -> SelectType.String_:
+        return f"ChangeFeed(capacity={self.capacity}, head={self._next})"
+
+    @property
+    def head(self) -> int:
+        """The cursor the next event will get; subscribing here returns only future changes."""
+        return self._next
+
+    @property
+    def oldest(self) -> int:
+        """The cursor of the oldest event still in the buffer."""
+        return max(self._next - self.capacity, 0)
+
+    def publish(self, changes, version: int) -> None:
+        """Append one event per ``(key, op)`` in ``changes`` and wake every waiting subscriber."""
+        with self._cond:
+            slots, capacity, cursor = self._slots, self.capacity, self._next
+            for key, op in changes:
+                slots[cursor % capacity] = ChangeEvent(cursor, key, op, version)
+                cursor += 1
+            if cursor == self._next:
+                return
+            self._next = cursor
+        self.wake()
+
+    def wake(self) -> None:
+        """Wake every waiting subscriber so it re-checks for events and for its ``stop`` condition."""
+        with self._cond:
+            self._cond.notify_all()
+            waiters = self._async_waiters
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Event loop subscriber sudah ditutup
+
+    def read(self, cursor: int, limit: Union[int, None] = None) -> list:
+        """Return the events from ``cursor`` on (at most ``limit``), oldest first.
+
+        Raises:
+            ChangeFeedOverflow: If events from ``cursor`` on were already overwritten.
+            ValueError: If ``cursor`` is past the head of the feed.
+        """
+        with self._cond:
+            head = self._next
+            if cursor > head or cursor < 0:
+                raise ValueError(f"Cursor {cursor} is outside the feed (head {head}).")
+            if cursor < head - self.capacity:
+                raise ChangeFeedOverflow(
+                    f"Events from cursor {cursor} were overwritten; the oldest retained is "
+                    f"{head - self.capacity}. Re-read the store and subscribe again."
+                )
+            end = head if limit is None else min(head, cursor + limit)
+            slots, capacity = self._slots, self.capacity
+            return [slots[position % capacity] for position in range(cursor, end)]
+
+    def wait(
+        self, cursor: int, timeout: Union[SelectType.Numeric_, None] = None, stop=None
+    ) -> SelectType.Boolean_:
+        """Block until an event at ``cursor`` or later exists; False if ``timeout`` ran out first.
+
+        ``stop`` is an optional callable, re-checked on every `wake`; the wait also ends
+        (returning True) once it returns True.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._next > cursor or (stop is not None and stop()), timeout
+            )
+
+    async def wait_async(
+        self, cursor: int, timeout: Union[SelectType.Numeric_, None] = None, stop=None
+    ) -> SelectType.Boolean_:
+        """`wait` for coroutines: the event loop keeps running while no event arrives."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            waiter = (loop, asyncio.Event())
+            with self._cond:
+                if self._next > cursor or (stop is not None and stop()):
+                    return True
+                # Daftar baru setiap kali, sehingga publish bisa mengiterasi salinan tanpa lock
+                self._async_waiters = self._async_waiters + [waiter]
+            try:
+                remaining = None if deadline is None else deadline - loop.time()
+                await asyncio.wait_for(waiter[1].wait(), remaining)
+            except asyncio.TimeoutError:
+                return self._next > cursor
+            finally:
+                with self._cond:
+                    self._async_waiters = [item for item in self._async_waiters if item is not waiter]
+
+
+class Subscription:
+    """A reader of a ChangeFeed that remembers its position.
+
+    ``poll()`` returns the events since the last read without blocking. Iterating (``for``
+    or ``async for``) yields events as they arrive and stops after ``timeout`` seconds
+    without one (never, when ``timeout`` is None) or once `close` is called. ``cursor`` is
+    the next event to read; store it to resume later with ``subscribe(cursor=...)``.
+    """
+
+    __slots__ = ("feed", "cursor", "timeout", "_closed")
+
+    def __init__(
+        self, feed: ChangeFeed, cursor: int, timeout: Union[SelectType.Numeric_, None] = None
+    ) -> None:
+        self.feed = feed
+        self.cursor = cursor
+        self.timeout = timeout
+        self._closed = False
+
+    def __repr__(self) -> SelectType.String_:
+        return f"Subscription(cursor={self.cursor}, pending={self.pending})"
+
+    @property
+    def pending(self) -> int:
+        """The number of events published since the last read."""
+        return self.feed.head - self.cursor
+
+    def poll(self, limit: Union[int, None] = None) -> list:
+        """Return the events since the last read (at most ``limit``) and move past them."""
+        events = self.feed.read(self.cursor, limit)
+        if events:
+            self.cursor = events[-1].cursor + 1
+        return events
+
+    def close(self) -> None:
+        """Stop the iterators after the events already read, waking any that are waiting."""
+        self._closed = True
+        self.feed.wake()
+
+    def _stopped(self) -> SelectType.Boolean_:
+        return self._closed
+
+    def __iter__(self):
+        while not self._closed:
+            events = self.feed.read(self.cursor)
+            if not events:
+                if not self.feed.wait(self.cursor, self.timeout, self._stopped):
+                    return
+                continue
+            for event in events:
+                if self._closed:
+                    return
+                self.cursor = event.cursor + 1  # Maju per event, aman jika konsumen berhenti
+                yield event
+
+    async def __aiter__(self):
+        while not self._closed:
+            events = self.feed.read(self.cursor)
+            if not events:
+                if not await self.feed.wait_async(self.cursor, self.timeout, self._stopped):
+                    return
+                continue
+            for event in events:
+                if self._closed:
+                    return
+                self.cursor = event.cursor + 1
+                yield event
+
+
+class MemoryAwareStruct(SelectType):
+    """
+    A class designed to manage structured data with memory awareness.
+    
+    This class allows for the secure manipulation of data in a dictionary-like structure 
+    while ensuring that memory usage is monitored and controlled. The data can be accessed 
+    and functions can be executed dynamically, with thread safety in mind.
+    
+    Args:
+            memory_default (int, optional): An optional parameter to specify the default maximum 
+                                            memory usage for this instance. If not provided, 
+                                            the instance draws on the process-wide budget only.
+            **entries (SelectType.Dict_): Key-value pairs to initialize the internal data structure. 
+                                        This allows for flexible initialization with multiple entries.
+    """
+    __slots__: SelectType.List_ = [
+        "__struct_name",
+        "_lock",
+        "__data",
+        "__ledger",
+        "__estimator",
+        "__async_locks",
+        "__eviction",
+        "__on_evict",
+        "__eviction_stats",
+        "__pending_evictions",
+        "__expiry",
+        "__wheel",
+        "__default_ttl",
+        "__json_cache",
+        "__lazy",
+        "__cold",
+        "__tier_stats",
+        "__tier_lock",
+        "__compression",
+        "__decompressed",
+        "__executor",
+        "__memos",
+        "__metrics",
+        "__feed",
+        "__budget",
+        "__budget_release",
+        "memory_warning_triggered",
+    ]
+
+    def __init__(self, memory_default: int = None, **entries: SelectType.Dict_) -> None:
+        """
+        Initializes the MemoryAwareStruct with optional memory constraints and initial entries.
+
+        This constructor sets up the instance of the MemoryAwareStruct class, allowing for the 
+        configuration of memory usage limits and populating the internal data structure with 
+        provided entries. It also handles thread safety and reserves the entries in a memory
+        budget nested under the process-wide one.
+
+        Args:
+            memory_default (int, optional): An optional parameter to specify the default maximum 
+                                            memory usage for this instance. If not provided, 
+                                            the instance draws on the process-wide budget only.
+            **entries (SelectType.Dict_): Key-value pairs to initialize the internal data structure. 
+                                        This allows for flexible initialization with multiple entries.
+
+        Behavior:
+            - Initializes the instance variable __struct_name with the name of the class.
+            - Invokes MemoryUsage() to report the total system memory.
+            - Gives the instance its own MemoryBudget nested under `process_budget`, limited to
+            memory_default when it is provided (see `set_memory_budget` to share a budget instead).
+            - Creates an instance of RestrictedDict to hold the provided entries, ensuring that only
+            allowed operations can be performed on the data.
+            - Assigns a threading lock (self.__data.mainsession) to the __data attribute to manage concurrency
+            and ensure thread-safe operations.
+            - If there are existing entries in the internal data structure, their size is charged to the
+            budget, even past its limit.
+        """
+        self.__struct_name = self.__class__.__name__  # Private variable
+        MemoryUsage()
+        self.memory_warning_triggered: SelectType.Boolean_ = False
+
+        self.__data = RestrictedDict(**entries)  # Gunakan RestrictedDict
+        self.__data.mainsession = threading.Lock()  # Lock untuk concurrency
+        self.__estimator = ExactSizeEstimator()  # Strategi pengukuran ukuran
+        self.__ledger = SizeLedger()  # Ukuran per key, diukur saat ditulis
+        self.__async_locks = weakref.WeakKeyDictionary()  # asyncio.Lock per event loop
+        self.__eviction = None  # EvictionPolicy, None berarti tulisan ditolak saat penuh
+        self.__on_evict = None
+        self.__eviction_stats = {"evictions": 0, "evicted_bytes": 0, "rejected_writes": 0}
+        self.__pending_evictions = []  # (key, value) menunggu callback on_evict
+        self.__expiry: Dict[str, float] = {}  # key -> tenggat time.monotonic()
+        self.__wheel = None  # TimerWheel, dibuat saat TTL pertama dipakai
+        self.__default_ttl = None
+        self.__json_cache = None  # (versi, berlaku sampai, ReadOnlyJSON)
+        # key -> (sumber, a, b, expiry) yang belum ada di memori: SnapshotFile atau ColdTier
+        self.__lazy: Dict[str, tuple] = {}
+        self.__cold = None  # ColdTier, None berarti entri yang dievict dibuang
+        self.__compression = None  # (codec, threshold, level)
+        self.__decompressed = None  # DecompressedCache
+        self.__executor = None  # (Executor, dimiliki), dibuat saat submit_function pertama
+        self.__memos: Dict[str, FunctionMemo] = {}  # key fungsi -> memo hasilnya
+        self.__metrics = None  # StructMetrics, None berarti metrik tidak dicatat
+        self.__feed = None  # ChangeFeed, dibuat saat subscribe pertama
+        self.__tier_stats = dict.fromkeys(
+            ("memory_hits", "memory_misses", "disk_hits", "disk_misses", "demotions", "promotions"), 0
+        )
+        self.__tier_lock = threading.Lock()  # Pembaca "rw" menghitung tier_stats bersamaan
+        for key, value in self.__data.items():
+            self.__ledger.record(key, self.__get_total_size__(value))
+
+        # Anggaran milik instance ini, bersarang di bawah anggaran proses
+        self.__budget = process_budget.child(memory_default or None, name=self.__struct_name)
+        self.__budget.reserve(self.__ledger.total, force=True)
+        # Kembalikan pesanan ke induk saat instance dibuang
+        self.__budget_release = weakref.finalize(self, self.__budget.close)
+
+    def __setattr__(self, name: SelectType.String_, value: SelectType.Any_) -> None:
+        if name in ["__dict__"]:
+            raise AttributeError(
+                f"Direct updates to '{name}' are not allowed. Please use insert or update."
+            )
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: SelectType.String_) -> None:
+        """Prevent deletion of __dict__."""
+        if name in ["__dict__", "__struct_name"]:
+            raise AttributeError(f"Deleting '{name}' is not allowed.")
+        super().__delattr__(name)
+
+    def __dir__(self):
+        """Block the dir() function."""
+        raise AttributeError("The use of dir() on this class is not allowed.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type:
+            print(f"Error: {exc_val}")
+        else:
+            print("No errors occurred.")
+
+    @property
+    def __dict__(self):
+        raise AttributeError("Cannot access __dict__ because not allowed.")
+
+    @property
+    def struct_name(self) -> SelectType.String_:
+        """
+        Property to retrieve the structure name.
+
+        This property returns the name of the structure stored in the instance.
+        It ensures thread-safe access to the structure name.
+
+        Returns:
+            SelectType.String_: The name of the structure.
+
+        Behavior:
+            - Uses the read side of `self.__data.mainsession` to ensure thread-safe access when reading the structure name.
+        """
+        with self.__read_session__():  # Lock saat akses
+            return self.__struct_name
+
+    
+    def set_name(self, params: SelectType.String_) -> None:
+        """
+        Function to set the name of the structure.
+
+        This function allows setting the name of the structure only once. If the structure name is
+        currently set to "Struct", it can be modified. Otherwise, a ValueError is raised.
+
+        Args:
+            params (SelectType.String_): The new name to set for the structure.
+
+        Raises:
+            ValueError: If the structure name has already been set to a value other than "Struct".
+
+        Behavior:
+            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe modification of the structure name.
+            - Checks if the current structure name is "Struct" before allowing the modification.
+        """
+        with self.__data.mainsession:  # Lock saat modifikasi
+            if (
+                self.__struct_name == "Struct" and self.__struct_name
+            ):  # Can only set once
+                self.__struct_name = params
+            else:
+                raise ValueError("Struct name can only be set once.")
+
+    def set_size_estimator(
+        self, estimator: Union[SizeEstimator, SelectType.String_]
+    ) -> None:
+        """
+        Function to choose how stored values are measured for memory accounting.
+
+        Args:
+            estimator (Union[SizeEstimator, SelectType.String_]): An estimator instance or the
+                name of a built-in strategy: "exact", "shallow" or "sampled".
+
+        Raises:
+            ValueError: If the name does not match a built-in strategy.
+            TypeError: If the estimator is neither a name nor a SizeEstimator.
+
+        Behavior:
+            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe replacement of the estimator.
+            - Re-measures the stored values with the new estimator so the size ledger stays consistent,
+              and applies the difference to the memory limit.
+        """
+        if isinstance(estimator, str):
+            if estimator not in SIZE_ESTIMATORS:
+                raise ValueError(f"Unknown size estimator '{estimator}'.")
+            estimator = SIZE_ESTIMATORS[estimator]()
+        elif not isinstance(estimator, SizeEstimator):
+            raise TypeError("The estimator must be a SizeEstimator or its name.")
+        with self.__data.mainsession:  # Lock saat mengganti estimator
+            self.__estimator = estimator
+            size_change = 0
+            for key, value in self.__data.items():
+                size = self.__get_total_size__(value)
+                if key in self.__memos:
+                    size += self.__memos[key].bytes  # Hasil memo tetap dihitung
+                size_change += self.__ledger.record(key, size)
+            if size_change:
+                self.__charge_memory__(size_change)
+
+    @property
+    def size_estimator(self) -> SizeEstimator:
+        """The estimator used to measure incoming values."""
+        return self.__estimator
+
+    def set_concurrency_mode(
+        self, mode: SelectType.String_, writer_preference: SelectType.Boolean_ = True
+    ) -> None:
+        """
+        Function to choose how readers and writers share `self.__data.mainsession`.
+
+        Args:
+            mode (SelectType.String_): "exclusive" (default) serializes every access behind one
+                `threading.Lock`; "rw" installs a `ReadWriteLock` so `get`, `json`, `__repr__`
+                and `struct_name` run concurrently while writers stay exclusive.
+            writer_preference (SelectType.Boolean_, optional): In "rw" mode, block new readers
+                while a writer is waiting so writers are not starved. Default is True.
+
+        Raises:
+            ValueError: If the mode is not "exclusive" or "rw".
+
+        Behavior:
+            - Waits for the current lock before swapping it. Call it before the instance is
+              shared between threads; threads already blocked on the old lock are not moved.
+        """
+        if mode == "exclusive":
+            new_session = threading.Lock()
+        elif mode == "rw":
+            new_session = ReadWriteLock(writer_preference=writer_preference)
+        else:
+            raise ValueError(f"Unknown concurrency mode '{mode}'.")
+        with self.__data.mainsession:  # Tunggu pemegang lock lama selesai
+            self.__data.mainsession = new_session
+
+    @property
+    def concurrency_mode(self) -> SelectType.String_:
+        """The current concurrency mode: "exclusive" or "rw"."""
+        if isinstance(self.__data.mainsession, ReadWriteLock):
+            return "rw"
+        return "exclusive"
+
+    def set_memory_budget(
+        self, parent: Union[MemoryBudget, None] = None, limit: Union[int, None] = None
+    ) -> None:
+        """
+        Function to draw this instance's memory from another budget, shared or nested.
+
+        Args:
+            parent (Union[MemoryBudget, None], optional): The budget to reserve from, for example one
+                shared by every struct of a subsystem. None uses `process_budget`.
+            limit (Union[int, None], optional): A cap for this instance alone; None leaves only the
+                parent's limits in force.
+
+        Raises:
+            TypeError: If `parent` is neither a MemoryBudget nor None.
+            ValueError: If the stored entries do not fit in the new budget.
+
+        Behavior:
+            - The instance gets a new budget nested under `parent`, so several instances can share
+              one parent while their own usage stays visible in `memory_budget`.
+            - The stored entries are reserved in the new budget before the old one gives them back.
+        """
+        if parent is None:
+            parent = process_budget
+        elif not isinstance(parent, MemoryBudget):
+            raise TypeError("The parent must be a MemoryBudget or None.")
+        budget = parent.child(limit, name=self.__struct_name)
+        with self.__data.mainsession:  # Lock saat mengganti anggaran
+            if not budget.reserve(self.__ledger.total):
+                raise ValueError("The stored entries do not fit in the new memory budget.")
+            old, self.__budget = self.__budget, budget
+            self.__budget_release.detach()
+            self.__budget_release = weakref.finalize(self, budget.close)
+            self.memory_warning_triggered = False
+        old.close()
+
+    @property
+    def memory_budget(self) -> MemoryBudget:
+        """This instance's MemoryBudget; its `used` is the bytes the instance holds."""
+        return self.__budget
+
+    @property
+    def max_memory_usage(self) -> SelectType.Numeric_:
+        """Bytes the instance could still store, as limited by its budget and every parent."""
+        return self.__budget.available
+
+    def set_eviction_policy(
+        self,
+        policy: Union[EvictionPolicy, SelectType.String_, None],
+        on_evict: SelectType.Any_ = None,
+    ) -> None:
+        """
+        Function to evict stored keys instead of refusing writes when the memory budget is hit.
+
+        Args:
+            policy (Union[EvictionPolicy, SelectType.String_, None]): An EvictionPolicy instance, the
+                name of a built-in policy ("lru", "lfu" or "arc"), or None to go back to refusing writes.
+            on_evict (callable, optional): Called as `on_evict(key, value)` for every evicted entry,
+                after the lock has been released.
+
+        Raises:
+            ValueError: If the name does not match a built-in policy.
+            TypeError: If the policy is neither a name, an EvictionPolicy nor None.
+
+        Behavior:
+            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe replacement of the policy.
+            - Registers the keys already stored with the new policy.
+            - Clears the memory warning of the active memory limit, so a struct that was refusing writes
+              starts evicting instead.
+        """
+        if isinstance(policy, str):
+            if policy not in EVICTION_POLICIES:
+                raise ValueError(f"Unknown eviction policy '{policy}'.")
+            policy = EVICTION_POLICIES[policy]()
+        elif policy is not None and not isinstance(policy, EvictionPolicy):
+            raise TypeError("The policy must be an EvictionPolicy, its name or None.")
+        with self.__data.mainsession:  # Lock saat mengganti kebijakan
+            self.__eviction = policy
+            self.__on_evict = on_evict
+            if policy is None:
+                return
+            for key in self.__data.keys():
+                policy.admit(key)
+            self.memory_warning_triggered = False
+
+    def set_default_ttl(self, ttl: SelectType.Numeric_ = None) -> None:
+        """
+        Function to set the time-to-live, in seconds, of keys written without an explicit one.
+
+        Args:
+            ttl (SelectType.Numeric_, optional): Default time-to-live; None means keys never expire.
+
+        Behavior:
+            - Applies to writes made after the call; keys already stored keep their expiry.
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("The time-to-live must be positive.")
+        with self.__data.mainsession:
+            self.__default_ttl = ttl
+
+    def expire(self, key: SelectType.String_, ttl: SelectType.Numeric_ = None) -> SelectType.Boolean_:
+        """
+        Function to set or remove the time-to-live of a stored key.
+
+        Args:
+            key (SelectType.String_): The key to change.
+            ttl (SelectType.Numeric_, optional): Seconds from now; None makes the key persistent.
+
+        Returns:
+            SelectType.Boolean_: False if the key is not stored (or has already expired).
+        """
+        if self.__lazy and key in self.__lazy:
+            self.__materialize__([key])
+        with self.__write_session__():
+            self.__expire_due__()
+            if key not in self.__data or self.__is_expired__(key):
+                return False
+            if ttl is None:
+                if self.__expiry.pop(key, None) is not None:
+                    self.__wheel.cancel(key)
+            else:
+                self.__schedule_expiry__(key, ttl)
+            return True
+
+    def time_to_live(self, key: SelectType.String_) -> Union[float, None]:
+        """
+        Function to return the seconds left before a key expires.
+
+        Returns:
+            Union[float, None]: The remaining seconds, or None if the key is missing or never expires.
+        """
+        if self.__lazy and key in self.__lazy:
+            self.__materialize__([key])
+        with self.__read_session__():
+            deadline = self.__expiry.get(key)
+            if deadline is None or key not in self.__data:
+                return None
+            return max(0.0, deadline - time.monotonic())
+
+    def purge_expired(self) -> int:
+        """
+        Function to remove every expired key now instead of on the next write.
+
+        Returns:
+            int: The number of keys removed.
+        """
+        with self.__data.mainsession:
+            return self.__expire_due__()
+
+    def set_compression(
+        self,
+        codec: Union[SelectType.String_, None] = "zlib",
+        threshold: int = 4096,
+        level: Union[int, None] = None,
+        cache_bytes: int = 0,
+    ) -> None:
+        """
+        Function to store large str, bytes and bytearray values compressed.
+
+        Args:
+            codec (Union[SelectType.String_, None], optional): "zlib" (default), "lzma", "bz2", or None to
+                stop compressing new writes.
+            threshold (int, optional): Values shorter than this many bytes (characters for str) are stored
+                as they are. Default is 4096.
+            level (Union[int, None], optional): The codec's compression level or preset; None uses its default.
+            cache_bytes (int, optional): Size of an LRU cache of decompressed values for hot keys;
+                0 (default) disables it. The cache is not counted against the memory limit.
+
+        Raises:
+            ValueError: If the codec is unknown.
+
+        Behavior:
+            - Compresses before the lock is taken; a value is kept as it is when compressing does not
+              make it smaller.
+            - The size ledger and the memory limit count the compressed size.
+            - `get`, `find_all`, `json` and `dump_json` decompress transparently; values already stored
+              stay as they are when the setting changes.
+        """
+        if codec is not None and codec not in COMPRESSION_CODECS:
+            raise ValueError(f"Unknown compression codec '{codec}'.")
+        with self.__write_session__():
+            self.__compression = None if codec is None else (codec, threshold, level)
+            self.__decompressed = DecompressedCache(cache_bytes) if cache_bytes > 0 else None
+
+    def set_cold_tier(self, path: Union[SelectType.String_, None]) -> None:
+        """
+        Function to keep evicted entries in a local disk tier instead of dropping them.
+
+        Args:
+            path (Union[SelectType.String_, None]): The sqlite3 file for the tier (emptied on open), or
+                None to turn the tier off.
+
+        Behavior:
+            - Entries the eviction policy pushes out are pickled into the file and promoted back into
+              memory on the next `get` (or any other read of the key), evicting colder keys if needed.
+            - Enables the "lru" eviction policy if none is set, since demotion needs a policy to pick
+              cold keys. Values that cannot be pickled are evicted as before.
+            - Turning the tier off (or replacing it) drops the entries still on disk, as if they had
+              been evicted then; `on_evict` is not called for them.
+        """
+        if self.__cold is not None:
+            old = self.__cold
+            with self.__write_session__():
+                for key in [key for key, entry in self.__lazy.items() if entry[0] is old]:
+                    del self.__lazy[key]
+                self.__cold = None
+            old.close()
+        if path is None:
+            return
+        cold = ColdTier(path)
+        if self.__eviction is None:
+            self.set_eviction_policy("lru")
+        with self.__write_session__():
+            self.__cold = cold
+
+    def tier_stats(self) -> Dict[str, int]:
+        """
+        Function to report hits and misses per storage tier.
+
+        Returns:
+            Dict[str, int]: "memory_hits"/"memory_misses" for `get` lookups in memory, "disk_hits" for
+            lookups served from the cold tier or a loaded snapshot, "disk_misses" for keys found in
+            neither, the number of "demotions" and "promotions", and "memory_keys"/"disk_keys".
+        """
+        with self.__read_session__():
+            with self.__tier_lock:
+                stats = dict(self.__tier_stats)
+            stats["memory_keys"] = len(self.__data._data)
+            stats["disk_keys"] = len(self.__lazy)
+            return stats
+
+    def eviction_stats(self) -> Dict[str, Any]:
+        """
+        Function to report eviction counters.
+
+        Returns:
+            Dict[str, Any]: The policy name, the number of evictions, the bytes they released and
+            the writes that were still rejected after evicting everything the policy allowed.
+        """
+        with self.__read_session__():
+            stats = dict(self.__eviction_stats)
+            stats["policy"] = self.__eviction.name if self.__eviction is not None else None
+            return stats
+
+    def set_metrics(self, enabled: SelectType.Boolean_ = True) -> None:
+        """
+        Function to start or stop recording operation metrics.
+
+        Args:
+            enabled (SelectType.Boolean_, optional): True starts a fresh set of counters and histograms;
+                False stops recording and drops them.
+
+        Behavior:
+            - While enabled, get, insert, update, pop (and their async forms) and execute_function
+              count their calls and errors and record their latency in a LatencyHistogram.
+            - Time spent waiting for the struct's lock, and the bytes admitted or rejected by
+              writes, are recorded too.
+            - Disabled (the default), the instrumented methods only check for None.
+        """
+        self.__metrics = StructMetrics() if enabled else None
+
+    def __metrics_gauges__(self) -> Dict[str, Any]:
+        with self.__tier_lock:
+            tiers = dict(self.__tier_stats)
+        with self.__read_session__():
+            return {
+                "ledger_bytes": self.__ledger.total,
+                "keys": len(self.__data._data) + len(self.__lazy),
+                "budget_used_bytes": self.__budget.used,
+                "get_hits": tiers["memory_hits"] + tiers["disk_hits"],
+                "get_misses": tiers["disk_misses"],
+            }
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Function to report the recorded metrics as a dict.
+
+        Returns:
+            Dict[str, Any]: "operations" maps each operation to its count, errors and latency summary
+            (mean, p50, p90, p99, p99.9 and max in microseconds); "lock_wait" summarises lock waits;
+            "bytes_admitted", "bytes_rejected" and "rejected_writes" count admission; "ledger_bytes",
+            "keys", "budget_used_bytes", "get_hits" and "get_misses" are current values.
+
+        Raises:
+            RuntimeError: If metrics are not enabled (see `set_metrics`).
+        """
+        metrics = self.__metrics
+        if metrics is None:
+            raise RuntimeError("Metrics are not enabled; call set_metrics() first.")
+        return metrics.snapshot(self.__metrics_gauges__())
+
+    def metrics_text(
+        self, prefix: SelectType.String_ = "memory_aware_struct", labels: Union[Dict[str, str], None] = None
+    ) -> SelectType.String_:
+        """
+        Function to render the recorded metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (SelectType.String_, optional): The prefix of every metric name.
+            labels (Union[Dict[str, str], None], optional): Labels added to every sample; defaults
+                to {"struct": <class name>}.
+
+        Returns:
+            SelectType.String_: The exposition text, ready to serve from a /metrics endpoint.
+
+        Raises:
+            RuntimeError: If metrics are not enabled (see `set_metrics`).
+        """
+        metrics = self.__metrics
+        if metrics is None:
+            raise RuntimeError("Metrics are not enabled; call set_metrics() first.")
+        if labels is None:
+            labels = {"struct": self.__struct_name}
+        return metrics.to_prometheus(self.__metrics_gauges__(), labels, prefix)
+
+    @property
+    def struct_metrics(self) -> Union[StructMetrics, None]:
+        """The live StructMetrics, or None while metrics are disabled."""
+        return self.__metrics
+
+    def set_change_feed(self, capacity: Union[int, ChangeFeed, None] = 4096) -> None:
+        """
+        Function to record a change feed that subscribers can read deltas from.
+
+        Args:
+            capacity (Union[int, ChangeFeed, None], optional): The number of events the ring buffer
+                keeps, or an existing ChangeFeed to publish into (e.g. one shared by several structs).
+                None stops recording.
+
+        Raises:
+            ValueError: If `capacity` is not a positive integer.
+
+        Behavior:
+            - Every insert, update, pop and clear (and every expiry, or eviction that drops a key)
+              appends a ChangeEvent while the write still holds the lock, so events are in commit order.
+            - Values only moving between memory and the cold tier or a snapshot are not announced.
+            - Subscriptions to a replaced feed keep their old feed, which stops receiving events.
+        """
+        if capacity is not None and not isinstance(capacity, ChangeFeed):
+            capacity = ChangeFeed(capacity)
+        with self.__write_session__():
+            self.__feed = capacity
+
+    @property
+    def change_feed(self) -> Union[ChangeFeed, None]:
+        """The ChangeFeed writes are published to, or None while no feed is recorded."""
+        return self.__feed
+
+    def subscribe(
+        self, cursor: Union[int, None] = None, timeout: Union[SelectType.Numeric_, None] = None
+    ) -> Subscription:
+        """
+        Function to follow the changes made to the store.
+
+        Args:
+            cursor (Union[int, None], optional): The first event to read, usually the `cursor` a
+                previous Subscription stopped at. None starts at the next change.
+            timeout (Union[SelectType.Numeric_, None], optional): Seconds an iterator waits for the next
+                event before it stops; None waits until `Subscription.close`.
+
+        Returns:
+            Subscription: Iterate it with `for` or `async for`, or call `poll()` for the pending events.
+
+        Raises:
+            ChangeFeedOverflow: When reading, if the events from `cursor` on were already overwritten;
+                re-read the store (e.g. with `json()`) and subscribe again.
+
+        Behavior:
+            - Starts a ChangeFeed with the default capacity if none is recorded yet.
+        """
+        with self.__write_session__():
+            if self.__feed is None:
+                self.__feed = ChangeFeed()
+            feed = self.__feed
+        return Subscription(feed, feed.head if cursor is None else cursor, timeout)
+
+    
+    @_instrumented("get")
+    def get(
+        self, key: SelectType.String_, default: SelectType.Any_ = None
+    ) -> SelectType.Any_:
+        """
+        Function to retrieve a value from the dictionary based on the provided key.
+
+        This function returns the value associated with the specified key in the dictionary.
+        If the key does not exist, it returns a default value.
+
+        Args:
+            key (SelectType.String_): The key whose value is to be retrieved from the dictionary.
+            default (SelectType.Any_, optional): The value to return if the key is not found. Default is None.
+
+        Returns:
             SelectType.Any_: The value associated with the key, or the default value if the key is not found.
+                dicts, lists and tuples come back as read-only `DictView`/`SequenceView` proxies and
+                bytes as a read-only `memoryview`; nothing is copied.
 
         Behavior:
-            - Utilizes a lock (`self.__data.mainsession`) to ensure thread-safe access when reading data.
+            - Utilizes the read side of `self.__data.mainsession` to ensure thread-safe access when reading data;
+              in "rw" concurrency mode many readers proceed in parallel.
+            - A key still waiting in a loaded snapshot or in the cold tier is unpickled and promoted first.
+            - Compressed values are decompressed after the lock is released (see `set_compression`).
+            - Counts memory and disk hits and misses for `tier_stats` (pattern keys are not counted).
         """
-        with self.__data.mainsession:  # Lock saat membaca data
+        pattern = key.startswith("%") and key.endswith("%") and len(key) > 1
+        counted = pattern  # Kunci pola tidak dihitung
+        if self.__lazy:
+            if pattern:
+                self.__materialize_matching__(key[1:-1])
+            elif key in self.__lazy:
+                self.__count_tiers__("memory_misses", "disk_hits")
+                self.__materialize__([key])
+                counted = True
+        with self.__read_session__():  # Lock saat membaca data
+            if self.__expiry and self.__is_expired__(key):
+                return default  # Sudah kedaluwarsa, dibersihkan oleh expiry_reaper atau penulisan berikutnya
+            if not counted:
+                if key in self.__data:
+                    self.__count_tiers__("memory_hits")
+                else:
+                    self.__count_tiers__("memory_misses", "disk_misses")
             data = self.__data.get(key, default)
-            if  isinstance(data, (dict, tuple, list)):
-                return AwareData(data)
-            return data
+            if self.__eviction is not None:
+                with self.__eviction.mutex:
+                    self.__eviction.touch(key)
+            if data is default:
+                return data
+        if type(data) is CompressedValue:
+            # Dekompresi di luar lock
+            data = data.decompress() if pattern else self.__inflate__(key, data)
+        return view_of(data)
+
+    def iter_matching(self, pattern: SelectType.String_, batch_size: int = 256):
+        """
+        Function to stream every item whose key matches an SQL LIKE-style pattern.
+
+        Args:
+            pattern (SelectType.String_): The pattern, `%` for any run of characters and `?` for one,
+                without the surrounding `%...%` that `get` uses (e.g. "user:42:%").
+            batch_size (int, optional): How many values are read per lock acquisition. Default is 256.
+
+        Yields:
+            tuple: `(key, value)` pairs; structured values are read-only views like in `get`.
+
+        Behavior:
+            - Collects the matching keys under the read lock, using the sorted key index for patterns
+              with a literal prefix, then reads the values in batches so the lock is not held between yields.
+            - Keys removed or expired in the meantime are skipped; the eviction policy is not touched.
+        """
+        if self.__lazy:
+            self.__materialize_matching__(pattern)
+        with self.__read_session__():
+            keys = [key for key, _ in self.__data.iter_matching(pattern)]
+        for batch in self.__iter_batches__(keys, batch_size):
+            for key, data in batch:
+                if type(data) is CompressedValue:
+                    data = self.__inflate__(key, data)
+                yield key, view_of(data)
+
+    def find_all(self, pattern: SelectType.String_) -> SelectType.Dict_:
+        """
+        Function to return every item whose key matches an SQL LIKE-style pattern.
+
+        Args:
+            pattern (SelectType.String_): The pattern, as in `iter_matching`.
+
+        Returns:
+            SelectType.Dict_: The matching keys and their values.
+        """
+        return dict(self.iter_matching(pattern))
     
     @property
     def update(self) -> None:
@@ -431,6 +3545,7 @@ class MemoryAwareStruct(SelectType):
 
     
     @update.setter
+    @_instrumented("update")
     def update(self, dict_new: SelectType.Dict_) -> None:
         """
         Function to update values in the dictionary based on the provided new dictionary.
@@ -440,64 +3555,32 @@ class MemoryAwareStruct(SelectType):
 
         Args:
             dict_new (SelectType.Dict_): The new dictionary containing values to update in the existing dictionary.
+                A `(dict_new, ttl)` tuple sets a time-to-live in seconds, either one number for every key
+                or a dict of per-key values.
 
         Raises:
             TypeError: If dict_new is not of dictionary type.
 
         Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe modification of the dictionary.
-            - Calculates the total memory usage before and after the update to prevent exceeding memory limits.
+            - Measures only the incoming values and reserves their size in the memory budget before taking
+              the lock (`self.__data.mainsession`), which is then held only to commit the values.
             - If memory is full or the new memory exceeds the maximum allowed, a warning is printed and the update is restricted.
         """
-        global max_memory_usage, memory_warning_triggered
+        dict_new, ttl = self.__split_ttl__(dict_new)
         if isinstance(dict_new, self.Dict_):
-            with self.__data.mainsession:  # Lock saat modifikasi dictionary
-                current_dict_size = self.__get_total_size__()
-                new_dict_size = self.__get_total_size__(dict_new)
-
-                # Hitung memori total setelah insert
-                potential_used_memory = current_dict_size + new_dict_size
-                time.sleep(0.001)
-                if (
-                    self.__h_Data__()
-                    and not self.__is_memory_full__()
-                    and potential_used_memory < self.__check_max_memory_usage__()
-                    and not self.__check_memory_warning_triggered__()
-                ):
-                    for key in dict_new.keys():
-                        if key in self.__data:
-                            # Jika key sudah ada, lakukan update
-                            old_value = self.__data[key]
-                            old_value_size = sys.getsizeof(old_value)
-                            new_value_size = sys.getsizeof(dict_new)
-                            # Jika instance tidak memiliki batas memori, gunakan batas memori global
-                            if not self.__get_attribute__("max_memory_usage"):
-                                max_memory_usage = self.__get_max_allowed_memory__()
-                            else:
-                                self.max_memory_usage += old_value_size - new_value_size
-                                if self.max_memory_usage <= 0:
-                                    self.max_memory_usage = 0
-                                max_memory_usage = (
-                                    self.__get_max_allowed_memory__()
-                                    - self.max_memory_usage
-                                )
-                        time.sleep(0.02)
-                        if self.__check_max_memory_usage__() > 0:
-                            self.__data.update(
-                                {key: dict_new[key]}
-                            )  # Gunakan RestrictedDict
-
-                else:
-                    if not self.__get_attribute__("max_memory_usage"):
-                        memory_warning_triggered = True
-                    else:
-                        self.memory_warning_triggered = True
-                    print("Warning: Memory full, updates restricted!")
+            dict_new = self.__compress_entries__(dict_new)
+            new_sizes = self.__measure_entries__(dict_new)  # Diukur tanpa lock
+            # Lock hanya untuk commit
+            with self.__reserved_session__(sum(new_sizes.values())) as reserved:
+                self.__update_locked__(dict_new, new_sizes, ttl, reserved)
         else:
             raise TypeError("Not Type Dict Error")
 
    
-    async def async_update(self, dict_new: SelectType.Dict_) -> None:
+    @_instrumented("update")
+    async def async_update(
+        self, dict_new: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> None:
         """
         Asynchronous function to update values in the dictionary based on the provided new dictionary.
 
@@ -506,68 +3589,21 @@ class MemoryAwareStruct(SelectType):
 
         Args:
             dict_new (SelectType.Dict_): The new dictionary containing values to update in the existing dictionary.
+            ttl (SelectType.Any_, optional): Time-to-live in seconds for every key, or a dict of per-key values.
 
         Raises:
             TypeError: If dict_new is not of dictionary type.
 
         Behavior:
-            - Uses an asynchronous lock to ensure thread-safe modification of the dictionary.
-            - Calculates the total memory usage before and after the update to prevent exceeding memory limits.
+            - Measures large payloads in the default executor so the event loop keeps running.
+            - Uses the per-instance asyncio lock and then `self.__data.mainsession`, acquired without blocking the loop.
             - If memory is full or the new memory exceeds the maximum allowed, a warning is printed and the update is restricted.
         """
-        global max_memory_usage, memory_warning_triggered
-
         if isinstance(dict_new, self.Dict_):
-            async with asyncio.Lock():  # Menggunakan Lock saat modifikasi dictionary
-                # Kunci lock untuk memastikan hanya satu thread yang dapat mengakses data
-                with self.__data.mainsession:
-                    current_dict_size = self.__get_total_size__()
-                    new_dict_size = self.__get_total_size__(dict_new)
-
-                    # Hitung memori total setelah update
-                    potential_used_memory = current_dict_size + new_dict_size
-                    time.sleep(0.001)
-                    if (
-                        self.__h_Data__()
-                        and not self.__is_memory_full__()
-                        and potential_used_memory < self.__check_max_memory_usage__()
-                        and not self.__check_memory_warning_triggered__()
-                    ) and self.__can_insert_or_update__(new_dict_size):
-                        await asyncio.sleep(
-                            1
-                        )  # Simulasi penundaan untuk operasi asinkron
-                        for key in dict_new.keys():
-                            if key in self.__data:
-                                # Jika key sudah ada, lakukan update
-                                old_value = self.__data[key]
-                                old_value_size = sys.getsizeof(old_value)
-                                new_value_size = sys.getsizeof(dict_new[key])
-
-                                if not self.__get_attribute__("max_memory_usage"):
-                                    max_memory_usage = self.__get_max_allowed_memory__()
-                                else:
-                                    self.max_memory_usage += (
-                                        old_value_size - new_value_size
-                                    )
-                                    if self.max_memory_usage <= 0:
-                                        self.max_memory_usage = 0
-                                    max_memory_usage = (
-                                        self.__get_max_allowed_memory__()
-                                        - self.max_memory_usage
-                                    )
-                                time.sleep(0.02)
-                                if self.__check_max_memory_usage__() > 0:
-                                    self.__data.update({key: dict_new[key]})
-
-                    else:
-                        if not self.__get_attribute__("max_memory_usage"):
-                            memory_warning_triggered = True
-                        else:
-                            # print(self.max_memory_usage, self.memory_warning_triggered)
-                            self.memory_warning_triggered = True
-
-                        print("Warning: Memory full, updates restricted!")
-
+            dict_new = await self.__async_compress_entries__(dict_new)
+            new_sizes = await self.__async_measure_entries__(dict_new)
+            async with self.__async_reserved_session__(sum(new_sizes.values())) as reserved:
+                self.__update_locked__(dict_new, new_sizes, ttl, reserved)
         else:
             raise TypeError("Not Type Dict Error")
 
@@ -577,6 +3613,7 @@ class MemoryAwareStruct(SelectType):
     
     
     @insert.setter
+    @_instrumented("insert")
     def insert(self, dict_new: SelectType.Dict_) -> None:
         """
         Function to insert values into the dictionary based on the provided new dictionary.
@@ -586,50 +3623,32 @@ class MemoryAwareStruct(SelectType):
 
         Args:
             dict_new (SelectType.Dict_): The new dictionary containing values to be inserted into the existing dictionary.
+                A `(dict_new, ttl)` tuple sets a time-to-live in seconds, either one number for every key
+                or a dict of per-key values.
 
         Raises:
             TypeError: If dict_new is not of dictionary type.
 
         Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe modification of the dictionary.
-            - Calculates the total memory usage before and after the insertion to prevent exceeding memory limits.
+            - Measures only the incoming values and reserves their size in the memory budget before taking
+              the lock (`self.__data.mainsession`), which is then held only to commit the values.
             - If memory is full or the new memory exceeds the maximum allowed, a warning is printed and the insertion is restricted.
         """
-        global max_memory_usage, memory_warning_triggered
+        dict_new, ttl = self.__split_ttl__(dict_new)
         if isinstance(dict_new, self.Dict_):
-            with self.__data.mainsession:  # Lock saat modifikasi dictionary
-                current_dict_size = self.__get_total_size__()
-                new_dict_size = self.__get_total_size__(dict_new)
-
-                # Hitung memori total setelah insert
-                potential_used_memory = current_dict_size + new_dict_size
-                time.sleep(0.001)
-                if (
-                    self.__h_Data__()
-                    and not self.__is_memory_full__()
-                    and potential_used_memory < self.__check_max_memory_usage__()
-                    and not self.__check_memory_warning_triggered__()
-                ) and self.__can_insert_or_update__(new_dict_size):
-                    self.__data.update(dict_new)  # Menggunakan RestrictedDict
-                    if not self.__get_attribute__("max_memory_usage"):
-                        max_memory_usage = self.__get_max_allowed_memory__()
-                    else:
-                        self.max_memory_usage -= new_dict_size
-                        if self.max_memory_usage <= 0:
-                            self.max_memory_usage = 0
-                        max_memory_usage = (
-                            self.__get_max_allowed_memory__() - self.max_memory_usage
-                        )
-                else:
-                    if not self.__get_attribute__("max_memory_usage"):
-                        memory_warning_triggered = True
-                    else:
-                        self.memory_warning_triggered = True
+            dict_new = self.__compress_entries__(dict_new)
+            new_sizes = self.__measure_entries__(dict_new)  # Diukur tanpa lock
+            # Lock hanya untuk commit
+            with self.__reserved_session__(sum(new_sizes.values())) as reserved:
+                self.__insert_locked__(dict_new, new_sizes, ttl, reserved)
         else:
             raise TypeError("Not Type Dict Error")
 
    
-    async def async_insert(self, dict_new: SelectType.Dict_) -> None:
+    @_instrumented("insert")
+    async def async_insert(
+        self, dict_new: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> None:
         """
         Asynchronous function to insert values into the dictionary based on the provided new dictionary.
 
@@ -638,59 +3657,33 @@ class MemoryAwareStruct(SelectType):
 
         Args:
             dict_new (SelectType.Dict_): The new dictionary containing values to be inserted into the existing dictionary.
+            ttl (SelectType.Any_, optional): Time-to-live in seconds for every key, or a dict of per-key values.
 
         Raises:
             TypeError: If dict_new is not of dictionary type.
 
         Behavior:
-            - Uses an asynchronous lock to ensure thread-safe modification of the dictionary.
-            - Calculates the total memory usage before and after the insertion to prevent exceeding memory limits.
+            - Measures large payloads in the default executor so the event loop keeps running.
+            - Uses the per-instance asyncio lock and then `self.__data.mainsession`, acquired without blocking the loop.
             - If memory is full or the new memory exceeds the maximum allowed, a warning is printed and the insertion is restricted.
         """
-        global max_memory_usage, memory_warning_triggered
         if isinstance(dict_new, self.Dict_):
-            async with asyncio.Lock():  # Menggunakan Lock saat modifikasi dictionary
-                # Kunci lock untuk memastikan hanya satu thread yang dapat mengakses data
-                with self.__data.mainsession:  # Lock saat modifikasi dictionary
-                    current_dict_size = self.__get_total_size__()
-                    new_dict_size = self.__get_total_size__(dict_new)
-
-                    # Hitung memori total setelah insert
-                    potential_used_memory = current_dict_size + new_dict_size
-                    time.sleep(0.001)
-                    if (
-                        self.__h_Data__()
-                        and not self.__is_memory_full__()
-                        and potential_used_memory < self.__check_max_memory_usage__()
-                        and not self.__check_memory_warning_triggered__()
-                    ) and self.__can_insert_or_update__(new_dict_size):
-                        await asyncio.sleep(
-                            1
-                        )  # Simulasi penundaan untuk operasi asinkron
-                        self.__data.update(dict_new)  # Menggunakan RestrictedDict
-                        if not self.__get_attribute__("max_memory_usage"):
-                            max_memory_usage = self.__get_max_allowed_memory__()
-                        else:
-                            self.max_memory_usage -= new_dict_size
-                            if self.max_memory_usage <= 0:
-                                self.max_memory_usage = 0
-                            max_memory_usage = (
-                                self.__get_max_allowed_memory__()
-                                - self.max_memory_usage
-                            )
-
-                    else:
-                        if not self.__get_attribute__("max_memory_usage"):
-                            memory_warning_triggered = True
-                        else:
-                            # print(self.max_memory_usage, self.memory_warning_triggered)
-                            self.memory_warning_triggered = True
-
+            dict_new = await self.__async_compress_entries__(dict_new)
+            new_sizes = await self.__async_measure_entries__(dict_new)
+            async with self.__async_reserved_session__(sum(new_sizes.values())) as reserved:
+                self.__insert_locked__(dict_new, new_sizes, ttl, reserved)
         else:
             raise TypeError("Not Type Dict Error")
 
     
-    def insert_function(self, key: SelectType.String_, func: SelectType.Any_) -> None:
+    def insert_function(
+        self,
+        key: SelectType.String_,
+        func: SelectType.Any_,
+        memoize: SelectType.Boolean_ = False,
+        max_entries: int = 128,
+        ttl: SelectType.Numeric_ = None,
+    ) -> None:
         """
         Function to insert a callable function into the dictionary, with memory usage checks.
 
@@ -700,59 +3693,48 @@ class MemoryAwareStruct(SelectType):
         Args:
             key (SelectType.String_): The key to associate with the function.
             func (SelectType.Any_): The function to be inserted into the dictionary.
+            memoize (SelectType.Boolean_, optional): Cache the function's results per argument set, so
+                `execute_function`, `submit_function` and `map_function` skip repeated calls. Default is False.
+            max_entries (int, optional): With `memoize`, the most results kept (least recently used go first).
+            ttl (SelectType.Numeric_, optional): With `memoize`, seconds a result stays valid; None keeps it
+                until it is pushed out.
 
         Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe access to the dictionary
-              during the insert operation.
-            - Calculates the memory usage of the current dictionary and the potential new size after
-              the insertion.
+            - Measures the function and reserves its size in the memory budget first, then uses a lock
+              (`self.__data.mainsession`) only to commit the insert.
             - Checks if the memory limit is exceeded, and whether inserting the new function is allowed
               based on the available memory.
             - If the insertion is possible, the function is added to the dictionary, and memory usage is
               adjusted.
             - If the memory usage exceeds the limit, a warning (`memory_warning_triggered`) is raised.
             - Raises a `TypeError` if the provided function is not callable.
+            - Cached results are charged to the function's key in the size ledger, so they count against
+              the same memory limit and leave with the key. A result that does not fit pushes the
+              function's older results out, and is not cached when that is not enough.
+            - Calls with unhashable arguments are never cached. Registering the key again, or any other
+              write to it, drops its results.
 
         Raises:
             TypeError: If `func` is not a callable function.
+            ValueError: If `max_entries` or `ttl` is not positive.
         """
-        global max_memory_usage, memory_warning_triggered
         if callable(func):
-            with self.__data.mainsession:  # Lock saat menambahkan fungsi
-                current_dict_size = self.__get_total_size__()
-                new_dict_size = self.__get_total_size__({key: func})
-
-                # Hitung memori total setelah insert
-                potential_used_memory = current_dict_size + new_dict_size
-                time.sleep(0.001)
-                if (
-                    self.__h_Data__()
-                    and not self.__is_memory_full__()
-                    and potential_used_memory < self.__check_max_memory_usage__()
-                    and not self.__check_memory_warning_triggered__()
-                ) and self.__can_insert_or_update__(new_dict_size):
-                    self.__data[key] = func  # Menyimpan fungsi dalam RestrictedDict
-                    if not self.__get_attribute__("max_memory_usage"):
-                        max_memory_usage = self.__get_max_allowed_memory__()
-                    else:
-                        self.max_memory_usage -= new_dict_size
-                        if self.max_memory_usage <= 0:
-                            self.max_memory_usage = 0
-                        max_memory_usage = (
-                            self.__get_max_allowed_memory__() - self.max_memory_usage
-                        )
-
-                else:
-                    if not self.__get_attribute__("max_memory_usage"):
-                        memory_warning_triggered = True
-                    else:
-                        self.memory_warning_triggered = True
+            memo = FunctionMemo(func, max_entries, ttl) if memoize else None
+            new_sizes = self.__measure_entries__({key: func})
+            with self.__reserved_session__(new_sizes[key]) as reserved:  # Lock saat menambahkan fungsi
+                if self.__insert_locked__({key: func}, new_sizes, None, reserved) and memo is not None:
+                    self.__memos[key] = memo
         else:
             raise TypeError("The parameter must be a callable function.")
 
    
     async def async_insert_function(
-        self, key: SelectType.String_, func: SelectType.Any_
+        self,
+        key: SelectType.String_,
+        func: SelectType.Any_,
+        memoize: SelectType.Boolean_ = False,
+        max_entries: int = 128,
+        ttl: SelectType.Numeric_ = None,
     ) -> None:
         """
         Asynchronous function to insert a key-function pair into the dictionary, with memory usage checks.
@@ -763,60 +3745,28 @@ class MemoryAwareStruct(SelectType):
         Args:
             key (SelectType.String_): The key to associate with the function.
             func (SelectType.Any_): The function to be inserted into the dictionary.
+            memoize, max_entries, ttl: Result caching, as in `insert_function`.
 
         Behavior:
-            - Uses `self.__data.mainsession` to ensure thread-safe access to the dictionary during the insert operation.
+            - Uses the per-instance asyncio lock and then `self.__data.mainsession`, acquired without blocking the loop.
             - Calculates the potential memory usage after insertion and checks if it is below the allowed memory threshold.
             - If memory usage is within the limit, the function is inserted into the dictionary.
             - If memory exceeds the limit, a memory warning is triggered and the insertion is prevented.
-            - Simulates asynchronous operation with `await asyncio.sleep(0.001)`.
 
         Raises:
             TypeError: If `func` is not a callable function.
         """
-        global max_memory_usage, memory_warning_triggered
         if callable(func):
-            async with asyncio.Lock():  # Menggunakan Lock saat modifikasi dictionary
-                # Kunci lock untuk memastikan hanya satu thread yang dapat mengakses data
-                with self.__data.mainsession:  # Lock saat modifikasi dictionary
-                    current_dict_size = self.__get_total_size__()
-                    new_dict_size = self.__get_total_size__({key: func})
-
-                    # Hitung memori total setelah insert
-                    potential_used_memory = current_dict_size + new_dict_size
-                    time.sleep(0.001)
-                    if (
-                        self.__h_Data__()
-                        and not self.__is_memory_full__()
-                        and potential_used_memory < self.__check_max_memory_usage__()
-                        and not self.__check_memory_warning_triggered__()
-                    ) and self.__can_insert_or_update__(new_dict_size):
-                        await asyncio.sleep(
-                            1
-                        )  # Simulasi penundaan untuk operasi asinkron
-                        self.__data[key] = func  # Menyimpan fungsi dalam RestrictedDict
-                        if not self.__get_attribute__("max_memory_usage"):
-                            max_memory_usage = self.__get_max_allowed_memory__()
-                        else:
-                            self.max_memory_usage -= new_dict_size
-                            if self.max_memory_usage <= 0:
-                                self.max_memory_usage = 0
-                            max_memory_usage = (
-                                self.__get_max_allowed_memory__()
-                                - self.max_memory_usage
-                            )
-
-                    else:
-                        if not self.__get_attribute__("max_memory_usage"):
-                            memory_warning_triggered = True
-                        else:
-                            # print(self.max_memory_usage, self.memory_warning_triggered)
-                            self.memory_warning_triggered = True
-                    # print(self.max_memory_usage, memory_warning_triggered)
+            memo = FunctionMemo(func, max_entries, ttl) if memoize else None
+            new_sizes = await self.__async_measure_entries__({key: func})
+            async with self.__async_reserved_session__(new_sizes[key]) as reserved:
+                if self.__insert_locked__({key: func}, new_sizes, None, reserved) and memo is not None:
+                    self.__memos[key] = memo
         else:
             raise TypeError("Not Type Dict Error")
 
     
+    @_instrumented("pop")
     def pop(self, params: SelectType.String_) -> None:
         """
         Function to remove a key from the dictionary, adjusting memory usage accordingly.
@@ -829,63 +3779,744 @@ class MemoryAwareStruct(SelectType):
 
         Behavior:
             - Uses a lock (`self.__data.mainsession`) to ensure thread-safe removal of the item.
-            - Calculates the size of the item to be removed and adjusts both the instance and global memory usage limits.
+            - Credits the size recorded in the ledger back to the memory budget (and its parents).
             - If the key exists, it removes the item and prints "success", otherwise prints "failed".
         """
-        global max_memory_usage
         with self.__data.mainsession:  # Lock saat penghapusan data
-            if params in self.__data:
-                # kembalikan ukuran sesuai size dict dipop
-                curentsize_old = self.__get_total_size__(self.__data[params])
-                time.sleep(0.001)
-                if not self.__get_attribute__("max_memory_usage"):
-                    max_memory_usage += curentsize_old
-                else:
-                    self.max_memory_usage += curentsize_old
-                    max_memory_usage += curentsize_old
-                time.sleep(0.02)
-                self.__data.pop(params)  # Menggunakan pop dari RestrictedDict
-                print("success")
-            else:
-                print("failed")
+            self.__pop_locked__(params)
 
    
+    @_instrumented("pop")
     async def async_pop(self, params: SelectType.String_) -> None:
         """
         Asynchronous function to remove an item from the dictionary based on the given key.
 
-        - This function uses an `self.__data.mainsession` to ensure that the dictionary is modified in a thread-safe manner.
+        - This function uses the per-instance asyncio lock and `self.__data.mainsession` so the dictionary
+          is modified safely from both coroutines and threads.
         - If the key exists in the dictionary, it removes the item and adjusts the memory usage accordingly.
-        - The function simulates a delay using `asyncio.sleep(0.001)` to represent asynchronous operations.
 
         Args:
             params (SelectType.String_): The key of the item to be removed from the dictionary.
 
         Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure that the dictionary is not modified by multiple threads concurrently.
-            - Checks if the key exists, and if found, calculates the memory size of the item to be removed and adjusts both the instance's and global memory usage limits.
+            - Acquires `self.__data.mainsession` without blocking the event loop.
+            - Checks if the key exists, and if found, credits the size recorded in the ledger back to the memory budget.
             - Removes the item from the dictionary using the `pop` method.
             - If the key does not exist, it prints "failed".
         """
-        global max_memory_usage
-        async with asyncio.Lock():  # Menggunakan Lock saat modifikasi dictionary
-            # Kunci lock untuk memastikan hanya satu thread yang dapat mengakses data
-            with self.__data.mainsession:  # Lock saat penghapusan data
-                if params in self.__data:
-                    await asyncio.sleep(0.001)  # Simulasi penundaan untuk operasi asinkro
-
-                    # kembalikan ukuran sesuai size dict dipop
-                    curentsize_old = self.__get_total_size__(self.__data[params])
-                    if not self.__get_attribute__("max_memory_usage"):
-                        max_memory_usage += curentsize_old
-                    else:
-                        self.max_memory_usage += curentsize_old
-                        max_memory_usage += curentsize_old
-                    time.sleep(0.02)
-                    self.__data.pop(params)  # Menggunakan pop dari RestrictedDict
-                    print("success")
-                else:
-                    print("failed")
+        async with self.__async_session__():
+            self.__pop_locked__(params)
+
+    def insert_many(
+        self, mapping: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> Dict[str, str]:
+        """
+        Function to insert many keys under one lock acquisition and one admission check.
+
+        Args:
+            mapping (SelectType.Dict_): The keys and values to insert.
+            ttl (SelectType.Any_, optional): Time-to-live in seconds for every key, or a dict of per-key values.
+
+        Returns:
+            Dict[str, str]: Per-key result: "inserted", "replaced" or "rejected".
+
+        Raises:
+            TypeError: If mapping is not of dictionary type.
+            KeyError: If any key is restricted; nothing is written then.
+
+        Behavior:
+            - Measures every value, then checks the net growth of the whole batch against the memory limit once.
+            - Applies every key or none of them; nothing is printed.
+        """
+        if not isinstance(mapping, self.Dict_):
+            raise TypeError("Not Type Dict Error")
+        RestrictedDict.check_keys(mapping)  # Seluruh batch ditolak sebelum ada yang ditulis
+        mapping = self.__compress_entries__(mapping)
+        new_sizes = self.__measure_entries__(mapping)  # Diukur tanpa lock
+        size = sum(new_sizes.values())
+        with self.__reserved_session__(size) as reserved:
+            return self.__write_many_locked__(
+                mapping, new_sizes, ttl, False, size if reserved else 0
+            )
+
+    def update_many(
+        self, mapping: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> Dict[str, str]:
+        """
+        Function to update many existing keys under one lock acquisition and one admission check.
+
+        Args:
+            mapping (SelectType.Dict_): The keys and their new values.
+            ttl (SelectType.Any_, optional): Time-to-live in seconds for every key, or a dict of per-key values.
+
+        Returns:
+            Dict[str, str]: Per-key result: "updated", "missing" (not stored, left out) or "rejected".
+
+        Raises:
+            TypeError: If mapping is not of dictionary type.
+            KeyError: If any key is restricted; nothing is written then.
+
+        Behavior:
+            - Keys that are not stored are skipped; the remaining keys are applied all together or not at all.
+        """
+        if not isinstance(mapping, self.Dict_):
+            raise TypeError("Not Type Dict Error")
+        RestrictedDict.check_keys(mapping)  # Seluruh batch ditolak sebelum ada yang ditulis
+        mapping = self.__compress_entries__(mapping)
+        new_sizes = self.__measure_entries__(mapping)  # Diukur tanpa lock
+        size = sum(new_sizes.values())
+        with self.__reserved_session__(size) as reserved:
+            return self.__write_many_locked__(
+                mapping, new_sizes, ttl, True, size if reserved else 0
+            )
+
+    def pop_many(self, keys) -> Dict[str, str]:
+        """
+        Function to remove many keys under one lock acquisition.
+
+        Args:
+            keys (Iterable[str]): The keys to remove.
+
+        Returns:
+            Dict[str, str]: Per-key result: "popped" or "missing".
+
+        Behavior:
+            - Credits the ledger sizes of all removed keys back to the memory limit at once; nothing is printed.
+        """
+        with self.__write_session__():
+            return self.__pop_many_locked__(keys)
+
+    async def async_insert_many(
+        self, mapping: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> Dict[str, str]:
+        """Asynchronous `insert_many`; large batches are measured in the default executor."""
+        if not isinstance(mapping, self.Dict_):
+            raise TypeError("Not Type Dict Error")
+        RestrictedDict.check_keys(mapping)
+        mapping = await self.__async_compress_entries__(mapping)
+        new_sizes = await self.__async_measure_entries__(mapping)
+        size = sum(new_sizes.values())
+        async with self.__async_reserved_session__(size) as reserved:
+            return self.__write_many_locked__(
+                mapping, new_sizes, ttl, False, size if reserved else 0
+            )
+
+    async def async_update_many(
+        self, mapping: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> Dict[str, str]:
+        """Asynchronous `update_many`; large batches are measured in the default executor."""
+        if not isinstance(mapping, self.Dict_):
+            raise TypeError("Not Type Dict Error")
+        RestrictedDict.check_keys(mapping)
+        mapping = await self.__async_compress_entries__(mapping)
+        new_sizes = await self.__async_measure_entries__(mapping)
+        size = sum(new_sizes.values())
+        async with self.__async_reserved_session__(size) as reserved:
+            return self.__write_many_locked__(
+                mapping, new_sizes, ttl, True, size if reserved else 0
+            )
+
+    async def async_pop_many(self, keys) -> Dict[str, str]:
+        """Asynchronous `pop_many`."""
+        keys = list(keys)
+        async with self.__async_session__():
+            return self.__pop_many_locked__(keys)
+
+    def __insert_locked__(
+        self,
+        dict_new: SelectType.Dict_,
+        new_sizes: Dict[str, SelectType.Numeric_],
+        ttl: SelectType.Any_ = None,
+        reserved: SelectType.Boolean_ = False,
+    ) -> SelectType.Boolean_:
+        """Admit and store ``dict_new``; the caller must hold ``mainsession``.
+
+        ``reserved`` means ``__reserve__`` already holds the measured size in the budget,
+        so only the commit is left; otherwise admission runs here, for the net growth
+        only. Either way the reservation is settled or given back before this returns
+        or raises.
+        """
+        size_to_add = sum(new_sizes.values()) if reserved else 0
+        with self.__unsettled__(size_to_add):
+            self.__expire_due__()
+            if not reserved:
+                size_to_add = self.__growth__(new_sizes)
+                if self.__eviction is not None:
+                    self.__make_room__(size_to_add, dict_new)
+                reserved = self.__admissible__(size_to_add)
+        if reserved:
+            self.__commit_data__(dict_new, new_sizes, ttl, size_to_add)
+            return True
+        self.__reject_write__(size_to_add)
+        return False
+
+    def __update_locked__(
+        self,
+        dict_new: SelectType.Dict_,
+        new_sizes: Dict[str, SelectType.Numeric_],
+        ttl: SelectType.Any_ = None,
+        reserved: SelectType.Boolean_ = False,
+    ) -> SelectType.Boolean_:
+        """Admit and apply ``dict_new``; the caller must hold ``mainsession``.
+
+        ``reserved`` has the same meaning as in ``__insert_locked__``.
+        """
+        size_to_add = sum(new_sizes.values()) if reserved else 0
+        with self.__unsettled__(size_to_add):
+            self.__expire_due__()
+            if not reserved:
+                size_to_add = self.__growth__(new_sizes)
+                if self.__eviction is not None:
+                    self.__make_room__(size_to_add, dict_new)
+                reserved = self.__admissible__(size_to_add)
+        if reserved:
+            self.__commit_data__(dict_new, new_sizes, ttl, size_to_add)
+            return True
+        self.__reject_write__(size_to_add)
+        print("Warning: Memory full, updates restricted!")
+        return False
+
+    def __try_write__(
+        self,
+        dict_new: SelectType.Dict_,
+        update: SelectType.Boolean_ = False,
+        ttl: SelectType.Any_ = None,
+    ) -> SelectType.Boolean_:
+        """Insert (or update) ``dict_new`` and report whether the write was admitted.
+
+        Compressing, measuring and reserving the bytes all happen before ``mainsession``
+        is taken; the lock is held only to commit.
+        """
+        dict_new = self.__compress_entries__(dict_new)
+        new_sizes = self.__measure_entries__(dict_new)
+        with self.__reserved_session__(sum(new_sizes.values())) as reserved:
+            if update:
+                return self.__update_locked__(dict_new, new_sizes, ttl, reserved)
+            return self.__insert_locked__(dict_new, new_sizes, ttl, reserved)
+
+    def __reserve__(self, size_to_add: SelectType.Numeric_) -> SelectType.Boolean_:
+        """Phase one of a write: reserve ``size_to_add`` bytes with no lock held.
+
+        Quiet and optimistic: False only means the commit runs the full admission
+        itself (evicting, or expiring keys, first), under the lock.
+        """
+        if not self.__fits_budget__(size_to_add) or self.__is_memory_full__():
+            return False
+        return self.__budget.reserve(size_to_add)
+
+    @contextlib.contextmanager
+    def __reserved_session__(self, size_to_add: SelectType.Numeric_):
+        """Reserve ``size_to_add`` bytes, then hold ``__write_session__`` for the commit.
+
+        Yields whether the reservation succeeded; from then on the locked write owns it.
+        If the lock is never entered, the reservation is given back.
+        """
+        reserved = self.__reserve__(size_to_add)
+        entered = False
+        try:
+            with self.__write_session__():
+                entered = True
+                yield reserved
+        finally:
+            if reserved and not entered:
+                self.__release_memory__(size_to_add)
+
+    @contextlib.contextmanager
+    def __unsettled__(self, reserved: SelectType.Numeric_):
+        """Give ``reserved`` bytes back if the block raises before they reach ``__commit_data__``."""
+        try:
+            yield
+        except BaseException:
+            self.__release_memory__(reserved)
+            raise
+
+    def __commit_data__(
+        self,
+        dict_new: SelectType.Dict_,
+        new_sizes: Dict[str, SelectType.Numeric_],
+        ttl: SelectType.Any_,
+        reserved: SelectType.Numeric_,
+        announce: SelectType.Boolean_ = True,
+    ) -> None:
+        """Store already admitted values and settle the ``reserved`` bytes against the ledger.
+
+        If the store fails partway, the keys that did land are still recorded and
+        announced, and the rest of the reservation is given back before the error propagates. ``announce``
+        False keeps the write out of the change feed.
+        """
+        changes = self.__changes_for__(dict_new) if announce else None
+        data = self.__data
+        version = data.version
+        try:
+            data.update(dict_new)  # Menggunakan RestrictedDict
+        except BaseException:
+            landed = list(dict_new)[: data.version - version]  # update menyimpan sesuai urutan
+            self.__settle__(landed, new_sizes, reserved)
+            if changes is not None:
+                stored = set(landed)
+                self.__announce__([change for change in changes if change[0] in stored])
+            self.__after_write__(landed, ttl)
+            raise
+        self.__settle__(dict_new, new_sizes, reserved)
+        self.memory_warning_triggered = False
+        if self.__metrics is not None:
+            self.__metrics.admitted(reserved)
+        self.__announce__(changes)
+        self.__after_write__(dict_new, ttl)
+
+    def __settle__(self, keys, new_sizes: Dict[str, SelectType.Numeric_], reserved: SelectType.Numeric_) -> None:
+        """Record ``keys`` in the ledger and charge their growth, drawn from ``reserved`` first.
+
+        Whatever is left of the reservation (overwritten keys, or keys that were never
+        stored) is given back, so the budget matches the ledger afterwards.
+        """
+        ledger = self.__ledger
+        remaining = reserved
+        for key in keys:
+            change = ledger.record(key, new_sizes[key])
+            share = min(remaining, max(change, 0))
+            remaining -= share
+            self.__charge_memory__(change - share)
+        self.__release_memory__(remaining)
+
+    def __after_write__(self, keys, ttl: SelectType.Any_) -> None:
+        """Per-key bookkeeping once ``keys`` hold new values; the caller must hold ``mainsession``."""
+        for key in keys:
+            if self.__lazy:
+                self.__drop_lazy__(key)  # Nilai baru menggantikan salinan di disk
+            if self.__memos:
+                self.__memos.pop(key, None)  # Ukurannya sudah ditimpa di ledger
+            if self.__eviction is not None:
+                self.__eviction.admit(key)
+            self.__set_expiry__(key, ttl)
+
+    def __iter_batches__(self, keys=None, batch_size: int = 256):
+        """Yield lists of live ``(key, value)`` pairs, taking the read lock once per batch.
+
+        ``keys`` defaults to every key stored when the generator starts; keys removed or
+        expired in the meantime are skipped.
+        """
+        if keys is None:
+            with self.__read_session__():
+                keys = list(self.__data.keys())
+        for start in range(0, len(keys), batch_size):
+            batch = []
+            with self.__read_session__():
+                for key in keys[start:start + batch_size]:
+                    if key not in self.__data or (self.__expiry and self.__is_expired__(key)):
+                        continue
+                    batch.append((key, self.__data[key]))
+            yield batch
+
+    def __items_snapshot__(self) -> list:
+        """Return a list of the stored items taken under the read lock."""
+        with self.__read_session__():
+            return [
+                (k, v)
+                for k, v in self.__data.items()
+                if not (self.__expiry and self.__is_expired__(k))
+            ]
+
+    def __pop_locked__(self, params: SelectType.String_) -> SelectType.Boolean_:
+        """Remove ``params`` and credit its ledger size back; the caller must hold ``mainsession``."""
+        if params in self.__data:
+            # kembalikan ukuran sesuai size dict dipop
+            self.__release_memory__(self.__discard_locked__(params))
+            self.__announce__(((params, "pop"),))
+            print("success")
+            return True
+        if self.__drop_lazy__(params):
+            self.__announce__(((params, "pop"),))
+            print("success")  # Masih di disk, tidak ada memori yang dikembalikan
+            return True
+        print("failed")
+        return False
+
+    def __discard_locked__(self, key: SelectType.String_) -> SelectType.Numeric_:
+        """Remove a stored key everywhere and return its ledger size (not yet credited back)."""
+        size = self.__ledger.discard(key)  # Termasuk hasil memo fungsi ini
+        self.__data.pop(key)  # Menggunakan pop dari RestrictedDict
+        if self.__memos:
+            self.__memos.pop(key, None)
+        if self.__eviction is not None:
+            self.__eviction.remove(key)
+        if self.__expiry.pop(key, None) is not None:
+            self.__wheel.cancel(key)
+        return size
+
+    def __write_many_locked__(
+        self,
+        mapping: SelectType.Dict_,
+        new_sizes: Dict[str, SelectType.Numeric_],
+        ttl: SelectType.Any_,
+        only_existing: SelectType.Boolean_,
+        reserved: SelectType.Numeric_ = 0,
+        announce: SelectType.Boolean_ = True,
+    ) -> Dict[str, str]:
+        """Admit ``mapping`` as one batch and apply it atomically; the caller must hold ``mainsession``.
+
+        ``reserved`` is the number of bytes ``__reserve__`` already holds for the batch;
+        the difference from the actual growth is settled after the commit, or the bytes
+        are given back if the batch is not applied. ``announce`` False keeps the batch
+        out of the change feed (values only moving between tiers).
+        """
+        results: Dict[str, str] = {}
+        with self.__unsettled__(reserved):
+            self.__expire_due__()
+            if only_existing:
+                for key in mapping:
+                    if key in self.__lazy:
+                        continue  # Masih di snapshot: tetap dianggap ada
+                    if key not in self.__data or self.__is_expired__(key):
+                        results[key] = "missing"
+                if results:
+                    mapping = {k: v for k, v in mapping.items() if k not in results}
+            if not mapping:
+                self.__release_memory__(reserved)
+                return results
+            if reserved:
+                size_to_add = reserved
+            else:
+                # Satu pemeriksaan untuk seluruh batch, hanya pertambahan bersih yang dihitung
+                size_to_add = self.__growth__({key: new_sizes[key] for key in mapping})
+                if self.__eviction is not None:
+                    self.__make_room__(size_to_add, mapping)
+        if not reserved and not self.__admissible__(size_to_add):
+            self.__reject_write__(size_to_add)
+            results.update(dict.fromkeys(mapping, "rejected"))
+            return results
+        for key in mapping:
+            if only_existing:
+                results[key] = "updated"
+            else:
+                results[key] = "replaced" if key in self.__data else "inserted"
+        self.__commit_data__(mapping, new_sizes, ttl, size_to_add, announce)
+        return results
+
+    def __pop_many_locked__(self, keys) -> Dict[str, str]:
+        """Remove ``keys`` and credit their sizes back once; the caller must hold ``mainsession``."""
+        self.__expire_due__()
+        results: Dict[str, str] = {}
+        released = 0
+        for key in keys:
+            if key in self.__data:
+                released += self.__discard_locked__(key)
+                results[key] = "popped"
+            elif self.__drop_lazy__(key):
+                results[key] = "popped"
+            else:
+                results.setdefault(key, "missing")
+        if released:
+            self.__release_memory__(released)
+        self.__announce__((key, "pop") for key, status in results.items() if status == "popped")
+        return results
+
+    def __admissible__(self, size_to_add: SelectType.Numeric_) -> SelectType.Boolean_:
+        """Run the admission checks shared by every write path and reserve ``size_to_add`` bytes.
+
+        On success the bytes are held in the budget; the caller settles the difference
+        between them and the ledger's actual growth with ``__charge_memory__``.
+        """
+        return (
+            self.__h_Data__()
+            and not self.__is_memory_full__()
+            and self.__can_insert_or_update__(size_to_add)
+            and self.__budget.reserve(size_to_add)
+        )
+
+    def __split_ttl__(self, dict_new: SelectType.Any_):
+        """Split a `(dict_new, ttl)` value given to the insert/update setters."""
+        if isinstance(dict_new, tuple) and len(dict_new) == 2:
+            return dict_new
+        return dict_new, None
+
+    def __set_expiry__(self, key: SelectType.String_, ttl: SelectType.Any_) -> None:
+        """Schedule (or clear) the expiry of a key that was just written.
+
+        None falls back to the default TTL; ``math.inf`` means the key never expires.
+        """
+        if isinstance(ttl, dict):
+            ttl = ttl.get(key)
+        if ttl is None:
+            ttl = self.__default_ttl
+        if ttl is None or ttl == math.inf:
+            if self.__expiry.pop(key, None) is not None:
+                self.__wheel.cancel(key)
+            return
+        self.__schedule_expiry__(key, ttl)
+
+    def __schedule_expiry__(self, key: SelectType.String_, ttl: SelectType.Numeric_) -> None:
+        if self.__wheel is None:
+            self.__wheel = TimerWheel()
+        if not self.__expiry:
+            expiry_reaper.register(self)  # Ukuran key yang kedaluwarsa dikembalikan tanpa menunggu tulisan
+        deadline = time.monotonic() + ttl
+        self.__expiry[key] = deadline
+        self.__wheel.schedule(key, deadline)
+
+    def __is_expired__(self, key: SelectType.String_) -> SelectType.Boolean_:
+        deadline = self.__expiry.get(key)
+        return deadline is not None and deadline <= time.monotonic()
+
+    def __expire_due__(self) -> int:
+        """Remove every key whose deadline passed and credit its size back; needs ``mainsession``."""
+        if not self.__expiry:
+            return 0
+        now = time.monotonic()
+        removed = 0
+        for key in self.__wheel.advance(now):
+            deadline = self.__expiry.get(key)
+            if deadline is None:
+                continue
+            if deadline > now:  # Resolusi tick lebih kasar dari tenggat
+                self.__wheel.schedule(key, deadline)
+                continue
+            self.__release_memory__(self.__discard_locked__(key))
+            self.__announce__(((key, "expire"),))
+            removed += 1
+        return removed
+
+    def __reap__(self) -> None:
+        """Expire due keys for ``expiry_reaper`` if ``mainsession`` is free right now.
+
+        Once no key has a deadline left the struct leaves the reaper, still under the
+        lock, so a concurrent ``__schedule_expiry__`` registers it again.
+        """
+        mainsession = self.__data.mainsession
+        if not mainsession.acquire(blocking=False):
+            return  # Dicoba lagi pada putaran berikutnya
+        try:
+            self.__expire_due__()
+            if not self.__expiry:
+                expiry_reaper.discard(self)
+        finally:
+            mainsession.release()
+
+    def __reject_write__(self, size: SelectType.Numeric_ = 0) -> None:
+        """Record a rejected write of ``size`` bytes; without an eviction policy the memory warning is raised."""
+        if self.__metrics is not None:
+            self.__metrics.rejected(size)
+        if self.__eviction is not None:
+            self.__eviction_stats["rejected_writes"] += 1
+        else:
+            self.__trigger_memory_warning__()
+
+    def __fits_budget__(self, size_to_add: SelectType.Numeric_) -> SelectType.Boolean_:
+        """The budget part of the admission check, without printing or reserving."""
+        return size_to_add < self.__budget.available and self.__h_Data__()
+
+    def __growth__(self, new_sizes: Dict[str, SelectType.Numeric_]) -> SelectType.Numeric_:
+        """Net bytes the ledger would grow by if ``new_sizes`` were recorded (overwritten keys give theirs back)."""
+        ledger = self.__ledger
+        return max(sum(ledger.delta(key, size) for key, size in new_sizes.items()), 0)
+
+    def __could_fit__(self, size_to_add: SelectType.Numeric_, protected) -> SelectType.Boolean_:
+        """Whether ``size_to_add`` would pass ``__fits_budget__`` with every key outside ``protected`` evicted."""
+        data, ledger = self.__data, self.__ledger
+        kept = sum(ledger.size_of(key) for key in protected if key in data)
+        available = self.__budget.available + ledger.total - kept
+        # Sama seperti __h_Data__: sisa di bawah 1 KB dianggap penuh
+        return size_to_add < available and getMemory(available) != "bytes"
+
+    def __make_room__(self, size_to_add: SelectType.Numeric_, protected) -> None:
+        """Evict keys chosen by the eviction policy until ``size_to_add`` fits the budget.
+
+        Nothing is evicted when ``size_to_add`` would not fit even with every key outside
+        ``protected`` gone: the write is refused either way.
+        """
+        if self.__fits_budget__(size_to_add) or not self.__could_fit__(size_to_add, protected):
+            return
+        policy = self.__eviction
+        while not self.__fits_budget__(size_to_add):
+            victim = policy.victim(exclude=protected)
+            if victim is None:
+                break
+            if victim not in self.__data:
+                policy.remove(victim)
+                continue
+            self.__evict_locked__(victim)
+
+    def __evict_locked__(self, key: SelectType.String_) -> None:
+        """Evict ``key`` and credit its ledger size back; the caller must hold ``mainsession``."""
+        size = self.__ledger.discard(key)
+        self.__release_memory__(size)
+        value = self.__data.pop(key)
+        self.__eviction.evict(key)
+        if self.__memos:
+            self.__memos.pop(key, None)
+        deadline = self.__expiry.pop(key, None)
+        if deadline is not None:
+            self.__wheel.cancel(key)
+        self.__eviction_stats["evictions"] += 1
+        self.__eviction_stats["evicted_bytes"] += size
+        if self.__cold is not None and self.__demote__(key, value, deadline):
+            return  # Masih tersimpan di disk, bukan kehilangan data
+        self.__announce__(((key, "evict"),))
+        if self.__on_evict is not None:
+            self.__pending_evictions.append((key, value))
+
+    def __demote__(self, key: SelectType.String_, value: SelectType.Any_, deadline) -> SelectType.Boolean_:
+        """Move an evicted value to the cold tier; False if it cannot be pickled."""
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        expires = 0.0 if deadline is None else time.time() + deadline - time.monotonic()
+        self.__cold.put(key, payload, expires)
+        self.__lazy[key] = (self.__cold, key, 0, expires)
+        self.__count_tiers__("demotions")
+        return True
+
+    def __count_tiers__(self, *counters: SelectType.String_) -> None:
+        """Increment ``tier_stats`` counters; concurrent readers count too, so under ``__tier_lock``."""
+        with self.__tier_lock:
+            stats = self.__tier_stats
+            for name in counters:
+                stats[name] += 1
+
+    def __drop_lazy__(self, key: SelectType.String_) -> SelectType.Boolean_:
+        """Forget a key that is only on disk; the caller must hold ``mainsession``."""
+        entry = self.__lazy.pop(key, None)
+        if entry is None:
+            return False
+        entry[0].release(entry[1], entry[2])
+        return True
+
+    def __changes_for__(self, keys):
+        """Classify the keys about to be written as "insert" or "update"; None without a feed."""
+        if self.__feed is None:
+            return None
+        data, lazy = self.__data, self.__lazy
+        return [(key, "update" if key in data or key in lazy else "insert") for key in keys]
+
+    def __announce__(self, changes) -> None:
+        """Publish ``(key, op)`` changes to the change feed; the caller must hold ``mainsession``."""
+        feed = self.__feed
+        if feed is not None and changes is not None:
+            feed.publish(changes, self.__data.version)
+
+    @contextlib.contextmanager
+    def __write_session__(self):
+        """Hold ``mainsession`` for a write, then run deferred ``on_evict`` callbacks unlocked."""
+        evicted = []
+        started = time.perf_counter_ns() if self.__metrics is not None else 0
+        try:
+            with self.__data.mainsession:
+                if started:
+                    self.__observe_lock_wait__(started)
+                try:
+                    yield
+                finally:
+                    evicted, self.__pending_evictions = self.__pending_evictions, []
+        finally:
+            self.__notify_evicted__(evicted)
+
+    def __notify_evicted__(self, evicted: list) -> None:
+        on_evict = self.__on_evict
+        if on_evict is not None:
+            for key, value in evicted:
+                on_evict(key, value)
+
+    def __trigger_memory_warning__(self) -> None:
+        """Mark this instance's last write as refused for lack of memory."""
+        self.memory_warning_triggered = True
+
+    def __read_session__(self):
+        """Return the context manager readers hold: shared in "rw" mode, exclusive otherwise."""
+        mainsession = self.__data.mainsession
+        if isinstance(mainsession, ReadWriteLock):
+            session = mainsession.read()
+        else:
+            session = mainsession
+        if self.__metrics is not None:
+            return self.__timed_session__(session)
+        return session
+
+    @contextlib.contextmanager
+    def __timed_session__(self, session):
+        """Enter ``session`` and record how long that took as lock wait time."""
+        started = time.perf_counter_ns()
+        with session:
+            self.__observe_lock_wait__(started)
+            yield
+
+    def __observe_lock_wait__(self, started: int) -> None:
+        metrics = self.__metrics
+        if metrics is not None:
+            metrics.lock_wait.record(time.perf_counter_ns() - started)
+
+    def __async_lock__(self) -> asyncio.Lock:
+        """Return this instance's asyncio lock for the running event loop."""
+        loop = asyncio.get_running_loop()
+        lock = self.__async_locks.get(loop)
+        if lock is None:
+            lock = self.__async_locks.setdefault(loop, asyncio.Lock())
+        return lock
+
+    @contextlib.asynccontextmanager
+    async def __async_session__(self):
+        """Hold the asyncio lock, then ``mainsession``, without blocking the event loop.
+
+        Coroutines queue on the asyncio lock. The thread lock is tried without
+        blocking first; if a thread holds it, the blocking acquire runs in the
+        default executor, so the loop keeps running. The body must not await.
+        """
+        await asyncio.sleep(0)  # Beri giliran ke coroutine lain sebelum menulis
+        evicted = []
+        started = time.perf_counter_ns() if self.__metrics is not None else 0
+        async with self.__async_lock__():
+            mainsession = self.__data.mainsession
+            if not mainsession.acquire(blocking=False):
+                loop = asyncio.get_running_loop()
+                acquiring = loop.run_in_executor(None, mainsession.acquire)
+                try:
+                    await asyncio.shield(acquiring)
+                except asyncio.CancelledError:
+                    # Lock tetap akan didapat oleh executor, lepaskan setelahnya
+                    acquiring.add_done_callback(
+                        lambda done: done.cancelled()
+                        or done.exception() is not None
+                        or mainsession.release()
+                    )
+                    raise
+            if started:
+                self.__observe_lock_wait__(started)
+            try:
+                yield
+            finally:
+                evicted, self.__pending_evictions = self.__pending_evictions, []
+                mainsession.release()
+        self.__notify_evicted__(evicted)
+
+    @contextlib.asynccontextmanager
+    async def __async_reserved_session__(self, size_to_add: SelectType.Numeric_):
+        """Reserve ``size_to_add`` bytes, then hold ``__async_session__`` for the commit.
+
+        Yields whether the reservation succeeded. If the wait for the lock is cancelled,
+        the reservation is given back.
+        """
+        reserved = self.__reserve__(size_to_add)
+        entered = False
+        try:
+            async with self.__async_session__():
+                entered = True
+                yield reserved
+        finally:
+            if reserved and not entered:
+                self.__release_memory__(size_to_add)
+
+    async def __async_measure_entries__(
+        self, dict_new: SelectType.Dict_
+    ) -> Dict[str, SelectType.Numeric_]:
+        """Measure ``dict_new``, offloading large payloads to the default executor."""
+        items = len(dict_new)
+        for value in dict_new.values():
+            if isinstance(value, (dict, list, tuple, set, frozenset)):
+                items += len(value)
+        if items < ASYNC_OFFLOAD_ITEMS:
+            return self.__measure_entries__(dict_new)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.__measure_entries__, dict_new)
 
     
     def clear(self):
@@ -893,33 +4524,188 @@ class MemoryAwareStruct(SelectType):
         Function to clear all items from the dictionary.
 
         - This function uses a lock (`self.__data.mainsession`) to ensure that only one thread can clear the dictionary at a time.
-        - Introduces a delay of 0.06 seconds to simulate the clearing operation.
 
         Behavior:
             - Acquires the `self.__data.mainsession` lock to prevent simultaneous access to the dictionary.
             - Clears all items from the dictionary using the `clear` method of `RestrictedDict`.
+            - Clears the size ledger and credits its total back to the memory limit.
         """
         with self.__data.mainsession:  # Lock saat penghapusan data
-            time.sleep(0.06)
             self.__data.clear()
+            self.__lazy.clear()
+            self.__memos.clear()
+            if self.__cold is not None:
+                self.__cold.clear()
+            if self.__decompressed is not None:
+                self.__decompressed.clear()
+            self.__release_memory__(self.__ledger.clear())
+            if self.__eviction is not None:
+                self.__eviction.clear()
+            self.__expiry.clear()
+            if self.__wheel is not None:
+                self.__wheel.clear()
+            self.__announce__(((None, "clear"),))
 
     
     def reset(self):
         """
         Function to reset the dictionary by clearing all items.
 
-        - Similar to `clear()`, but uses a shorter delay of 0.05 seconds to simulate a faster operation.
-        - This function also locks the dictionary during the reset operation to ensure thread safety.
+        - Same as `clear()`, which it calls, so both always drop the same state.
 
         Behavior:
-            - Acquires the `self.__data.mainsession` lock to ensure thread safety.
-            - Clears the dictionary using the `clear` method, effectively resetting it.
+            - Clears the dictionary, the size ledger and every per-key structure through `clear()`,
+              crediting the ledger's total back to the memory limit.
         """
-        with self.__data.mainsession:  # Lock saat penghapusan data
-            time.sleep(0.001)
-            self.__data.clear()
+        self.clear()
 
     
+    def set_function_executor(
+        self,
+        kind: Union[SelectType.String_, concurrent.futures.Executor, None] = "thread",
+        max_workers: Union[int, None] = None,
+    ) -> None:
+        """
+        Function to choose the pool that `submit_function` and `map_function` run stored functions on.
+
+        Args:
+            kind (Union[SelectType.String_, concurrent.futures.Executor, None], optional): "thread"
+                (default) or "process" to create a pool, an existing Executor to share, or None to
+                shut down the pool this struct created.
+            max_workers (Union[int, None], optional): Worker count for a created pool; None uses the
+                executor's default.
+
+        Raises:
+            ValueError: If the name does not match a known pool.
+            TypeError: If `kind` is neither a name, an Executor nor None.
+
+        Behavior:
+            - A pool this struct created is shut down (without waiting) when it is replaced.
+            - A shared Executor is never shut down by the struct.
+            - With "process", stored functions and their arguments must be picklable, so lambdas and
+              nested functions fail through their Future.
+        """
+        if isinstance(kind, str):
+            if kind not in FUNCTION_EXECUTORS:
+                raise ValueError(f"Unknown function executor '{kind}'.")
+            executor = (FUNCTION_EXECUTORS[kind](max_workers=max_workers), True)
+        elif isinstance(kind, concurrent.futures.Executor):
+            executor = (kind, False)
+        elif kind is None:
+            executor = None
+        else:
+            raise TypeError("The executor must be a name, a concurrent.futures.Executor or None.")
+        with self.__data.mainsession:
+            old, self.__executor = self.__executor, executor
+        if old is not None and old[1]:
+            old[0].shutdown(wait=False)
+
+    def __function_executor__(self) -> concurrent.futures.Executor:
+        """Return the pool for stored functions, creating the default thread pool on first use."""
+        executor = self.__executor
+        if executor is None:
+            with self.__data.mainsession:
+                if self.__executor is None:
+                    self.__executor = (concurrent.futures.ThreadPoolExecutor(), True)
+                executor = self.__executor
+        return executor[0]
+
+    def __lookup_function__(self, key: SelectType.String_) -> tuple:
+        """Fetch the callable stored under ``key`` and its memo (or None); only the lookup holds the lock."""
+        if self.__lazy and key in self.__lazy:
+            self.__materialize__([key])
+        with self.__read_session__():
+            if key not in self.__data:
+                raise KeyError(f"{key} is not found.")
+            func = self.__data[key]
+            memo = self.__memos.get(key)
+        if not callable(func):
+            raise TypeError(f"{key} is not a callable function.")
+        if memo is not None and memo.func is not func:
+            memo = None
+        return func, memo
+
+    def __memo_store__(
+        self,
+        key: SelectType.String_,
+        memo: FunctionMemo,
+        args_key: SelectType.Any_,
+        value: SelectType.Any_,
+    ) -> None:
+        """Cache a fresh result and charge its bytes to the function's key in the ledger."""
+        size = self.__get_total_size__(args_key) + self.__get_total_size__(value)
+        with self.__write_session__():
+            if self.__memos.get(key) is not memo:
+                return  # Fungsi sudah diganti atau dihapus selama berjalan
+            self.__memo_charge__(key, -memo.sweep(time.monotonic()))
+            if not self.__fits_budget__(size - memo.bytes):
+                return  # Tidak muat walau semua hasil lama dibuang
+            while not self.__fits_budget__(size):
+                freed = memo.shrink()
+                if not freed:
+                    return
+                self.__memo_charge__(key, -freed)
+            self.__memo_charge__(key, memo.put(args_key, value, size, time.monotonic()))
+
+    def __memo_settle__(self, key: SelectType.String_, memo: FunctionMemo) -> None:
+        """Drop ``memo``'s expired results and credit their bytes back to ``key``."""
+        with self.__write_session__():
+            if self.__memos.get(key) is memo:
+                self.__memo_charge__(key, -memo.sweep(time.monotonic()))
+
+    def __memo_charge__(self, key: SelectType.String_, change: SelectType.Numeric_) -> None:
+        if change:
+            self.__charge_memory__(
+                self.__ledger.record(key, self.__ledger.size_of(key) + change)
+            )
+
+    def __call_memoized__(
+        self, key: SelectType.String_, func, memo, args: tuple, kwargs: dict
+    ) -> SelectType.Any_:
+        args_key = None if memo is None else memo.make_key(args, kwargs)
+        if args_key is None:
+            return _call_stored(func, args, kwargs)
+        found, value = memo.get(args_key, time.monotonic())
+        if not found:
+            if memo.stale:
+                self.__memo_settle__(key, memo)
+            value = _call_stored(func, args, kwargs)
+            self.__memo_store__(key, memo, args_key, value)
+        return value
+
+    def __submit_memoized__(
+        self, key: SelectType.String_, func, memo, args: tuple, kwargs: dict
+    ) -> concurrent.futures.Future:
+        args_key = None if memo is None else memo.make_key(args, kwargs)
+        if args_key is None:
+            return self.__submit_call__(func, args, kwargs)
+        found, value = memo.get(args_key, time.monotonic())
+        if found:
+            future = concurrent.futures.Future()
+            future.set_result(value)
+            return future
+        if memo.stale:
+            self.__memo_settle__(key, memo)
+        future = self.__submit_call__(func, args, kwargs)
+        future.add_done_callback(
+            lambda done: done.cancelled()
+            or done.exception() is not None
+            or self.__memo_store__(key, memo, args_key, done.result())
+        )
+        return future
+
+    def __submit_call__(
+        self, func: SelectType.Any_, args: tuple, kwargs: dict
+    ) -> concurrent.futures.Future:
+        executor = self.__function_executor__()
+        if asyncio.iscoroutinefunction(func) and not isinstance(
+            executor, concurrent.futures.ProcessPoolExecutor
+        ):
+            # Coroutine tidak memakai thread pool; langsung ke loop bersama
+            return coroutine_runner.submit(func, args, kwargs)
+        return executor.submit(_call_stored, func, args, kwargs)
+
+    @_instrumented("execute_function")
     def execute_function(
         self, key: SelectType.String_, *args, **kwargs
     ) -> SelectType.Any_:
@@ -936,47 +4722,370 @@ class MemoryAwareStruct(SelectType):
             **kwargs: Keyword arguments to be passed to the function.
 
         Returns:
-            SelectType.Any_: The result of the executed function.
-
-        Raises:
-            KeyError: If the specified key is not found in the dictionary.
-            TypeError: If the retrieved item is not callable.
+            SelectType.Any_: The result of the executed function.
+
+        Raises:
+            KeyError: If the specified key is not found in the dictionary.
+            TypeError: If the retrieved item is not callable.
+
+        Behavior:
+            - Uses a lock (`self.__data.mainsession`) only to look the function up; it runs in the
+              calling thread after the lock is released, so a slow function does not block other access.
+            - If the function is asynchronous, it runs to completion on a shared background event loop
+              instead of a new loop per call.
+            - A function registered with `memoize=True` returns its cached result for arguments it has
+              already seen.
+        """
+        func, memo = self.__lookup_function__(key)
+        return self.__call_memoized__(key, func, memo, args, kwargs)
+
+    def submit_function(
+        self, key: SelectType.String_, *args, **kwargs
+    ) -> concurrent.futures.Future:
+        """
+        Function to run a stored function on the function pool.
+
+        Args:
+            key (SelectType.String_): The key of the function to be executed.
+            *args: Positional arguments to be passed to the function.
+            **kwargs: Keyword arguments to be passed to the function.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the function's result, or raises its exception.
+
+        Raises:
+            KeyError: If the specified key is not found in the dictionary.
+            TypeError: If the retrieved item is not callable.
+
+        Behavior:
+            - The function is looked up under the lock and runs after it is released, on the pool
+              chosen with `set_function_executor` (a thread pool by default).
+            - Coroutine functions run on a shared background event loop; with a process pool they run
+              on one such loop inside the worker process.
+        """
+        func, memo = self.__lookup_function__(key)
+        return self.__submit_memoized__(key, func, memo, args, kwargs)
+
+    def map_function(self, key: SelectType.String_, *iterables) -> list:
+        """
+        Function to fan a stored function out over many argument sets.
+
+        Args:
+            key (SelectType.String_): The key of the function to be executed.
+            *iterables: One iterable per positional parameter, zipped like the built-in `map`.
+
+        Returns:
+            list: One `concurrent.futures.Future` per argument set, in order.
+
+        Raises:
+            KeyError: If the specified key is not found in the dictionary.
+            TypeError: If the retrieved item is not callable.
+
+        Behavior:
+            - Looks the function up once, then submits every call like `submit_function`.
+        """
+        func, memo = self.__lookup_function__(key)
+        return [self.__submit_memoized__(key, func, memo, args, {}) for args in zip(*iterables)]
+
+    def function_stats(self, key: SelectType.String_ = None) -> Dict[str, Any]:
+        """
+        Function to report how well memoized functions are cached.
+
+        Args:
+            key (SelectType.String_, optional): One memoized function's key; None reports all of them.
+
+        Returns:
+            Dict[str, Any]: "hits", "misses", "hit_ratio", "evictions", "entries" and "bytes" for the
+            function, or a dict of those per key when `key` is None.
+
+        Raises:
+            KeyError: If `key` is not a memoized function.
+        """
+        with self.__read_session__():
+            memos = dict(self.__memos)
+        if key is not None:
+            if key not in memos:
+                raise KeyError(f"{key} is not a memoized function.")
+            return memos[key].stats()
+        return {name: memo.stats() for name, memo in memos.items()}
+
+    def invalidate_function(self, key: SelectType.String_) -> int:
+        """
+        Function to drop the cached results of one memoized function.
+
+        Args:
+            key (SelectType.String_): The function's key.
+
+        Returns:
+            int: The number of results dropped (0 if the function is not memoized).
+
+        Behavior:
+            - Credits the results' bytes back to the memory limit; the function stays memoized.
+        """
+        with self.__write_session__():
+            memo = self.__memos.get(key)
+            if memo is None:
+                return 0
+            dropped = len(memo)
+            self.__memo_charge__(key, -memo.clear())
+            return dropped
+
+    def json(self)->SelectType.Any_:
+        """
+        Function to convert the internal dictionary to a JSON string.
+
+        This method retrieves a copy of the internal dictionary and converts it to
+        a JSON-formatted string for easy serialization and transfer.
+
+        Returns:
+            SelectType.Any_: A JSON string representation of the internal dictionary.
+
+        Behavior:
+            - Uses the read side of `self.__data.mainsession` to ensure thread-safe reading of the data.
+            - Serializes the data straight into a snapshot, without copying the store first.
+            - The snapshot is cached per store `version` and returned again until the next write or
+              until one of its keys expires.
+            - Keys still waiting in a loaded snapshot are loaded first.
+        """
+        if self.__lazy:
+            self.__materialize_all__()
+        with self.__read_session__():  # Lock saat membaca data
+            version = self.__data.version
+            cached = self.__json_cache
+            if (
+                cached is not None
+                and cached[0] == version
+                and (cached[1] is None or time.monotonic() < cached[1])
+            ):
+                return cached[2]
+            if self.__expiry:
+                now = time.monotonic()
+                data = {
+                    k: v
+                    for k, v in self.__data.items()
+                    if not (k in self.__expiry and self.__expiry[k] <= now)
+                }
+                valid_until = min(
+                    (d for k, d in self.__expiry.items() if k in data), default=None
+                )
+            else:
+                data, valid_until = self.__data._data, None
+            try:
+                snapshot = ReadOnlyJSON.from_serialized(json.dumps(data, default=_json_default))
+            except (TypeError, ValueError):
+                # Nilai tidak bisa diserialisasi: perilaku lama, tanpa cache
+                return ReadOnlyJSON(
+                    {k: v.decompress() if isinstance(v, CompressedValue) else v for k, v in data.items()}
+                )
+            self.__json_cache = (version, valid_until, snapshot)
+            return snapshot
+
+    @property
+    def version(self) -> int:
+        """
+        Function to return the store's mutation counter.
+
+        Returns:
+            int: A number that grows on every write, pop, eviction, expiry or clear; equal values
+            mean the stored data has not changed in between.
+        """
+        return self.__data.version
+
+    def dump_json(self, fp, batch_size: int = 1024) -> int:
+        """
+        Function to stream the store to a file as one JSON object.
+
+        Args:
+            fp: A text file object opened for writing, or a path. A path is written to a temporary
+                file that replaces it only once the export is complete.
+            batch_size (int, optional): How many items are read per lock acquisition. Default is 1024.
+
+        Returns:
+            int: The number of key/value pairs written.
+
+        Behavior:
+            - Copies only the key list up front, then reads and encodes the values batch by batch,
+              holding the read lock only while a batch is collected, never while writing.
+            - Writes that land during the export may or may not be included; keys removed or
+              expired before their batch is read are left out.
+            - Keys still waiting in a loaded snapshot are loaded first.
+            - With a file object, a value that cannot be serialized leaves the batches before it
+              written; with a path the file is left untouched.
+        """
+        if self.__lazy:
+            self.__materialize_all__()
+        return _dump_json_object(fp, self.__iter_batches__(None, batch_size))
+
+    def load_json(
+        self, fp, chunk_size: int = 1000, ttl: SelectType.Any_ = None
+    ) -> Dict[str, int]:
+        """
+        Function to load a JSON object from a file object incrementally.
+
+        Args:
+            fp: A file object (text or UTF-8 binary) or a path holding one JSON object, e.g. from `dump_json`.
+            chunk_size (int, optional): How many entries are admitted per `insert_many` call. Default is 1000.
+            ttl (SelectType.Any_, optional): Time-to-live applied to every loaded key.
+
+        Returns:
+            Dict[str, int]: How many keys were "inserted", "replaced" and "rejected".
+
+        Raises:
+            ValueError: If the stream is not a JSON object.
+
+        Behavior:
+            - Parses one key/value pair at a time, so only the current chunk is held in memory.
+            - Each chunk is checked against the memory limit as a whole; a rejected chunk is
+              counted and loading continues with the next one.
+        """
+        return _load_json_object(fp, self.insert_many, chunk_size, ttl)
+
+    def save_snapshot(self, path: SelectType.String_, batch_size: int = 1024) -> Dict[str, int]:
+        """
+        Function to write the store to a binary snapshot file for a fast warm restart.
+
+        Args:
+            path (SelectType.String_): The snapshot file; it is replaced atomically.
+            batch_size (int, optional): How many items are read per lock acquisition. Default is 1024.
+
+        Returns:
+            Dict[str, int]: How many keys were "saved" and how many were "skipped" because their
+            value cannot be pickled (e.g. lambdas stored with `insert_function`).
 
         Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe execution of the function.
-            - Checks if the function associated with the key is callable and executes it with the provided arguments.
-            - If the function is asynchronous, it handles it accordingly using `asyncio.run()`.
+            - Values are pickled outside the lock, batch by batch; remaining TTLs are kept.
+            - Keys still waiting in a loaded snapshot are copied over without being unpickled.
         """
-        with self.__data.mainsession:  # Lock saat eksekusi fungsi
-            if key in self.__data:
-                func = self.__data[key]
-                if callable(func):
-                    if asyncio.iscoroutinefunction(func):
-                        return asyncio.run(
-                            func(*args, **kwargs)
-                        )  # Handle async functions
-                    return func(*args, **kwargs)  # Handle sync functions
-                else:
-                    raise TypeError(f"{key} is not a callable function.")
-            else:
-                raise KeyError(f"{key} is not found.")
+        skipped = []
+        saved = write_snapshot(path, self.__snapshot_entries__(skipped, batch_size))
+        return {"saved": saved, "skipped": len(skipped)}
 
-    def json(self)->SelectType.Any_:
+    def load_snapshot(self, path: SelectType.String_, lazy: SelectType.Boolean_ = True) -> int:
         """
-        Function to convert the internal dictionary to a JSON string.
+        Function to load a snapshot written by `save_snapshot`.
 
-        This method retrieves a copy of the internal dictionary and converts it to
-        a JSON-formatted string for easy serialization and transfer.
+        Args:
+            path (SelectType.String_): The snapshot file.
+            lazy (SelectType.Boolean_, optional): Leave values in the memory-mapped file until they are
+                first read (default). False loads everything now.
 
         Returns:
-            SelectType.Any_: A JSON string representation of the internal dictionary.
+            int: The number of keys taken from the snapshot (expired keys and keys already stored are skipped).
+
+        Raises:
+            ValueError: If the file is not a snapshot.
 
         Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe reading of the data.
-            - Returns a copy of the internal data to avoid unintended modifications.
+            - Only the snapshot index is read up front, so loading takes about the same time whatever
+              the size of the values.
+            - A value is unpickled, measured and admitted against the memory limit the first time it is
+              read (`get`, `find_all`, `json`, ...); until then it does not count against the limit.
+            - A value the limit rejects stays in the snapshot and is retried on the next read.
+            - Snapshots are pickles: only load files you trust.
         """
-        with self.__data.mainsession:  # Lock saat membaca data
-            return ReadOnlyJSON(self.__data._data.copy())
+        snapshot = SnapshotFile(path)
+        loaded = self.__adopt_snapshot__(snapshot, snapshot.entries)
+        if not lazy:
+            self.__materialize_all__()
+        return loaded
+
+    def __adopt_snapshot__(self, snapshot: SnapshotFile, entries: Dict[str, tuple]) -> int:
+        """Register snapshot entries as not-yet-loaded keys; stored keys are left alone."""
+        now = time.time()
+        loaded = 0
+        with self.__write_session__():
+            changes = []
+            for key, (offset, length, expires) in entries.items():
+                if (expires and expires <= now) or key in self.__data:
+                    continue
+                if self.__feed is not None:
+                    changes.append((key, "update" if key in self.__lazy else "insert"))
+                self.__lazy[key] = (snapshot, offset, length, expires)
+                loaded += 1
+            self.__announce__(changes)
+        return loaded
+
+    def __snapshot_entries__(self, skipped: list, batch_size: int = 1024):
+        """Yield ``(key, pickled value, expiry epoch)`` for every live and not-yet-loaded key."""
+        with self.__read_session__():
+            keys = list(self.__data.keys())
+            pending = list(self.__lazy.items())
+        for start in range(0, len(keys), batch_size):
+            batch = []
+            with self.__read_session__():
+                now_monotonic, now = time.monotonic(), time.time()
+                for key in keys[start:start + batch_size]:
+                    if key not in self.__data:
+                        continue
+                    deadline = self.__expiry.get(key)
+                    if deadline is not None and deadline <= now_monotonic:
+                        continue
+                    expires = 0.0 if deadline is None else now + deadline - now_monotonic
+                    batch.append((key, self.__data[key], expires))
+            for key, value, expires in batch:
+                try:
+                    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                except (pickle.PicklingError, TypeError, AttributeError):
+                    skipped.append(key)
+                    continue
+                yield key, payload, expires
+        now = time.time()
+        for key, (source, first, second, expires) in pending:
+            if not (expires and expires <= now):
+                try:
+                    yield key, source.raw(first, second), expires
+                except KeyError:
+                    continue  # Dihapus dari cold tier sejak daftar diambil
+
+    def __materialize__(self, keys) -> None:
+        """Unpickle snapshot or cold-tier keys outside the lock, then admit them as one batch."""
+        with self.__read_session__():
+            pending = {key: self.__lazy[key] for key in keys if key in self.__lazy}
+        if not pending:
+            return
+        now = time.time()
+        values, ttl = {}, {}
+        for key, (source, first, second, expires) in pending.items():
+            # Tanpa kedaluwarsa di disk berarti tetap persisten, bukan TTL default struct ini
+            ttl[key] = expires - now if expires else math.inf
+            try:
+                values[key] = source.read(first, second)
+            except KeyError:
+                continue  # Sudah dihapus dari cold tier oleh thread lain
+        new_sizes = self.__measure_entries__(values)
+        with self.__write_session__():
+            mapping = {}
+            for key, entry in pending.items():
+                if self.__lazy.get(key) is not entry or key not in values:
+                    continue  # Sudah ditulis, dipop atau dimuat oleh thread lain
+                del self.__lazy[key]
+                if ttl[key] <= 0:
+                    entry[0].release(entry[1], entry[2])
+                    continue  # Kedaluwarsa selama masih di disk
+                mapping[key] = values[key]
+            if mapping:
+                results = self.__write_many_locked__(mapping, new_sizes, ttl, False, announce=False)
+                for key, status in results.items():
+                    entry = pending[key]
+                    if status == "rejected":
+                        self.__lazy[key] = entry  # Coba lagi pada pembacaan berikutnya
+                        continue
+                    entry[0].release(entry[1], entry[2])
+                    if entry[0] is self.__cold:
+                        self.__count_tiers__("promotions")
+
+    def __materialize_matching__(self, pattern: SelectType.String_) -> None:
+        regex = compile_like_pattern(pattern)[0]
+        with self.__read_session__():
+            keys = [key for key in self.__lazy if regex.match(key)]
+        if keys:
+            self.__materialize__(keys)
+
+    def __materialize_all__(self, batch_size: int = 1024) -> None:
+        with self.__read_session__():
+            keys = list(self.__lazy)
+        for start in range(0, len(keys), batch_size):
+            self.__materialize__(keys[start:start + batch_size])
 
     def from_json(self, json_data: SelectType.String_) -> None:
         """
@@ -1009,15 +5118,16 @@ class MemoryAwareStruct(SelectType):
             'ClassName(key1=value1, key2=value2, ...)'.
 
         Behavior:
-            - Uses a lock (`self.__data.mainsession`) to ensure thread-safe
+            - Uses the read side of `self.__data.mainsession` to ensure thread-safe
             reading of the internal data.
             - Iterates through the internal dictionary to construct the output
             string, ensuring all items are included.
         """
-        with self.__data.mainsession:  # Lock saat membaca data
+        with self.__read_session__():  # Lock saat membaca data
             output_dictory = tuple(
                 f"{k}={repr(v)}"  # Using repr for more informative output
                 for k, v in self.__data.items()
+                if not (self.__expiry and self.__is_expired__(k))
             )
         return f"{self.__struct_name}({', '.join(output_dictory)})"
 
@@ -1025,88 +5135,93 @@ class MemoryAwareStruct(SelectType):
         return self.__repr__()
 
     def __get_max_allowed_memory__(self) -> SelectType.Numeric_:
-        """Restores 3/4 of total remaining memory."""
-        memory_info = psutil.virtual_memory()
-        memory_dict_size = self.__get_total_size__(self.__data._data)
-        if self.__get_attribute__("max_memory_usage") and not self.__get_attribute__(
-            "passessionX"
-        ):
-            self.max_memory_usage = self.max_memory_usage * 1.024
-            self.passessionX = 1
-        # Calculate nu based on max_memory_usage
-        nu = self.__get_attribute__("max_memory_usage", 0) + memory_dict_size
-        # Calculate the maximum allowed memory
-        max_allowed_memory = (memory_info.total * 0.75) - round(memory_dict_size) - nu
-        return round(max_allowed_memory * 1.024)
-        # return round(
-        # (((memory_info.total * 0.75) - round(memory_dict_size)) - nu) * 1.024
-        # )
+        """Restores the limit of the process-wide budget (3/4 of total memory, or of the cgroup limit, by default)."""
+        return process_budget.limit
 
     def __is_memory_full__(self) -> SelectType.Boolean_:
-        """Check if the memory is full."""
-        memory_info = psutil.virtual_memory()
-        memory_dict_size = self.__get_total_size__(self.__data._data)
-
-        if not self.__get_attribute__("max_memory_usage"):
-            used_memory = (memory_info.used - memory_info.available) + round(
-                memory_dict_size
-            )
-        else:
-            used_memory = (memory_info.used - memory_info.available) + (
-                round(memory_dict_size) + self.max_memory_usage
-            )
-        return (
-            (max_memory_usage <= 0)
-            or (used_memory >= max_memory_usage)
-            or (used_memory >= memory_info.total)
-            or self.__check_memory_warning_triggered__()
-        )
+        """Check if the memory is full: the budget chain has no room left, or the system (or container
+        cgroup) is down to its last ``MEMORY_HEADROOM_FRACTION`` of available memory."""
+        memory_info = memory_sampler.snapshot()  # Snapshot dari thread sampler
+        headroom = memory_info.total * MEMORY_HEADROOM_FRACTION
+        is_full = self.__budget.available <= 0 or memory_info.available <= headroom
+        if is_full:
+            # Tekanan memori: minta sampler memperbarui snapshot lebih awal
+            memory_sampler.request_refresh()
+        return is_full
 
     def __get_total_size__(self, data=None) -> SelectType.Numeric_:
-        """Function to get size of data."""
-        if data is None:
-            data = self.__data._data
-
-        total_size = 0
-        seen = set()
-        
-        # Recursive inner function to help with caching
-        def _recursive_size(obj):
-            if id(obj) in seen:
-                return 0
-            seen.add(id(obj))
-            obj_size = sys.getsizeof(obj)
-            size = obj_size
-            
-            if hasattr(obj, "__dict__"):
-                for val in obj.__dict__.values():
-                    size += _recursive_size(val)
-
-            elif hasattr(obj, "__iter__"):
-                if hasattr(obj, "keys"):  # for dictionary
-                    for key in obj:
-                        size += _recursive_size(obj[key])
-                elif not isinstance(obj, str):  # Other iterable, not string
-                    for item in obj:
-                        size += _recursive_size(item)
-
-            return size
-
-        total_size = _recursive_size(data)
-        return total_size
+        """Function to get size of data.
 
+        Without ``data`` the running total of the size ledger is returned, so the
+        stored values are not walked again. Otherwise ``data`` is measured by the
+        struct's size estimator (see ``set_size_estimator``).
+        """
+        if data is None:
+            return self.__ledger.total
+        return self.__estimator.estimate(data)
+
+
+    def __compress_entries__(self, dict_new: SelectType.Dict_) -> SelectType.Dict_:
+        """Return ``dict_new`` with its large str/bytes values compressed (a copy, if any were)."""
+        compression = self.__compression
+        if compression is None:
+            return dict_new
+        codec, threshold, level = compression
+        compressed = None
+        for key, value in dict_new.items():
+            if isinstance(value, (str, bytes, bytearray)) and len(value) >= threshold:
+                if compressed is None:
+                    compressed = dict(dict_new)
+                compressed[key] = CompressedValue.compress(value, codec, level)
+        return dict_new if compressed is None else compressed
+
+    async def __async_compress_entries__(self, dict_new: SelectType.Dict_) -> SelectType.Dict_:
+        """Compress ``dict_new``, in the default executor when there is a lot to compress."""
+        compression = self.__compression
+        if compression is None:
+            return dict_new
+        pending = sum(
+            len(value)
+            for value in dict_new.values()
+            if isinstance(value, (str, bytes, bytearray)) and len(value) >= compression[1]
+        )
+        if pending < 65536:
+            return self.__compress_entries__(dict_new)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.__compress_entries__, dict_new)
+
+    def __inflate__(self, key: SelectType.String_, stored: CompressedValue) -> SelectType.Any_:
+        """Decompress a stored value, going through the decompressed-value cache if enabled."""
+        cache = self.__decompressed
+        if cache is None:
+            return stored.decompress()
+        value = cache.get(key, stored)
+        if value is None:
+            value = stored.decompress()
+            cache.put(key, stored, value)
+        return value
+
+    def __measure_entries__(
+        self, dict_new: SelectType.Dict_
+    ) -> Dict[str, SelectType.Numeric_]:
+        """Measure every incoming value once, keyed like ``dict_new``."""
+        return {key: self.__get_total_size__(value) for key, value in dict_new.items()}
+
+    def __charge_memory__(self, size_change: SelectType.Numeric_) -> None:
+        """Apply a change in stored bytes (taken from the ledger) to the budget, even past its limit."""
+        self.__budget.reserve(size_change, force=True)
+
+    def __release_memory__(self, released: SelectType.Numeric_) -> None:
+        """Credit bytes removed from the ledger back, the same way ``pop`` does."""
+        self.__budget.release(released)
 
     def __check_max_memory_usage__(self):
         """Restores the remaining allowed memory."""
-        if self.__get_attribute__("max_memory_usage"):
-            return self.max_memory_usage
-        return max_memory_usage
+        return self.__budget.available
 
     def __check_memory_warning_triggered__(self):
-        """Checks whether a memory warning has been triggered."""
-        if self.__get_attribute__("max_memory_usage"):
-            return self.memory_warning_triggered
-        return memory_warning_triggered
+        """Checks whether this instance's last write was refused for lack of memory."""
+        return self.memory_warning_triggered
 
     def __h_Data__(self):
         sizemax = self.__check_max_memory_usage__()
@@ -1171,5 +5286,1087 @@ class MemoryAwareStruct(SelectType):
             )
 
 
+class ShardedMemoryAwareStruct:
+    """
+    A MemoryAwareStruct split into hash-partitioned shards.
+
+    Keys are hashed into `shards` internal MemoryAwareStruct instances. Each shard has its own
+    RestrictedDict, its own `mainsession` lock and its own MemoryBudget, nested directly under
+    `process_budget` and holding an even slice of `memory_default`. When a shard runs out of its
+    slice, unused budget is moved over from the shards with the most headroom. The
+    insert/update/get/pop surface is the same as MemoryAwareStruct, so threads working on
+    different keys rarely wait on the same lock, the budgets' locks included.
+
+    Args:
+            shards (int, optional): Number of shards. Default is 8.
+            memory_default (int, optional): Total memory budget, split evenly between the shards. If not
+                                            provided, the shards draw on the process-wide budget only.
+            **entries (SelectType.Dict_): Key-value pairs to initialize the shards.
+    """
+    __slots__: SelectType.List_ = [
+        "__struct_name",
+        "__shards",
+        "__rebalance_lock",
+        "__executor_lock",
+        "__executor",
+        "memory_default",
+    ]
+
+    def __init__(
+        self, shards: int = 8, memory_default: int = None, **entries: SelectType.Dict_
+    ) -> None:
+        """
+        Initializes the shards and distributes the initial entries between them.
+
+        Raises:
+            ValueError: If `shards` is less than 1.
+        """
+        if shards < 1:
+            raise ValueError("A sharded struct needs at least one shard.")
+        self.__struct_name = self.__class__.__name__
+        self.memory_default = memory_default
+        self.__rebalance_lock = threading.Lock()
+        self.__executor_lock = threading.Lock()
+        self.__executor = None  # (Executor, dimiliki) yang dipakai bersama semua shard
+        parts = [{} for _ in range(shards)]
+        for key, value in entries.items():
+            parts[hash(key) % shards][key] = value
+        budget_slice = memory_default // shards if memory_default else None
+        self.__shards = tuple(
+            MemoryAwareStruct(memory_default=budget_slice, **part) for part in parts
+        )
+
+    def __dir__(self):
+        """Block the dir() function."""
+        raise AttributeError("The use of dir() on this class is not allowed.")
+
+    @property
+    def struct_name(self) -> SelectType.String_:
+        """The name of the structure."""
+        return self.__struct_name
+
+    @property
+    def shard_count(self) -> int:
+        """Number of shards."""
+        return len(self.__shards)
+
+    @property
+    def memory_budgets(self) -> tuple:
+        """The MemoryBudget of every shard, in shard order."""
+        return tuple(shard.memory_budget for shard in self.__shards)
+
+    def set_memory_budget(
+        self, parent: Union[MemoryBudget, None] = None, limit: Union[int, None] = None
+    ) -> None:
+        """
+        Function to nest every shard's budget under `parent`, as in `MemoryAwareStruct.set_memory_budget`.
+
+        Args:
+            parent (Union[MemoryBudget, None], optional): The budget the shards reserve from. None uses
+                `process_budget`.
+            limit (Union[int, None], optional): A cap for the whole struct, split evenly between the
+                shards and rebalanced like `memory_default`; None leaves only the parent's limits.
+
+        Raises:
+            TypeError: If `parent` is neither a MemoryBudget nor None.
+            ValueError: If a shard's entries do not fit in its slice.
+        """
+        if parent is not None and not isinstance(parent, MemoryBudget):
+            raise TypeError("The parent must be a MemoryBudget or None.")
+        budget_slice = limit // len(self.__shards) if limit else None
+        for shard in self.__shards:
+            shard.set_memory_budget(parent, budget_slice)
+        self.memory_default = limit
+
+    def __shard__(self, key: SelectType.String_) -> MemoryAwareStruct:
+        return self.__shards[hash(key) % len(self.__shards)]
+
+    def __partition__(self, dict_new: SelectType.Dict_) -> Dict[int, Dict[str, Any]]:
+        parts: Dict[int, Dict[str, Any]] = {}
+        count = len(self.__shards)
+        for key, value in dict_new.items():
+            parts.setdefault(hash(key) % count, {})[key] = value
+        return parts
+
+    def __write_shard__(
+        self,
+        index: int,
+        part: SelectType.Dict_,
+        update: SelectType.Boolean_,
+        ttl: SelectType.Any_ = None,
+    ) -> SelectType.Boolean_:
+        """Write ``part`` to one shard and report whether it was admitted."""
+        shard = self.__shards[index]
+        metrics = shard.struct_metrics
+        if metrics is None:
+            return self.__try_write_shard__(index, part, update, ttl)
+        # Dicatat per penulisan shard, bukan per panggilan
+        started, failed = time.perf_counter_ns(), True
+        try:
+            admitted = self.__try_write_shard__(index, part, update, ttl)
+            failed = False
+            return admitted
+        finally:
+            metrics.observe("update" if update else "insert", time.perf_counter_ns() - started, failed)
+
+    def __try_write_shard__(
+        self, index: int, part: SelectType.Dict_, update: SelectType.Boolean_, ttl: SelectType.Any_
+    ) -> SelectType.Boolean_:
+        """Write ``part`` to one shard, rebalancing budget once if the shard rejects it."""
+        shard = self.__shards[index]
+        if shard.__try_write__(part, update, ttl):
+            return True
+        if self.__rebalance__(index, part):
+            return shard.__try_write__(part, update, ttl)
+        return False
+
+    def __write_many_shard__(
+        self, index: int, part: SelectType.Dict_, update: SelectType.Boolean_, ttl: SelectType.Any_
+    ) -> Dict[str, str]:
+        """`insert_many`/`update_many` on one shard, rebalancing budget once if it is rejected."""
+        shard = self.__shards[index]
+        write = shard.update_many if update else shard.insert_many
+        results = write(part, ttl)
+        if "rejected" in results.values() and self.__rebalance__(index, part):
+            results = write(part, ttl)
+        return results
+
+    def __rebalance__(self, index: int, part: SelectType.Dict_) -> SelectType.Boolean_:
+        """Move unused budget from the other shards to shard ``index`` so ``part`` fits.
+
+        Each donor gives at most half of its headroom. Returns False, moving nothing, when the
+        shards have no limits or the others cannot spare enough.
+        """
+        shard = self.__shards[index]
+        budget = shard.memory_budget
+        if budget.limit is None:
+            return False
+        size = sum(shard.__measure_entries__(part).values())
+        with self.__rebalance_lock:
+            # Di bawah 1 KB tersisa shard dianggap penuh (lihat __h_Data__)
+            needed = budget.used + size + 1024 - budget.limit
+            if needed <= 0:
+                return True  # Shard lain sudah memberi, atau ruang sudah dibebaskan
+            donors = sorted(
+                (other.memory_budget for other in self.__shards if other is not shard),
+                key=lambda donor: donor.limit - donor.used,
+                reverse=True,
+            )
+            spare = sum(max(0, donor.limit - donor.used) // 2 for donor in donors)
+            if spare < needed:
+                return False
+            gathered = 0
+            for donor in donors:
+                if gathered >= needed:
+                    break
+                gathered += donor.shrink(min(needed - gathered, max(0, donor.limit - donor.used) // 2))
+            budget.limit += gathered
+            return gathered >= needed
+
+    def set_eviction_policy(
+        self, policy: Union[SelectType.String_, None], on_evict: SelectType.Any_ = None
+    ) -> None:
+        """
+        Function to give every shard its own instance of a built-in eviction policy.
+
+        Args:
+            policy (Union[SelectType.String_, None]): "lru", "lfu", "arc", or None to refuse writes again.
+            on_evict (callable, optional): Called as `on_evict(key, value)` for every evicted entry.
+
+        Raises:
+            ValueError: If the name does not match a built-in policy.
+        """
+        if policy is not None and policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}'.")
+        for shard in self.__shards:
+            shard.set_eviction_policy(policy, on_evict)
+
+    def eviction_stats(self) -> Dict[str, Any]:
+        """Function to sum the eviction counters of all shards."""
+        totals: Dict[str, Any] = {"evictions": 0, "evicted_bytes": 0, "rejected_writes": 0}
+        for shard in self.__shards:
+            stats = shard.eviction_stats()
+            totals["policy"] = stats["policy"]
+            for name in ("evictions", "evicted_bytes", "rejected_writes"):
+                totals[name] += stats[name]
+        return totals
+
+    def set_metrics(self, enabled: SelectType.Boolean_ = True) -> None:
+        """Function to start or stop recording metrics on every shard; see `MemoryAwareStruct.set_metrics`."""
+        for shard in self.__shards:
+            shard.set_metrics(enabled)
+
+    def __merged_metrics__(self):
+        merged = StructMetrics()
+        gauges: Dict[str, Any] = {}
+        for shard in self.__shards:
+            metrics = shard.struct_metrics
+            if metrics is None:
+                raise RuntimeError("Metrics are not enabled; call set_metrics() first.")
+            merged.merge(metrics)
+            for name, value in shard.__metrics_gauges__().items():
+                gauges[name] = gauges.get(name, 0) + value
+        return merged, gauges
+
+    def metrics(self) -> Dict[str, Any]:
+        """Function to report the metrics of all shards combined; see `MemoryAwareStruct.metrics`."""
+        merged, gauges = self.__merged_metrics__()
+        return merged.snapshot(gauges)
+
+    def metrics_text(
+        self, prefix: SelectType.String_ = "memory_aware_struct", labels: Union[Dict[str, str], None] = None
+    ) -> SelectType.String_:
+        """Function to render the combined metrics for Prometheus; see `MemoryAwareStruct.metrics_text`."""
+        merged, gauges = self.__merged_metrics__()
+        if labels is None:
+            labels = {"struct": self.__struct_name}
+        return merged.to_prometheus(gauges, labels, prefix)
+
+    def set_change_feed(self, capacity: Union[int, ChangeFeed, None] = 4096) -> None:
+        """Function to record one change feed shared by every shard; see `MemoryAwareStruct.set_change_feed`."""
+        if capacity is not None and not isinstance(capacity, ChangeFeed):
+            capacity = ChangeFeed(capacity)
+        for shard in self.__shards:
+            shard.set_change_feed(capacity)
+
+    @property
+    def change_feed(self) -> Union[ChangeFeed, None]:
+        """The ChangeFeed the shards publish to, or None."""
+        return self.__shards[0].change_feed
+
+    def subscribe(
+        self, cursor: Union[int, None] = None, timeout: Union[SelectType.Numeric_, None] = None
+    ) -> Subscription:
+        """Function to follow the changes of all shards; see `MemoryAwareStruct.subscribe`.
+
+        Event versions are those of the shard that made the change.
+        """
+        with self.__executor_lock:
+            if self.change_feed is None:
+                self.set_change_feed()
+        feed = self.change_feed
+        return Subscription(feed, feed.head if cursor is None else cursor, timeout)
+
+    def set_default_ttl(self, ttl: SelectType.Numeric_ = None) -> None:
+        """Function to set the default time-to-live of every shard."""
+        for shard in self.__shards:
+            shard.set_default_ttl(ttl)
+
+    def shard_stats(self) -> list:
+        """
+        Function to report the size and free budget of every shard.
+
+        Returns:
+            list: One dict per shard with the number of keys, the bytes recorded in its size
+            ledger, its slice of the budget ("limit", None without `memory_default`) and the bytes
+            its budget would still admit.
+        """
+        return [
+            {
+                "keys": len(shard.__items_snapshot__()),
+                "used": shard.__get_total_size__(),
+                "limit": shard.memory_budget.limit,
+                "free": shard.memory_budget.available,
+            }
+            for shard in self.__shards
+        ]
+
+    def get(
+        self, key: SelectType.String_, default: SelectType.Any_ = None
+    ) -> SelectType.Any_:
+        """
+        Function to retrieve a value from the shard that owns the key.
+
+        `%pattern%` keys are matched against every shard in turn and the first match is returned.
+        """
+        if key.startswith("%") and key.endswith("%"):
+            missing = object()
+            for shard in self.__shards:
+                data = shard.get(key, missing)
+                if data is not missing:
+                    return data
+            return default
+        return self.__shard__(key).get(key, default)
+
+    def iter_matching(self, pattern: SelectType.String_, batch_size: int = 256):
+        """Function to stream `(key, value)` pairs matching the pattern, one shard after another."""
+        for shard in self.__shards:
+            yield from shard.iter_matching(pattern, batch_size)
+
+    def find_all(self, pattern: SelectType.String_) -> SelectType.Dict_:
+        """Function to return every item matching the pattern across all shards."""
+        return dict(self.iter_matching(pattern))
+
+    @property
+    def update(self) -> None:
+        pass
+
+    @update.setter
+    def update(self, dict_new: SelectType.Dict_) -> None:
+        """
+        Function to update values, routing each key to its shard.
+
+        Raises:
+            TypeError: If dict_new is not of dictionary type.
+        """
+        if isinstance(dict_new, tuple) and len(dict_new) == 2:
+            dict_new, ttl = dict_new
+        else:
+            ttl = None
+        if not isinstance(dict_new, dict):
+            raise TypeError("Not Type Dict Error")
+        for index, part in self.__partition__(dict_new).items():
+            self.__write_shard__(index, part, True, ttl)
+
+    @property
+    def insert(self) -> None:
+        pass
+
+    @insert.setter
+    def insert(self, dict_new: SelectType.Dict_) -> None:
+        """
+        Function to insert values, routing each key to its shard.
+
+        Raises:
+            TypeError: If dict_new is not of dictionary type.
+        """
+        if isinstance(dict_new, tuple) and len(dict_new) == 2:
+            dict_new, ttl = dict_new
+        else:
+            ttl = None
+        if not isinstance(dict_new, dict):
+            raise TypeError("Not Type Dict Error")
+        for index, part in self.__partition__(dict_new).items():
+            self.__write_shard__(index, part, False, ttl)
+
+    async def async_update(
+        self, dict_new: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> None:
+        """Asynchronous `update`; each shard write runs in the default executor."""
+        if not isinstance(dict_new, dict):
+            raise TypeError("Not Type Dict Error")
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(None, self.__write_shard__, index, part, True, ttl)
+                for index, part in self.__partition__(dict_new).items()
+            )
+        )
+
+    async def async_insert(
+        self, dict_new: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> None:
+        """Asynchronous `insert`; each shard write runs in the default executor."""
+        if not isinstance(dict_new, dict):
+            raise TypeError("Not Type Dict Error")
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(None, self.__write_shard__, index, part, False, ttl)
+                for index, part in self.__partition__(dict_new).items()
+            )
+        )
+
+    def insert_many(
+        self, mapping: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> Dict[str, str]:
+        """Function to `insert_many` on every shard; each shard's part is applied atomically."""
+        if not isinstance(mapping, dict):
+            raise TypeError("Not Type Dict Error")
+        RestrictedDict.check_keys(mapping)  # Sebelum shard mana pun ditulis
+        results: Dict[str, str] = {}
+        for index, part in self.__partition__(mapping).items():
+            results.update(self.__write_many_shard__(index, part, False, ttl))
+        return results
+
+    def update_many(
+        self, mapping: SelectType.Dict_, ttl: SelectType.Any_ = None
+    ) -> Dict[str, str]:
+        """Function to `update_many` on every shard; each shard's part is applied atomically."""
+        if not isinstance(mapping, dict):
+            raise TypeError("Not Type Dict Error")
+        RestrictedDict.check_keys(mapping)  # Sebelum shard mana pun ditulis
+        results: Dict[str, str] = {}
+        for index, part in self.__partition__(mapping).items():
+            results.update(self.__write_many_shard__(index, part, True, ttl))
+        return results
+
+    def pop_many(self, keys) -> Dict[str, str]:
+        """Function to `pop_many` on every shard."""
+        parts: Dict[int, list] = {}
+        count = len(self.__shards)
+        for key in keys:
+            parts.setdefault(hash(key) % count, []).append(key)
+        results: Dict[str, str] = {}
+        for index, part in parts.items():
+            results.update(self.__shards[index].pop_many(part))
+        return results
+
+    def insert_function(
+        self,
+        key: SelectType.String_,
+        func: SelectType.Any_,
+        memoize: SelectType.Boolean_ = False,
+        max_entries: int = 128,
+        ttl: SelectType.Numeric_ = None,
+    ) -> None:
+        """Function to insert a callable into the shard that owns the key; memoized results count against that shard."""
+        self.__shard__(key).insert_function(key, func, memoize, max_entries, ttl)
+
+    def function_stats(self, key: SelectType.String_ = None) -> Dict[str, Any]:
+        """Function to report memoized functions' cache statistics, for one key or all of them."""
+        if key is not None:
+            return self.__shard__(key).function_stats(key)
+        stats: Dict[str, Any] = {}
+        for shard in self.__shards:
+            stats.update(shard.function_stats())
+        return stats
+
+    def invalidate_function(self, key: SelectType.String_) -> int:
+        """Function to drop the cached results of one memoized function."""
+        return self.__shard__(key).invalidate_function(key)
+
+    def execute_function(self, key: SelectType.String_, *args, **kwargs) -> SelectType.Any_:
+        """Function to execute a callable stored in the shard that owns the key."""
+        return self.__shard__(key).execute_function(key, *args, **kwargs)
+
+    def set_function_executor(
+        self,
+        kind: Union[SelectType.String_, concurrent.futures.Executor, None] = "thread",
+        max_workers: Union[int, None] = None,
+    ) -> None:
+        """Function to choose one pool, shared by every shard, for `submit_function` and `map_function`."""
+        if isinstance(kind, str):
+            if kind not in FUNCTION_EXECUTORS:
+                raise ValueError(f"Unknown function executor '{kind}'.")
+            executor, owned = FUNCTION_EXECUTORS[kind](max_workers=max_workers), True
+        else:
+            executor, owned = kind, False
+        for shard in self.__shards:
+            shard.set_function_executor(executor)
+        old, self.__executor = self.__executor, (None if executor is None else (executor, owned))
+        if old is not None and old[1]:
+            old[0].shutdown(wait=False)
+
+    def submit_function(
+        self, key: SelectType.String_, *args, **kwargs
+    ) -> concurrent.futures.Future:
+        """Function to run a callable stored in the shard that owns the key on the function pool."""
+        self.__shared_executor__()
+        return self.__shard__(key).submit_function(key, *args, **kwargs)
+
+    def map_function(self, key: SelectType.String_, *iterables) -> list:
+        """Function to fan a callable stored in the shard that owns the key out over many argument sets."""
+        self.__shared_executor__()
+        return self.__shard__(key).map_function(key, *iterables)
+
+    def __shared_executor__(self) -> None:
+        # Satu thread pool untuk semua shard, bukan satu pool per shard
+        if self.__executor is None:
+            with self.__executor_lock:
+                if self.__executor is None:
+                    self.set_function_executor("thread")
+
+    def pop(self, params: SelectType.String_) -> None:
+        """Function to remove a key from the shard that owns it."""
+        self.__shard__(params).pop(params)
+
+    async def async_pop(self, params: SelectType.String_) -> None:
+        """Asynchronous `pop` on the shard that owns the key."""
+        await self.__shard__(params).async_pop(params)
+
+    def clear(self) -> None:
+        """Function to clear every shard."""
+        for shard in self.__shards:
+            shard.clear()
+
+    def reset(self) -> None:
+        """Function to reset every shard."""
+        for shard in self.__shards:
+            shard.reset()
+
+    def json(self) -> SelectType.Any_:
+        """Function to return the items of all shards as one ReadOnlyJSON, joined from each shard's cached snapshot."""
+        return ReadOnlyJSON.merge(shard.json() for shard in self.__shards)
+
+    def dump_json(self, fp, batch_size: int = 1024) -> int:
+        """Function to stream every shard to a file object or path as one JSON object, batch by batch."""
+        return _dump_json_object(
+            fp,
+            (
+                batch
+                for shard in self.__shards
+                for batch in shard.__iter_batches__(None, batch_size)
+            ),
+        )
+
+    def load_json(
+        self, fp, chunk_size: int = 1000, ttl: SelectType.Any_ = None
+    ) -> Dict[str, int]:
+        """Function to load a JSON object incrementally, admitting `chunk_size` entries per `insert_many`."""
+        return _load_json_object(fp, self.insert_many, chunk_size, ttl)
+
+    def set_compression(
+        self,
+        codec: Union[SelectType.String_, None] = "zlib",
+        threshold: int = 4096,
+        level: Union[int, None] = None,
+        cache_bytes: int = 0,
+    ) -> None:
+        """Function to set compression on every shard; `cache_bytes` is split evenly between them."""
+        for shard in self.__shards:
+            shard.set_compression(codec, threshold, level, cache_bytes // len(self.__shards))
+
+    def set_cold_tier(self, path: Union[SelectType.String_, None]) -> None:
+        """Function to give every shard its own cold tier file, `<path>.<shard index>`; None turns them off."""
+        for index, shard in enumerate(self.__shards):
+            shard.set_cold_tier(None if path is None else f"{path}.{index}")
+
+    def tier_stats(self) -> Dict[str, int]:
+        """Function to sum the tier counters of all shards."""
+        total: Dict[str, int] = {}
+        for shard in self.__shards:
+            for name, value in shard.tier_stats().items():
+                total[name] = total.get(name, 0) + value
+        return total
+
+    def save_snapshot(self, path: SelectType.String_, batch_size: int = 1024) -> Dict[str, int]:
+        """Function to write every shard into one snapshot file; see `MemoryAwareStruct.save_snapshot`."""
+        skipped = []
+        saved = write_snapshot(
+            path,
+            (
+                entry
+                for shard in self.__shards
+                for entry in shard.__snapshot_entries__(skipped, batch_size)
+            ),
+        )
+        return {"saved": saved, "skipped": len(skipped)}
+
+    def load_snapshot(self, path: SelectType.String_, lazy: SelectType.Boolean_ = True) -> int:
+        """Function to load a snapshot, handing each shard the keys it owns; see `MemoryAwareStruct.load_snapshot`."""
+        snapshot = SnapshotFile(path)
+        count = len(self.__shards)
+        parts: Dict[int, Dict[str, tuple]] = {}
+        for key, entry in snapshot.entries.items():
+            parts.setdefault(hash(key) % count, {})[key] = entry
+        loaded = 0
+        for index, part in parts.items():
+            loaded += self.__shards[index].__adopt_snapshot__(snapshot, part)
+            if not lazy:
+                self.__shards[index].__materialize_all__()
+        return loaded
+
+    @property
+    def version(self) -> int:
+        """Function to return the sum of the shard versions, which grows on every change to any shard."""
+        return sum(shard.version for shard in self.__shards)
+
+    def __repr__(self) -> SelectType.String_:
+        output_dictory = tuple(
+            f"{k}={repr(v)}"
+            for shard in self.__shards
+            for k, v in shard.__items_snapshot__()
+        )
+        return f"{self.__struct_name}({', '.join(output_dictory)})"
+
+    def __str__(self) -> SelectType.String_:
+        return self.__repr__()
+
+
+class SharedMemoryStruct:
+    """
+    A key/value store kept in `multiprocessing.shared_memory`, shared by every process on a host.
+
+    The store lives in two shared segments: an index (a header, per-stripe tombstone counts
+    and an open-addressing hash table) and a heap holding each entry as its UTF-8 key followed
+    by the pickled value. The hash table is split into `stripes` independent regions, each
+    guarded by its own cross-process lock, so processes touching keys in different stripes do
+    not wait on each other. A separate allocator lock guards the heap's bump pointer and counters.
+    A stripe whose popped slots pass `REHASH_TOMBSTONES` of its size is rehashed in place, and
+    compaction rehashes every stripe, so lookups do not slow down as keys come and go.
+
+    The heap size is the memory budget: a write is rejected when the live entries would not
+    fit, for every process at once. Space freed by overwrites and pops is reclaimed by
+    compacting the heap when the bump pointer reaches its end.
+
+    Create the struct before forking workers (they inherit it), or pass it to a
+    `multiprocessing.Process` as an argument. Values come back as private copies, so
+    changing them does not change the store.
+
+    Args:
+            memory_default (int, optional): Heap size in bytes, the budget shared by all processes.
+                                            Default is 64 MiB.
+            max_keys (int, optional): How many keys the index can hold. Default is 65536.
+            stripes (int, optional): Number of lock stripes. Default is 16.
+            context (optional): The multiprocessing context (or start method name) the locks are created
+                                in; it must match the context used to start the worker processes.
+            **entries (SelectType.Dict_): Key-value pairs to initialize the store.
+    """
+
+    MAGIC = b"MASHM001"
+    HEADER = struct.Struct("<8sQQQQQQQQ")  # magic, stripes, slot/stripe, heap, bump, live, garbage, count, versi
+    SLOT = struct.Struct("<QQII")  # hash (0 kosong, 1 tombstone), offset, panjang key, panjang nilai
+    TOMBSTONES = struct.Struct("<Q")  # Jumlah tombstone per stripe, tepat setelah header
+    REHASH_TOMBSTONES = 0.25
+
+    __slots__: SelectType.List_ = [
+        "__struct_name",
+        "__index",
+        "__heap",
+        "__locks",
+        "__alloc_lock",
+        "__stripes",
+        "__slots_per_stripe",
+    ]
+
+    def __init__(
+        self,
+        memory_default: int = 64 * 1024 * 1024,
+        max_keys: int = 65536,
+        stripes: int = 16,
+        context: SelectType.Any_ = None,
+        **entries: SelectType.Dict_,
+    ) -> None:
+        """
+        Creates the shared segments and the cross-process locks.
+
+        Raises:
+            ValueError: If the sizes are not positive or the initial entries do not fit.
+        """
+        if memory_default <= 0 or max_keys <= 0 or stripes <= 0:
+            raise ValueError("memory_default, max_keys and stripes must be positive.")
+        self.__struct_name = self.__class__.__name__
+        # Faktor beban maksimum 0.75 per stripe
+        slots_per_stripe = max(8, -(-max_keys * 4 // 3) // stripes)
+        index_size = self.HEADER.size + stripes * (self.TOMBSTONES.size + slots_per_stripe * self.SLOT.size)
+        self.__index = shared_memory.SharedMemory(create=True, size=index_size)
+        self.__heap = shared_memory.SharedMemory(create=True, size=memory_default)
+        self.__index.buf[:index_size] = bytes(index_size)
+        self.HEADER.pack_into(
+            self.__index.buf, 0, self.MAGIC, stripes, slots_per_stripe, memory_default, 0, 0, 0, 0, 0
+        )
+        self.__stripes = stripes
+        self.__slots_per_stripe = slots_per_stripe
+        if context is None or isinstance(context, str):
+            context = multiprocessing.get_context(context)
+        self.__locks = [context.Lock() for _ in range(stripes)]
+        self.__alloc_lock = context.Lock()
+        if entries and "rejected" in self.insert_many(entries).values():
+            self.unlink()
+            raise ValueError("The initial entries do not fit in memory_default.")
+
+    def __reduce__(self):
+        # Dipakai saat diteruskan ke multiprocessing.Process: lampirkan segmen yang sama
+        return (
+            _attach_shared_struct,
+            (self.__index.name, self.__heap.name, self.__locks, self.__alloc_lock),
+        )
+
+    @classmethod
+    def __attach__(cls, index_name: str, heap_name: str, locks: list, alloc_lock) -> "SharedMemoryStruct":
+        instance = cls.__new__(cls)
+        instance.__struct_name = cls.__name__
+        instance.__index = _open_shared_memory(index_name)
+        instance.__heap = _open_shared_memory(heap_name)
+        magic, stripes, slots_per_stripe = cls.HEADER.unpack_from(instance.__index.buf, 0)[:3]
+        if magic != cls.MAGIC:
+            raise ValueError(f"{index_name} is not a SharedMemoryStruct index.")
+        instance.__stripes = stripes
+        instance.__slots_per_stripe = slots_per_stripe
+        instance.__locks = locks
+        instance.__alloc_lock = alloc_lock
+        return instance
+
+    @property
+    def struct_name(self) -> SelectType.String_:
+        return self.__struct_name
+
+    def set_name(self, params: SelectType.String_) -> None:
+        self.__struct_name = params
+
+    # --- header dan slot ---
+
+    def __header__(self) -> list:
+        return list(self.HEADER.unpack_from(self.__index.buf, 0))
+
+    def __store_header__(self, header: list) -> None:
+        self.HEADER.pack_into(self.__index.buf, 0, *header)
+
+    def __slot_offset__(self, index: int) -> int:
+        return self.HEADER.size + self.__stripes * self.TOMBSTONES.size + index * self.SLOT.size
+
+    def __tombstones__(self, stripe: int, change: int = 0) -> int:
+        """Return (after adding ``change``) the stripe's tombstone count. Needs the stripe lock."""
+        at = self.HEADER.size + stripe * self.TOMBSTONES.size
+        count = self.TOMBSTONES.unpack_from(self.__index.buf, at)[0] + change
+        if change:
+            self.TOMBSTONES.pack_into(self.__index.buf, at, count)
+        return count
+
+    def __rehash__(self, stripe: int) -> None:
+        """Reinsert a stripe's live slots so its tombstones disappear. Needs the stripe lock."""
+        buf = self.__index.buf
+        count = self.__slots_per_stripe
+        base = stripe * count
+        first, last = self.__slot_offset__(base), self.__slot_offset__(base + count)
+        live = [slot for slot in self.SLOT.iter_unpack(bytes(buf[first:last])) if slot[0] > 1]
+        buf[first:last] = bytes(last - first)
+        for slot in live:
+            start = (slot[0] // self.__stripes) % count
+            for step in range(count):
+                slot_at = self.__slot_offset__(base + (start + step) % count)
+                if not self.SLOT.unpack_from(buf, slot_at)[0]:
+                    self.SLOT.pack_into(buf, slot_at, *slot)
+                    break
+        self.TOMBSTONES.pack_into(buf, self.HEADER.size + stripe * self.TOMBSTONES.size, 0)
+
+    @staticmethod
+    def __hash_key__(key_bytes: bytes) -> int:
+        # Hash stabil antar proses (hash() bawaan diacak per proses); 0 dan 1 dicadangkan
+        digest = int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little")
+        return digest | 2
+
+    def __find__(self, stripe: int, digest: int, key_bytes: bytes):
+        """Probe one stripe's region; return ``(slot index or None, found)``. Needs the stripe lock."""
+        buf, heap = self.__index.buf, self.__heap.buf
+        count = self.__slots_per_stripe
+        base = stripe * count
+        start = (digest // self.__stripes) % count
+        reusable = None
+        for step in range(count):
+            index = base + (start + step) % count
+            slot_hash, offset, key_length, _ = self.SLOT.unpack_from(buf, self.__slot_offset__(index))
+            if slot_hash == 0:
+                return (index if reusable is None else reusable), False
+            if slot_hash == 1:
+                if reusable is None:
+                    reusable = index
+            elif (
+                slot_hash == digest
+                and key_length == len(key_bytes)
+                and heap[offset:offset + key_length] == key_bytes
+            ):
+                return index, True
+        return reusable, False
+
+    # --- penulisan ---
+
+    def __write__(self, key: SelectType.String_, value: SelectType.Any_) -> SelectType.String_:
+        """Store one entry and return "inserted", "replaced" or "rejected"."""
+        key_bytes = key.encode("utf-8")
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(key_bytes) + len(payload)
+        digest = self.__hash_key__(key_bytes)
+        stripe = digest % self.__stripes
+        for _ in range(2):
+            with self.__locks[stripe]:
+                index, found = self.__find__(stripe, digest, key_bytes)
+                if index is None:
+                    return "rejected"  # Region stripe ini penuh
+                slot_at = self.__slot_offset__(index)
+                old_hash, _, old_key, old_value = self.SLOT.unpack_from(self.__index.buf, slot_at)
+                old_size = old_key + old_value if found else 0
+                with self.__alloc_lock:
+                    header = self.__header__()
+                    heap_size, bump, live = header[3], header[4], header[5]
+                    if live - old_size + size > heap_size:
+                        return "rejected"  # Anggaran memori bersama habis
+                    fits = bump + size <= heap_size
+                    if fits:
+                        header[4] = bump + size
+                        header[5] = live - old_size + size
+                        header[6] += old_size
+                        header[7] += 0 if found else 1
+                        header[8] += 1
+                        self.__store_header__(header)
+                if fits:
+                    # Ruang sudah dipesan; salin di luar lock alokator
+                    self.__heap.buf[bump:bump + size] = key_bytes + payload
+                    self.SLOT.pack_into(
+                        self.__index.buf, slot_at, digest, bump, len(key_bytes), len(payload)
+                    )
+                    if old_hash == 1:
+                        self.__tombstones__(stripe, -1)  # Tombstone dipakai ulang
+                    return "replaced" if found else "inserted"
+            self.__compact__()
+        return "rejected"
+
+    def __compact__(self) -> None:
+        """Move every live entry to the start of the heap and rehash every stripe; takes every lock."""
+        for lock in self.__locks:
+            lock.acquire()
+        try:
+            with self.__alloc_lock:
+                buf, heap = self.__index.buf, self.__heap.buf
+                live = []
+                for index in range(self.__stripes * self.__slots_per_stripe):
+                    slot_at = self.__slot_offset__(index)
+                    slot_hash, offset, key_length, value_length = self.SLOT.unpack_from(buf, slot_at)
+                    if slot_hash > 1:
+                        live.append((offset, key_length + value_length, slot_at))
+                live.sort()
+                cursor = 0
+                for offset, size, slot_at in live:
+                    if offset != cursor:
+                        heap[cursor:cursor + size] = bytes(heap[offset:offset + size])
+                        struct.pack_into("<Q", buf, slot_at + 8, cursor)
+                    cursor += size
+                header = self.__header__()
+                header[4], header[6] = cursor, 0
+                self.__store_header__(header)
+            for stripe in range(self.__stripes):
+                if self.__tombstones__(stripe):
+                    self.__rehash__(stripe)
+        finally:
+            for lock in reversed(self.__locks):
+                lock.release()
+
+    @property
+    def update(self) -> None:
+        pass
+
+    @update.setter
+    def update(self, dict_new: SelectType.Dict_) -> None:
+        """
+        Function to write values into the shared store.
+
+        Raises:
+            TypeError: If dict_new is not of dictionary type.
+        """
+        if not isinstance(dict_new, dict):
+            raise TypeError("Not Type Dict Error")
+        if "rejected" in self.insert_many(dict_new).values():
+            print("Warning: Memory full, updates restricted!")
+
+    @property
+    def insert(self) -> None:
+        pass
+
+    @insert.setter
+    def insert(self, dict_new: SelectType.Dict_) -> None:
+        """
+        Function to insert values into the shared store.
+
+        Raises:
+            TypeError: If dict_new is not of dictionary type.
+        """
+        if not isinstance(dict_new, dict):
+            raise TypeError("Not Type Dict Error")
+        if "rejected" in self.insert_many(dict_new).values():
+            print("Warning: Memory full, inserts restricted!")
+
+    def insert_many(self, mapping: SelectType.Dict_) -> Dict[str, str]:
+        """
+        Function to insert many keys.
+
+        Returns:
+            Dict[str, str]: Per-key result: "inserted", "replaced" or "rejected".
+
+        Raises:
+            TypeError: If mapping is not of dictionary type.
+
+        Behavior:
+            - Each key is written under its own stripe lock; unlike `MemoryAwareStruct.insert_many`,
+              the batch is not applied atomically.
+        """
+        if not isinstance(mapping, dict):
+            raise TypeError("Not Type Dict Error")
+        return {key: self.__write__(key, value) for key, value in mapping.items()}
+
+    # --- pembacaan dan penghapusan ---
+
+    def get(self, key: SelectType.String_, default: SelectType.Any_ = None) -> SelectType.Any_:
+        """
+        Function to retrieve a value; the pickled bytes are copied under the stripe lock and
+        unpickled after it is released.
+        """
+        key_bytes = key.encode("utf-8")
+        digest = self.__hash_key__(key_bytes)
+        stripe = digest % self.__stripes
+        with self.__locks[stripe]:
+            index, found = self.__find__(stripe, digest, key_bytes)
+            if not found:
+                return default
+            _, offset, key_length, value_length = self.SLOT.unpack_from(
+                self.__index.buf, self.__slot_offset__(index)
+            )
+            start = offset + key_length
+            payload = bytes(self.__heap.buf[start:start + value_length])
+        return pickle.loads(payload)
+
+    def pop(self, params: SelectType.String_) -> SelectType.Boolean_:
+        """Function to remove a key from the shared store."""
+        key_bytes = params.encode("utf-8")
+        digest = self.__hash_key__(key_bytes)
+        stripe = digest % self.__stripes
+        with self.__locks[stripe]:
+            index, found = self.__find__(stripe, digest, key_bytes)
+            if not found:
+                print("failed")
+                return False
+            slot_at = self.__slot_offset__(index)
+            _, offset, key_length, value_length = self.SLOT.unpack_from(self.__index.buf, slot_at)
+            self.SLOT.pack_into(self.__index.buf, slot_at, 1, 0, 0, 0)
+            if self.__tombstones__(stripe, 1) > self.__slots_per_stripe * self.REHASH_TOMBSTONES:
+                self.__rehash__(stripe)  # Pencarian yang gagal tidak lagi memindai seluruh stripe
+            with self.__alloc_lock:
+                header = self.__header__()
+                header[5] -= key_length + value_length
+                header[6] += key_length + value_length
+                header[7] -= 1
+                header[8] += 1
+                self.__store_header__(header)
+        print("success")
+        return True
+
+    def __entries__(self):
+        """Yield every ``(key, pickled value)``, one stripe lock at a time."""
+        buf, heap = self.__index.buf, self.__heap.buf
+        count = self.__slots_per_stripe
+        for stripe in range(self.__stripes):
+            batch = []
+            with self.__locks[stripe]:
+                for index in range(stripe * count, (stripe + 1) * count):
+                    slot_hash, offset, key_length, value_length = self.SLOT.unpack_from(
+                        buf, self.__slot_offset__(index)
+                    )
+                    if slot_hash > 1:
+                        start = offset + key_length
+                        batch.append(
+                            (bytes(heap[offset:start]), bytes(heap[start:start + value_length]))
+                        )
+            for key_bytes, payload in batch:
+                yield key_bytes.decode("utf-8"), payload
+
+    def keys(self) -> list:
+        """Function to list the stored keys."""
+        return [key for key, _ in self.__entries__()]
+
+    def json(self) -> SelectType.Any_:
+        """Function to return the whole store as a ReadOnlyJSON."""
+        return ReadOnlyJSON({key: pickle.loads(payload) for key, payload in self.__entries__()})
+
+    def clear(self) -> None:
+        """Function to remove every key, for all processes."""
+        for lock in self.__locks:
+            lock.acquire()
+        try:
+            with self.__alloc_lock:
+                start = self.HEADER.size
+                self.__index.buf[start:] = bytes(len(self.__index.buf) - start)
+                header = self.__header__()
+                header[4:8] = [0, 0, 0, 0]
+                header[8] += 1
+                self.__store_header__(header)
+        finally:
+            for lock in reversed(self.__locks):
+                lock.release()
+
+    def reset(self) -> None:
+        self.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Function to report the shared store's usage.
+
+        Returns:
+            Dict[str, int]: "keys", "used" (live bytes), "free" (budget left), "garbage" (bytes the next
+            compaction reclaims), "capacity" (the budget), "tombstones" (popped index slots not yet
+            rehashed away) and "version" (grows on every change).
+        """
+        with self.__alloc_lock:
+            header = self.__header__()
+        counts = bytes(self.__index.buf[self.HEADER.size:self.__slot_offset__(0)])
+        tombstones = sum(count for (count,) in self.TOMBSTONES.iter_unpack(counts))
+        return {
+            "keys": header[7],
+            "used": header[5],
+            "free": header[3] - header[5],
+            "garbage": header[6],
+            "capacity": header[3],
+            "tombstones": tombstones,
+            "version": header[8],
+        }
+
+    def __len__(self) -> int:
+        return self.stats()["keys"]
+
+    def close(self) -> None:
+        """Function to detach this process from the shared segments."""
+        self.__index.close()
+        self.__heap.close()
+
+    def unlink(self) -> None:
+        """Function to detach and destroy the shared segments; call it once, from the creating process."""
+        self.close()
+        self.__index.unlink()
+        self.__heap.unlink()
+
+    def __repr__(self) -> SelectType.String_:
+        output_dictory = tuple(
+            f"{key}={repr(pickle.loads(payload))}" for key, payload in self.__entries__()
+        )
+        return f"{self.__struct_name}({', '.join(output_dictory)})"
+
+    def __str__(self) -> SelectType.String_:
+        return self.__repr__()
+
+
+def _open_shared_memory(name: SelectType.String_) -> "shared_memory.SharedMemory":
+    """Attach to an existing segment without tracking it as owned by this process."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: child processes share the creator's resource tracker, so the
+        # segment is only cleaned up once every process is gone
+        return shared_memory.SharedMemory(name=name)
+
+
+def _attach_shared_struct(index_name, heap_name, locks, alloc_lock) -> SharedMemoryStruct:
+    return SharedMemoryStruct.__attach__(index_name, heap_name, locks, alloc_lock)
+
+
 # method chaining
-__all__ = ["MemoryAwareStruct"]
+__all__ = [
+    "MemoryAwareStruct",
+    "ShardedMemoryAwareStruct",
+    "SharedMemoryStruct",
+    "SizeEstimator",
+    "ExactSizeEstimator",
+    "ShallowSizeEstimator",
+    "SampledSizeEstimator",
+    "register_size_fast_path",
+    "MemorySampler",
+    "memory_sampler",
+    "ExpiryReaper",
+    "expiry_reaper",
+    "MemoryBudget",
+    "CgroupMemory",
+    "cgroup_memory",
+    "process_budget",
+    "system_memory_limit",
+    "ReadWriteLock",
+    "EvictionPolicy",
+    "LRUPolicy",
+    "LFUPolicy",
+    "ARCPolicy",
+    "TimerWheel",
+    "DictView",
+    "SequenceView",
+    "view_of",
+    "SnapshotFile",
+    "write_snapshot",
+    "ColdTier",
+    "CompressedValue",
+    "COMPRESSION_CODECS",
+    "FUNCTION_EXECUTORS",
+    "FunctionMemo",
+    "LatencyHistogram",
+    "StructMetrics",
+    "ChangeFeed",
+    "ChangeFeedOverflow",
+    "ChangeEvent",
+    "Subscription",
+    "coroutine_runner",
+]
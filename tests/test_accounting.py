@@ -0,0 +1,42 @@
+import pytest
+
+from main import MemoryAwareStruct
+
+
+def assert_settled(struct):
+    assert struct.memory_budget.used == struct.__get_total_size__()
+
+
+def test_failed_update_gives_back_the_whole_reservation():
+    struct = MemoryAwareStruct()
+    struct.insert = {"a": "x"}
+    with pytest.raises(KeyError):
+        struct.update = {"a": "z" * 10, "__lock": 5, "c": "y" * 500000}
+    assert_settled(struct)
+
+
+def test_failed_insert_records_the_keys_that_landed():
+    struct = MemoryAwareStruct()
+    with pytest.raises(KeyError):
+        struct.insert = {"a": "x" * 1000, "__struct_name": "b", "c": "y" * 500000}
+    assert struct.get("a") is not None
+    assert_settled(struct)
+
+
+def test_overwrite_settles_the_reservation():
+    struct = MemoryAwareStruct()
+    struct.insert = {"a": "x" * 100000}
+    struct.update = {"a": "x" * 10}
+    struct.insert = {"a": "x" * 5000}
+    assert_settled(struct)
+
+
+@pytest.mark.parametrize("method", ["insert_many", "update_many"])
+def test_bulk_write_with_a_restricted_key_writes_nothing(method):
+    struct = MemoryAwareStruct()
+    struct.insert = {"a": "x"}
+    with pytest.raises(KeyError):
+        getattr(struct, method)({"a": "y" * 1000, "__lock": 1, "b": "z" * 1000})
+    assert struct.get("a") == "x"
+    assert struct.get("b") is None
+    assert_settled(struct)
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+from main import MemoryAwareStruct
+
+
+def test_two_event_loops_write_and_pop_the_same_struct():
+    struct = MemoryAwareStruct()
+    errors = []
+
+    async def work(name):
+        for index in range(200):
+            await struct.async_insert({f"{name}:{index}": "x" * 500})
+            if index % 2:
+                await struct.async_pop(f"{name}:{index}")
+
+    def run(name):
+        try:
+            asyncio.run(work(name))
+        except BaseException as error:  # Dilaporkan ke thread utama
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert struct.get("a:198") == struct.get("b:0") == "x" * 500
+    assert struct.get("a:199") is None
+    assert len(struct.find_all("%:%")) == 200
+    assert struct.memory_budget.used == struct.__get_total_size__()
+
+
+def test_async_writes_do_not_block_the_loop():
+    struct = MemoryAwareStruct()
+
+    async def main():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0)
+                ticks += 1
+
+        beat = asyncio.ensure_future(heartbeat())
+        with struct.__write_session__():
+            # Lock sedang dipegang: async_insert menunggu tanpa menahan loop
+            pending = asyncio.ensure_future(struct.async_insert({"a": 1}))
+            await asyncio.sleep(0.05)
+            assert not pending.done()
+        await pending
+        beat.cancel()
+        return ticks
+
+    assert asyncio.run(main()) > 10
+    assert struct.get("a") == 1
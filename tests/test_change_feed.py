@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+import pytest
+
+from main import MemoryAwareStruct
+
+
+def test_close_stops_a_blocked_iterator():
+    struct = MemoryAwareStruct()
+    subscription = struct.subscribe()
+    seen = []
+    reader = threading.Thread(target=lambda: seen.extend(subscription), daemon=True)
+    reader.start()
+    struct.insert = {"a": 1}
+    subscription.close()
+    reader.join(1.0)
+    assert not reader.is_alive()
+
+
+def test_close_stops_a_blocked_async_iterator():
+    struct = MemoryAwareStruct()
+    subscription = struct.subscribe()
+
+    async def consume():
+        return [event async for event in subscription]
+
+    async def main():
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        threading.Thread(target=subscription.close).start()
+        return await asyncio.wait_for(task, 1.0)
+
+    assert asyncio.run(main()) == []
+
+
+def test_failed_write_announces_the_keys_that_landed():
+    struct = MemoryAwareStruct()
+    subscription = struct.subscribe()
+    with pytest.raises(KeyError):
+        struct.update = {"a": 1, "__lock": 2, "b": 3}
+    assert [(event.key, event.op) for event in subscription.poll()] == [("a", "insert")]
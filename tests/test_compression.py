@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from main import COMPRESSION_CODECS, MemoryAwareStruct
+
+
+@pytest.mark.parametrize("codec", sorted(COMPRESSION_CODECS))
+def test_compressed_values_round_trip(codec):
+    struct = MemoryAwareStruct()
+    struct.insert = {"raw": "r" * 200_000}
+    raw_size = struct.__get_total_size__()
+    struct.set_compression(codec, threshold=1024, cache_bytes=1_000_000)
+    text, blob, array = "abc" * 100_000, b"\x01\x02" * 100_000, bytearray(b"z" * 50_000)
+    struct.insert = {"text": text, "blob": blob, "array": array, "small": "s" * 10}
+    for _ in range(2):  # Kedua kali dari cache hasil dekompresi
+        assert struct.get("text") == text
+        assert bytes(struct.get("blob")) == blob
+        assert bytes(struct.get("array")) == bytes(array)
+    assert struct.get("small") == "s" * 10
+    assert struct.get("raw") == "r" * 200_000
+    assert struct.__get_total_size__() - raw_size < 100_000
+    assert struct.memory_budget.used == struct.__get_total_size__()
+    assert struct.json().data["text"] == text
+
+
+def test_incompressible_values_are_kept_as_they_are():
+    struct = MemoryAwareStruct()
+    struct.set_compression("zlib", threshold=16)
+    noise = os.urandom(50_000)
+    struct.insert = {"noise": noise}
+    assert bytes(struct.get("noise")) == noise
+    assert struct.__get_total_size__() >= len(noise)
+
+
+def test_unknown_codec_is_refused():
+    with pytest.raises(ValueError):
+        MemoryAwareStruct().set_compression("snappy-ish")
@@ -0,0 +1,41 @@
+import pytest
+
+from main import MemoryAwareStruct
+
+POLICIES = ["lru", "lfu", "arc"]
+
+
+def full_struct(policy, value_size=1000):
+    struct = MemoryAwareStruct(memory_default=200_000)
+    struct.set_eviction_policy(policy)
+    index = 0
+    while struct.eviction_stats()["evictions"] == 0:
+        struct.insert = {f"k{index}": "x" * value_size}
+        index += 1
+    return struct, index
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_oversized_write_evicts_nothing(policy):
+    struct, count = full_struct(policy)
+    before = struct.eviction_stats()
+    used = struct.memory_budget.used
+    struct.insert = {"big": "y" * 10_000_000}
+    after = struct.eviction_stats()
+    assert struct.get("big") is None
+    assert after["evictions"] == before["evictions"]
+    assert after["rejected_writes"] == before["rejected_writes"] + 1
+    assert struct.memory_budget.used == used
+    assert struct.get(f"k{count - 1}") is not None
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_same_size_overwrite_evicts_nothing(policy):
+    struct, count = full_struct(policy, value_size=50_000)
+    evictions = struct.eviction_stats()["evictions"]
+    key = f"k{count - 1}"
+    struct.update = {key: "z" * 50_000}
+    struct.insert = {key: "w" * 50_000}
+    assert struct.eviction_stats()["evictions"] == evictions
+    assert struct.get(key) == "w" * 50_000
+    assert struct.memory_budget.used == struct.__get_total_size__()
@@ -0,0 +1,29 @@
+import time
+
+from main import MemoryAwareStruct, expiry_reaper
+
+
+def test_expired_bytes_are_credited_back_without_a_write():
+    struct = MemoryAwareStruct()
+    struct.insert = ({"session": "x" * 100_000}, 0.1)
+    assert struct.memory_budget.used > 100_000
+    time.sleep(0.2 + 2 * expiry_reaper.interval)
+    assert struct.get("session") is None
+    assert struct.memory_budget.used == struct.__get_total_size__() == 0
+
+
+def test_struct_leaves_the_reaper_when_nothing_is_left_to_expire():
+    struct = MemoryAwareStruct()
+    struct.insert = ({"a": 1}, 0.05)
+    time.sleep(0.05 + 3 * expiry_reaper.interval)
+    assert struct not in expiry_reaper
+
+
+def test_reset_drops_everything_clear_drops():
+    struct = MemoryAwareStruct()
+    struct.insert = ({"a": "x" * 1000}, 60)
+    struct.insert = {"b": 1}
+    struct.reset()
+    assert struct.get("a") is None and struct.get("b") is None
+    assert struct.time_to_live("a") is None
+    assert struct.memory_budget.used == struct.__get_total_size__() == 0
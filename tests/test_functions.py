@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from main import MemoryAwareStruct
+
+
+def test_expired_memo_results_are_credited_back():
+    struct = MemoryAwareStruct()
+    struct.insert_function("f", lambda i: "x" * 100_000 + str(i), memoize=True, ttl=0.05)
+    base = struct.memory_budget.used
+    for i in range(5):
+        struct.execute_function("f", i)
+    assert struct.memory_budget.used - base > 500_000
+    time.sleep(0.1)
+    struct.execute_function("f", 0)
+    stats = struct.function_stats("f")
+    assert stats["entries"] == 1
+    assert struct.memory_budget.used - base == stats["bytes"]
+    assert struct.memory_budget.used == struct.__get_total_size__()
+
+
+def test_expired_lookup_is_dropped_even_when_the_call_fails():
+    calls = []
+
+    def flaky(i):
+        calls.append(i)
+        if len(calls) > 1:
+            raise RuntimeError("boom")
+        return "y" * 100_000
+
+    struct = MemoryAwareStruct()
+    struct.insert_function("f", flaky, memoize=True, ttl=0.05)
+    base = struct.memory_budget.used
+    struct.execute_function("f", 1)
+    time.sleep(0.1)
+    try:
+        struct.execute_function("f", 1)
+    except RuntimeError:
+        pass
+    assert struct.function_stats("f")["bytes"] == 0
+    assert struct.memory_budget.used == base
+
+
+def test_functions_run_on_the_pool_outside_the_lock():
+    struct = MemoryAwareStruct()
+    struct.set_function_executor("thread", max_workers=4)
+    try:
+        started = threading.Barrier(4, timeout=2)
+
+        def together(value):
+            started.wait()  # Hanya lolos bila keempat panggilan berjalan bersamaan
+            return value * 2
+
+        struct.insert_function("double", together)
+        futures = struct.map_function("double", range(4))
+        assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6]
+        release = threading.Event()
+        struct.insert_function("wait", lambda: release.wait(5))
+        running = struct.submit_function("wait")
+        struct.insert = {"a": 1}  # Fungsi yang sedang berjalan tidak menahan lock
+        assert struct.get("a") == 1
+        release.set()
+        assert running.result(timeout=5) is True
+        struct.insert_function("fail", lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            struct.submit_function("fail").result(timeout=5)
+        with pytest.raises(KeyError):
+            struct.submit_function("missing")
+    finally:
+        struct.set_function_executor(None)
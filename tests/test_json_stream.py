@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from main import MemoryAwareStruct, ShardedMemoryAwareStruct
+
+
+@pytest.mark.parametrize("cls", [MemoryAwareStruct, ShardedMemoryAwareStruct])
+def test_dump_and_load_through_a_path(tmp_path, cls):
+    path = tmp_path / "store.json"
+    source = cls()
+    source.insert_many({f"k{i}": {"n": i} for i in range(50)})
+    assert source.dump_json(path) == 50
+    target = cls()
+    assert target.load_json(str(path), chunk_size=7) == {"inserted": 50, "replaced": 0, "rejected": 0}
+    assert target.get("k49")["n"] == 49
+
+
+def test_failed_dump_leaves_the_previous_file(tmp_path):
+    path = tmp_path / "store.json"
+    path.write_text("{}")
+    struct = MemoryAwareStruct()
+    struct.insert = {"a": 1, "b": object()}
+    with pytest.raises(TypeError):
+        struct.dump_json(path)
+    assert path.read_text() == "{}"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_json_snapshot_is_reused_until_a_write():
+    struct = MemoryAwareStruct()
+    struct.insert = {"a": 1}
+    first = struct.json()
+    assert struct.json() is first
+    struct.update = {"a": 2}
+    second = struct.json()
+    assert second is not first
+    assert second.data["a"] == 2
+    struct.pop("a")
+    assert "a" not in struct.json().data
+    struct.insert = ({"b": 1}, 0.05)
+    assert "b" in struct.json().data
+    time.sleep(0.1)
+    assert "b" not in struct.json().data  # Kedaluwarsa juga membatalkan snapshot
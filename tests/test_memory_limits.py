@@ -0,0 +1,97 @@
+import psutil
+import pytest
+
+import main
+from main import MemoryAwareStruct, memory_sampler
+
+
+def test_writes_are_refused_within_the_headroom(monkeypatch):
+    struct = MemoryAwareStruct()
+    sample = memory_sampler.snapshot()
+    total = sample.total
+    tight = sample._replace(available=int(total * main.MEMORY_HEADROOM_FRACTION) - 1)
+    monkeypatch.setattr(memory_sampler, "snapshot", lambda: tight)
+    struct.insert = {"a": "x" * 1000}
+    assert struct.get("a") is None
+    assert struct.memory_warning_triggered
+
+    roomy = sample._replace(available=int(total * main.MEMORY_HEADROOM_FRACTION) * 2)
+    monkeypatch.setattr(memory_sampler, "snapshot", lambda: roomy)
+    struct.insert = {"a": "x" * 1000}
+    assert struct.get("a") == "x" * 1000
+
+
+def test_budget_refuses_to_release_more_than_it_holds():
+    parent = main.MemoryBudget(1000, name="parent")
+    child = parent.child(500, name="child")
+    assert child.reserve(400)
+    assert not child.reserve(200)
+    assert parent.used == child.used == 400
+    with pytest.raises(RuntimeError):
+        child.release(401)
+    assert parent.used == child.used == 400
+    child.close()
+    assert parent.used == child.used == 0
+
+
+def fake_cgroup(tmp_path, membership, mount, files):
+    proc = tmp_path / "proc"
+    proc.mkdir()
+    (proc / "cgroup").write_text(membership)
+    (proc / "mountinfo").write_text(
+        "22 1 0:21 / /proc rw,nosuid - proc proc rw\n" + mount.format(root=tmp_path / "cgroup") + "\n"
+    )
+    for relative, text in files.items():
+        path = tmp_path / "cgroup" / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return main.CgroupMemory(str(proc))
+
+
+def test_cgroup_v2_takes_the_tightest_limit_up_the_tree(tmp_path):
+    cgroup = fake_cgroup(
+        tmp_path,
+        "0::/app/worker\n",
+        "35 24 0:30 / {root} rw,nosuid - cgroup2 cgroup2 rw",
+        {
+            "app/worker/memory.max": "max\n",
+            "app/worker/memory.high": "3145728\n",
+            "app/worker/memory.current": "1048576\n",
+            "app/worker/memory.stat": "anon 1000\ninactive_file 24576\n",
+            "app/memory.max": "2097152\n",
+        },
+    )
+    assert cgroup.version == 2
+    assert cgroup.limit() == 2097152
+    assert cgroup.usage() == 1048576 - 24576
+    host = psutil.virtual_memory()
+    bounded = cgroup.apply(host)
+    assert bounded.total == 2097152
+    assert bounded.available == min(2097152 - (1048576 - 24576), host.available)
+
+
+def test_cgroup_v1_memory_controller(tmp_path):
+    cgroup = fake_cgroup(
+        tmp_path,
+        "12:cpu,cpuacct:/docker/abc\n4:memory:/docker/abc\n0::/\n",
+        "40 24 0:35 / {root} rw,nosuid - cgroup cgroup rw,memory",
+        {
+            "docker/abc/memory.limit_in_bytes": "4194304\n",
+            "docker/abc/memory.usage_in_bytes": "2097152\n",
+            "docker/abc/memory.stat": "total_inactive_file 1048576\n",
+            "docker/memory.limit_in_bytes": "9223372036854771712\n",
+        },
+    )
+    assert cgroup.version == 1
+    assert cgroup.limit() == 4194304
+    assert cgroup.usage() == 1048576
+
+
+def test_without_a_limit_the_host_is_reported(tmp_path):
+    cgroup = fake_cgroup(
+        tmp_path, "0::/\n", "35 24 0:30 / {root} rw - cgroup2 cgroup2 rw", {"memory.max": "max\n"}
+    )
+    assert cgroup.limit() is None
+    host = psutil.virtual_memory()
+    assert cgroup.apply(host) is host
+    assert main.CgroupMemory(str(tmp_path / "missing")).version is None
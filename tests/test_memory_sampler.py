@@ -0,0 +1,25 @@
+import time
+
+import psutil
+
+from main import MemorySampler
+
+
+def test_snapshot_is_cached_and_refreshed_in_the_background():
+    sampler = MemorySampler(interval=0.01)
+    try:
+        first = sampler.snapshot()
+        assert sampler.running
+        assert first.total > 0 and 0 <= first.available <= first.total
+        assert sampler.age < 1
+        assert first.total <= psutil.virtual_memory().total
+        sampler.request_refresh()
+        deadline = time.monotonic() + 2
+        while sampler.snapshot() is first and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sampler.snapshot() is not first
+    finally:
+        sampler.stop()
+    assert not sampler.running
+    last = sampler.snapshot()
+    assert sampler.snapshot() is last  # Setelah stop, snapshot terakhir dipakai apa adanya
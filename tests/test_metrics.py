@@ -0,0 +1,52 @@
+import re
+
+from main import LatencyHistogram, MemoryAwareStruct, StructMetrics
+
+
+def test_cumulative_counts_values_equal_to_a_bound():
+    histogram = LatencyHistogram()
+    for value in (1023, 1024, 2048, 2049, 5000):
+        histogram.record(value)
+    assert histogram.cumulative([1024, 2048, 4096, 8192]) == [2, 4, 4, 5]
+
+
+def test_bucket_lines_use_less_or_equal():
+    metrics = StructMetrics()
+    metrics.observe("get", 1024, False)
+    metrics.observe("get", 2048, False)
+    lines = metrics.to_prometheus({}, {"struct": "s"}).splitlines()
+    prefix = 'memory_aware_struct_operation_duration_seconds_bucket{struct="s",operation="get",'
+    assert prefix + 'le="1.024e-06"} 1' in lines
+    assert prefix + 'le="2.048e-06"} 2' in lines
+    assert prefix + 'le="+Inf"} 2' in lines
+
+
+def test_metrics_text_follows_the_exposition_format():
+    struct = MemoryAwareStruct()
+    struct.set_metrics()
+    struct.insert = {"a": 1}
+    struct.get("a")
+    struct.get("missing")
+    text = struct.metrics_text(labels={"struct": 'we"ird'})
+    assert text.endswith("\n")
+    sample = re.compile(r'[a-zA-Z_:][a-zA-Z0-9_:]*(\{[a-zA-Z_]\w*="(\\.|[^"\\])*"(,[a-zA-Z_]\w*="(\\.|[^"\\])*")*\})? \S+\Z')
+    declared = {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            declared[name] = kind
+            continue
+        assert sample.match(line), line
+        name = line.split("{")[0].split(" ")[0]
+        base = re.sub(r"_(bucket|sum|count)\Z", "", name)
+        assert name in declared or declared.get(base) == "histogram", line
+        float(line.rsplit(" ", 1)[1])
+    assert 'struct="we\\"ird"' in text
+    assert declared["memory_aware_struct_operation_duration_seconds"] == "histogram"
+    assert declared["memory_aware_struct_operations_total"] == "counter"
+    lines = text.splitlines()
+    inf = 'memory_aware_struct_operation_duration_seconds_bucket{struct="we\\"ird",operation="get",le="+Inf"} 2'
+    assert inf in lines
+    assert 'memory_aware_struct_operation_duration_seconds_count{struct="we\\"ird",operation="get"} 2' in lines
@@ -0,0 +1,43 @@
+import re
+
+import pytest
+
+from main import MemoryAwareStruct
+
+
+def like(pattern):
+    regex = "".join(".*" if char == "%" else "." if char == "?" else re.escape(char) for char in pattern)
+    return re.compile(regex + r"\Z", re.DOTALL)
+
+
+def expected(keys, pattern):
+    regex = like(pattern)
+    return sorted(key for key in keys if regex.match(key))
+
+
+@pytest.mark.parametrize("pattern", ["user:%", "user:1%", "user:1?", "user:%:name", "%:name", "user:7", "zzz%"])
+def test_prefix_queries_follow_inserts_and_pops(pattern):
+    struct = MemoryAwareStruct()
+    keys = set()
+
+    def insert(batch):
+        struct.insert_many(batch)
+        keys.update(batch)
+
+    insert({f"user:{index}": index for index in range(300)})  # Batch besar: indeks dibangun ulang
+    assert sorted(struct.find_all(pattern)) == expected(keys, pattern)
+    insert({f"user:{index}:name": str(index) for index in range(10)})  # Batch kecil: indeks diperbarui
+    insert({"user:": 0, "users": 1, "account:1": 2})
+    for key in ("user:7", "user:10", "user:1:name", "users"):
+        struct.pop(key)
+        keys.discard(key)
+    assert sorted(struct.find_all(pattern)) == expected(keys, pattern)
+    insert({f"user:1{index}x": index for index in range(100)})
+    assert sorted(struct.find_all(pattern)) == expected(keys, pattern)
+
+
+def test_get_returns_the_first_match_in_key_order():
+    struct = MemoryAwareStruct()
+    struct.insert_many({"b:2": 2, "b:1": 1, "a:1": 0})
+    assert struct.get("%b:%%") == 1
+    assert struct.get("%c:%%", "none") == "none"
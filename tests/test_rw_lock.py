@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from main import MemoryAwareStruct, ReadWriteLock
+
+
+def queue_writer(lock):
+    acquired = threading.Event()
+
+    def write():
+        with lock:
+            acquired.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    return writer, acquired
+
+
+def test_waiting_writer_holds_back_new_readers():
+    lock = ReadWriteLock(writer_preference=True)
+    lock.acquire_read()
+    writer, acquired = queue_writer(lock)
+    deadline = time.monotonic() + 2
+    while lock.acquire_read(blocking=False):
+        lock.release_read()
+        assert time.monotonic() < deadline, "the writer never started waiting"
+        time.sleep(0.01)
+    assert not acquired.is_set()
+    lock.release_read()
+    writer.join(2)
+    assert acquired.is_set()
+    assert not lock.locked()
+
+
+def test_without_preference_readers_pass_a_waiting_writer():
+    lock = ReadWriteLock(writer_preference=False)
+    lock.acquire_read()
+    writer, acquired = queue_writer(lock)
+    time.sleep(0.05)
+    assert lock.acquire_read(blocking=False)
+    lock.release_read()
+    assert not acquired.is_set()
+    lock.release_read()
+    writer.join(2)
+    assert acquired.is_set()
+
+
+def test_readers_share_and_writers_exclude():
+    lock = ReadWriteLock()
+    with lock.read():
+        assert lock.acquire_read(blocking=False)
+        lock.release_read()
+        assert not lock.acquire(blocking=False)
+    with lock:
+        assert not lock.acquire_read(blocking=False)
+    with pytest.raises(RuntimeError):
+        lock.release()
+
+
+def test_rw_mode_struct_reads_and_writes():
+    struct = MemoryAwareStruct()
+    struct.set_concurrency_mode("rw")
+    assert struct.concurrency_mode == "rw"
+
+    def write(worker):
+        for index in range(200):
+            struct.insert = {f"{worker}:{index}": index}
+            struct.get(f"{worker}:{index // 2}")
+
+    workers = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(struct.find_all("%:%")) == 800
+    assert struct.memory_budget.used == struct.__get_total_size__()
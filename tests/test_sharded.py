@@ -0,0 +1,51 @@
+import json
+import threading
+
+from main import ShardedMemoryAwareStruct
+
+
+def test_shards_have_their_own_budget_slices():
+    sharded = ShardedMemoryAwareStruct(shards=4, memory_default=4_000_000)
+    budgets = sharded.memory_budgets
+    assert len({id(budget) for budget in budgets}) == 4
+    assert [budget.limit for budget in budgets] == [1_000_000] * 4
+    assert all(budget.parent is budgets[0].parent for budget in budgets)
+
+
+def test_busy_shard_takes_over_unused_budget():
+    sharded = ShardedMemoryAwareStruct(shards=4, memory_default=4_000_000)
+    key = "big"
+    sharded.insert = {key: "x" * 1_500_000}
+    assert sharded.get(key) == "x" * 1_500_000
+    stats = sharded.shard_stats()
+    assert sum(shard["limit"] for shard in stats) == 4_000_000
+    assert max(shard["limit"] for shard in stats) > 1_500_000
+    assert all(shard["used"] <= shard["limit"] for shard in stats)
+
+
+def test_threads_write_across_shards():
+    sharded = ShardedMemoryAwareStruct(shards=8, memory_default=64_000_000)
+
+    def write(worker):
+        for index in range(500):
+            sharded.insert = {f"w{worker}:{index}": "v" * 100}
+        sharded.insert_many({f"bulk{worker}:{index}": index for index in range(200)})
+
+    workers = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sum(shard["keys"] for shard in sharded.shard_stats()) == 8 * 700
+    assert sharded.get("w7:499") == "v" * 100
+    for shard, budget in zip(sharded.shard_stats(), sharded.memory_budgets):
+        assert budget.used == shard["used"]
+
+
+def test_json_joins_the_shard_snapshots():
+    sharded = ShardedMemoryAwareStruct(shards=4)
+    assert sharded.json().to_json == "{}"
+    sharded.insert = {"a": 1, "b": [1, 2], "c": {"d": 2}}
+    assert json.loads(sharded.json().to_json) == {"a": 1, "b": [1, 2], "c": {"d": 2}}
+    sharded.insert_function("f", abs)
+    assert set(sharded.json().data) == {"a", "b", "c", "f"}
@@ -0,0 +1,87 @@
+import multiprocessing
+
+import pytest
+
+from main import SharedMemoryStruct
+
+
+@pytest.fixture
+def store():
+    store = SharedMemoryStruct(memory_default=1024 * 1024, max_keys=1024, stripes=4)
+    yield store
+    store.unlink()
+
+
+def test_write_read_and_pop(store):
+    assert store.insert_many({"a": {"n": 1}, "b": [1, 2]}) == {"a": "inserted", "b": "inserted"}
+    assert store.insert_many({"a": "x"}) == {"a": "replaced"}
+    assert store.get("a") == "x"
+    assert store.pop("b") is True
+    assert store.pop("b") is False
+    assert store.get("b", "missing") == "missing"
+    assert store.keys() == ["a"]
+    assert store.stats()["keys"] == 1
+
+
+def test_values_are_private_copies(store):
+    store.insert = {"a": {"n": 1}}
+    store.get("a")["n"] = 2
+    assert store.get("a") == {"n": 1}
+
+
+def test_churn_does_not_pile_up_tombstones(store):
+    for index in range(20000):
+        store.insert = {f"k{index}": index}
+        store.pop(f"k{index}")
+    stats = store.stats()
+    assert stats["keys"] == 0
+    assert stats["tombstones"] <= 4 * 341 * SharedMemoryStruct.REHASH_TOMBSTONES  # 4 stripe x 341 slot
+    store.insert = {"kept": 1}
+    assert store.get("kept") == 1
+
+
+def test_compaction_drops_tombstones():
+    store = SharedMemoryStruct(memory_default=64 * 1024, max_keys=256, stripes=2)
+    try:
+        for index in range(200):
+            garbage = store.stats()["garbage"]
+            store.insert = {f"k{index}": "x" * 1000}
+            if store.stats()["garbage"] < garbage:
+                break  # Tulisan ini memicu kompaksi
+            store.pop(f"k{index}")
+        else:
+            pytest.fail("the heap was never compacted")
+        assert store.stats()["tombstones"] == 0
+        assert store.get(f"k{index}") == "x" * 1000
+    finally:
+        store.unlink()
+
+
+def test_budget_is_shared(store):
+    assert store.insert_many({"big": "x" * 2_000_000}) == {"big": "rejected"}
+    assert store.stats()["used"] == 0
+
+
+def write_range(store, start, count):
+    for index in range(start, start + count):
+        store.insert = {f"k{index}": index}
+    store.close()
+
+
+def test_processes_share_one_store():
+    context = multiprocessing.get_context("spawn")
+    store = SharedMemoryStruct(memory_default=1024 * 1024, max_keys=1024, context=context)
+    try:
+        workers = [
+            context.Process(target=write_range, args=(store, start, 100))
+            for start in range(0, 400, 100)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert len(store) == 400
+        assert store.get("k399") == 399
+    finally:
+        store.unlink()
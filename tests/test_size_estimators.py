@@ -0,0 +1,62 @@
+import sys
+
+import pytest
+
+from main import (
+    ExactSizeEstimator,
+    MemoryAwareStruct,
+    SampledSizeEstimator,
+    ShallowSizeEstimator,
+)
+
+
+def test_exact_walks_nested_values():
+    value = {"a": ["x" * 1000, "y" * 2000], "b": (1, 2.5)}
+    size = ExactSizeEstimator().estimate(value)
+    assert size >= sys.getsizeof(value) + sys.getsizeof("x" * 1000) + sys.getsizeof("y" * 2000)
+
+
+def test_shared_objects_are_counted_once():
+    item = "x" * 10_000
+    assert ExactSizeEstimator().estimate([item, item]) == sys.getsizeof([item, item]) + sys.getsizeof(item)
+
+
+def test_shallow_measures_only_the_top_level():
+    value = ["x" * 10_000]
+    assert ShallowSizeEstimator().estimate(value) == sys.getsizeof(value)
+
+
+def test_sampled_stays_close_to_exact_for_uniform_items():
+    value = [str(index).rjust(100, "0") for index in range(10_000)]
+    exact = ExactSizeEstimator().estimate(value)
+    sampled = SampledSizeEstimator(sample_size=32).estimate(value)
+    assert sampled == pytest.approx(exact, rel=0.01)
+
+
+def test_declared_and_registered_sizes_win():
+    class Blob:
+        def __init__(self, nbytes):
+            self.payload = b"\x00" * nbytes
+
+        def __memory_size__(self):
+            return 42
+
+    class Buffer:
+        pass
+
+    estimator = ShallowSizeEstimator()
+    estimator.register(Buffer, lambda buffer: 7)
+    assert ExactSizeEstimator().estimate(Blob(10_000)) == 42
+    assert estimator.estimate(Buffer()) == 7
+    assert ExactSizeEstimator().estimate(Buffer()) != 7
+
+
+def test_switching_estimators_remeasures_the_store():
+    struct = MemoryAwareStruct()
+    struct.insert = {"a": ["x" * 10_000 for _ in range(10)]}
+    exact = struct.__get_total_size__()
+    struct.set_size_estimator("shallow")
+    assert struct.__get_total_size__() < exact
+    assert struct.memory_budget.used == struct.__get_total_size__()
+    with pytest.raises(ValueError):
+        struct.set_size_estimator("unknown")
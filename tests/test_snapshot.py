@@ -0,0 +1,32 @@
+import pytest
+
+from main import MemoryAwareStruct
+
+
+def saved(tmp_path):
+    struct = MemoryAwareStruct()
+    struct.insert = {"persistent": {"n": 1}, "blob": b"\x00" * 4096}
+    struct.insert = ({"session": "token"}, 600)
+    path = str(tmp_path / "store.snap")
+    assert struct.save_snapshot(path) == {"saved": 3, "skipped": 0}
+    return path
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_snapshot_round_trip(tmp_path, lazy):
+    path = saved(tmp_path)
+    restored = MemoryAwareStruct()
+    assert restored.load_snapshot(path, lazy=lazy) == 3
+    assert dict(restored.get("persistent")) == {"n": 1}
+    assert bytes(restored.get("blob")) == b"\x00" * 4096
+    assert restored.get("session") == "token"
+    assert restored.memory_budget.used == restored.__get_total_size__()
+
+
+def test_loaded_keys_keep_their_expiry(tmp_path):
+    path = saved(tmp_path)
+    restored = MemoryAwareStruct()
+    restored.set_default_ttl(3600)
+    restored.load_snapshot(path)
+    assert restored.time_to_live("persistent") is None
+    assert 0 < restored.time_to_live("session") <= 600
@@ -0,0 +1,40 @@
+import threading
+
+from main import MemoryAwareStruct
+
+
+def test_concurrent_readers_count_every_lookup():
+    struct = MemoryAwareStruct()
+    struct.set_concurrency_mode("rw")
+    struct.insert = {"a": 1}
+
+    def read():
+        for _ in range(2000):
+            struct.get("a")
+            struct.get("missing")
+
+    readers = [threading.Thread(target=read) for _ in range(8)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    stats = struct.tier_stats()
+    assert stats["memory_hits"] == 16000
+    assert stats["memory_misses"] == stats["disk_misses"] == 16000
+
+
+def test_promoted_key_keeps_its_expiry(tmp_path):
+    struct = MemoryAwareStruct(memory_default=200_000)
+    struct.set_cold_tier(str(tmp_path / "cold.db"))
+    struct.insert = {"persistent": "p" * 1000}
+    struct.insert = ({"short": "s" * 1000}, 60)
+    struct.set_default_ttl(3600)
+    index = 0
+    while struct.tier_stats()["demotions"] < 2:
+        struct.insert = ({f"k{index}": "x" * 1000}, 600)
+        index += 1
+    assert struct.get("persistent") == "p" * 1000
+    assert struct.get("short") == "s" * 1000
+    assert struct.tier_stats()["promotions"] == 2
+    assert struct.time_to_live("persistent") is None
+    assert 0 < struct.time_to_live("short") <= 60
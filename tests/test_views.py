@@ -0,0 +1,38 @@
+import pytest
+
+from main import MemoryAwareStruct
+
+
+def test_caller_cannot_change_a_stored_dict():
+    struct = MemoryAwareStruct()
+    config = {"n": 1}
+    struct.insert = {"cfg": config}
+    used = struct.memory_budget.used
+    before = struct.json()
+    config["big"] = "x" * 500000
+    assert dict(struct.get("cfg")) == {"n": 1}
+    assert struct.json() == before
+    assert struct.memory_budget.used == used
+
+
+def test_views_reject_mutation_at_every_level():
+    struct = MemoryAwareStruct()
+    struct.insert = {"profile": {"tags": ["a", "b"], "meta": {"n": 1}}, "blob": b"abc", "pair": (1, [2])}
+    profile = struct.get("profile")
+    with pytest.raises(AttributeError):
+        profile["tags"] = []
+    with pytest.raises(AttributeError):
+        del profile["meta"]
+    with pytest.raises(AttributeError):
+        profile["tags"][0] = "z"
+    with pytest.raises(AttributeError):
+        profile["meta"]["n"] = 2
+    with pytest.raises(AttributeError):
+        struct.get("pair")[1][0] = 3
+    with pytest.raises(TypeError):
+        struct.get("blob")[0] = 0
+    assert profile["tags"] == ["a", "b"] and profile["tags"][:1] == ["a"]
+    assert bytes(struct.get("blob")) == b"abc"
+    copy = dict(profile)
+    copy["tags"] = []
+    assert struct.get("profile")["tags"] == ["a", "b"]